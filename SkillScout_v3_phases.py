@@ -24,26 +24,15 @@ import requests
 import os
 EMAIL_ENABLED = os.getenv("EMAIL_ENABLED", "false").lower() == "true"
 import datetime
-from typing import Dict, Any, List
-
-# ----------------------------------------------------------------------
-# Optional resume parsing libraries (PDF + DOCX)
-# ----------------------------------------------------------------------
-try:
-    # Preferred modern library
-    from pypdf import PdfReader  # type: ignore
-except ImportError:
-    try:
-        # Legacy library, in case only PyPDF2 is installed
-        from PyPDF2 import PdfReader  # type: ignore
-    except ImportError:
-        PdfReader = None  # type: ignore
-
-try:
-    import docx  # python-docx
-except ImportError:
-    docx = None  # type: ignore
+import heapq
+import shutil
+import tempfile
+from typing import Dict, Any, List, Optional
 
+from app.services.skill_matcher import get_matcher
+from app.services.visa_rules import VisaFilter
+from app.services.harvester import harvest_sync
+from app.services.resume_extract import ResumeExtractError, ResumeExtractor
 
 # ======================================================================
 # CONFIGURATION CONSTANTS
@@ -61,6 +50,9 @@ THEIRSTACK_API_KEY = (
 
 THEIRSTACK_URL = "https://api.theirstack.com/v1/jobs/search"
 
+# Pages of `limit` jobs pulled per run; each page costs API credits
+MAX_PAGES = int(os.getenv("SKILLSCOUT_MAX_PAGES", "1"))
+
 
 # ======================================================================
 # PHASE 1 — USER INPUT
@@ -188,7 +180,8 @@ def build_job_search_body(config: Dict[str, Any]):
         "min_salary_usd": float(min_salary) if min_salary else None,
         "remote": remote_pref,
         "job_seniority_or": seniority_filters,
-        "limit": 25
+        # Page size; MAX_PAGES pages are pulled
+        "limit": prefs.get("page_size", 25)
     }
 
     clean_body = {k: v for k, v in body.items() if v not in [None, [], ""]}
@@ -213,44 +206,118 @@ def call_theirstack_job_search(body: Dict[str, Any]) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
+def iter_theirstack_jobs(body: Dict[str, Any], max_pages: int = MAX_PAGES):
+    """
+    Yield jobs page by page, so only a few pages of the response are in memory.
+
+    The next pages are prefetched concurrently while the current one is
+    consumed (app.services.harvester). Stops after `max_pages` or at the
+    last page. An error is printed and re-raised, so a truncated pull is
+    never taken for a complete one.
+    """
+    base_url = THEIRSTACK_URL.split("/v1/")[0]
+    try:
+        yield from harvest_sync(
+            body, max_pages=max_pages, checkpoint_dir=None,
+            client_kwargs={"api_key": THEIRSTACK_API_KEY, "base_url": base_url},
+        )
+    except Exception as e:
+        print(f"[ERROR] Failed API request: {e}")
+        raise
+
+
 # ======================================================================
 # PHASE 1 — RANK JOBS BY SKILL MATCH
 # ======================================================================
 
-def rank_jobs(jobs: List[Dict[str, Any]], skills: List[str]):
-    ranked = []
-    skills = [s.lower() for s in skills]
+def job_record(job: Dict[str, Any], matched) -> Dict[str, Any]:
+    """Ranked-job record built from a raw TheirStack job and its matched skills"""
+    return {
+        "title": job.get("job_title", ""),
+        "company": job.get("company_name") or job.get("company") or "",
+        "location": (
+            job.get("long_location")
+            or job.get("location")
+            or job.get("short_location")
+            or ""
+        ),
+        "url": job.get("final_url") or job.get("url") or "",
+        "score": len(matched),
+        "matched_skills": sorted(set(matched)),
+        # Keep raw description for visa filter (Phase 3.5)
+        "description": job.get("description", "") or ""
+    }
 
-    for job in jobs:
+
+def rank_jobs(jobs: List[Dict[str, Any]], skills: List[str], top_k: Optional[int] = None):
+    """
+    Rank jobs by how many profile skills appear in title + description.
+
+    Skills are matched on word boundaries by one compiled matcher per skill
+    list ("r" does not match inside "react"), one pass per job.
+
+    With top_k set, only the k best jobs are kept (bounded heap instead of a
+    full sort) and only those get their result record built.
+    """
+    matcher = get_matcher(tuple(skills))
+
+    scored = []
+    for i, job in enumerate(jobs):
         title = job.get("job_title", "")
         desc = job.get("description", "")
-        combined = f"{title} {desc}".lower()
-
-        score = 0
-        matched = []
-
-        for s in skills:
-            if s and s in combined:
-                score += 1
-                matched.append(s)
-
-        ranked.append({
-            "title": job.get("job_title", ""),
-            "company": job.get("company_name") or job.get("company") or "",
-            "location": (
-                job.get("long_location")
-                or job.get("location")
-                or job.get("short_location")
-                or ""
-            ),
-            "url": job.get("final_url") or job.get("url") or "",
-            "score": score,
-            "matched_skills": sorted(set(matched)),
-            # Keep raw description for visa filter (Phase 3.5)
-            "description": desc or ""
-        })
+        combined = f"{title} {desc}"
+
+        matched = list(matcher.matched(combined))
+        # index breaks ties so the heap never has to compare job dicts
+        scored.append((-len(matched), title, i, matched, job))
+
+    if top_k is not None:
+        scored = heapq.nsmallest(top_k, scored, key=lambda x: (x[0], x[1], x[2]))
+    else:
+        scored.sort(key=lambda x: (x[0], x[1], x[2]))
+
+    return [job_record(job, matched) for _, _, _, matched, job in scored]
 
-    return sorted(ranked, key=lambda x: (-x["score"], x["title"]))
+
+def score_jobs(jobs, skills: List[str]):
+    """Streaming form of rank_jobs: yield each job's record as it arrives, unsorted"""
+    matcher = get_matcher(tuple(skills))
+    for job in jobs:
+        combined = f"{job.get('job_title', '')} {job.get('description', '')}"
+        yield job_record(job, matcher.matched(combined))
+
+
+class _Descending(str):
+    """String that sorts in reverse, for the title tie-break in TopJobs"""
+
+    def __lt__(self, other):
+        return str.__gt__(self, other)
+
+    def __gt__(self, other):
+        return str.__lt__(self, other)
+
+
+class TopJobs:
+    """
+    The n best job records seen so far, in rank_jobs order (score, then
+    title, then arrival), kept in a bounded heap.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.seen = 0
+        self._heap: List[Any] = []  # root is the worst job kept
+
+    def push(self, job: Dict[str, Any]) -> None:
+        entry = (job["score"], _Descending(job["title"]), -self.seen, job)
+        self.seen += 1
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif self._heap[0][:3] < entry[:3]:
+            heapq.heapreplace(self._heap, entry)
+
+    def ranked(self) -> List[Dict[str, Any]]:
+        return [e[3] for e in sorted(self._heap, key=lambda e: e[:3], reverse=True)]
 
 
 # ======================================================================
@@ -376,34 +443,21 @@ def export_results(result: Dict[str, Any], folder="skillscout_output", top_n=10)
 # PHASE 2.5 — RESUME SKILL EXTRACTION
 # ======================================================================
 
-def extract_text_from_pdf(path: str) -> str:
-    if PdfReader is None:
-        print("[PHASE 2.5] WARNING: No PDF library installed (pypdf / PyPDF2).")
-        return ""
+def _extract_file_text(path: str) -> str:
+    """Extracted text, cached by file content (app.services.resume_extract)"""
     try:
-        reader = PdfReader(path)
-        text = ""
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        return text.lower()
-    except Exception as e:
-        print(f"[PHASE 2.5] PDF read error: {e}")
+        return ResumeExtractor().extract(path)["text"].lower()
+    except (ResumeExtractError, OSError) as e:
+        print(f"[PHASE 2.5] Resume read error: {e}")
         return ""
 
 
+def extract_text_from_pdf(path: str) -> str:
+    return _extract_file_text(path)
+
+
 def extract_text_from_docx(path: str) -> str:
-    if docx is None:
-        print("[PHASE 2.5] WARNING: python-docx not installed; cannot read DOCX.")
-        return ""
-    try:
-        document = docx.Document(path)
-        full_text = [para.text for para in document.paragraphs]
-        return "\n".join(full_text).lower()
-    except Exception as e:
-        print(f"[PHASE 2.5] DOCX read error: {e}")
-        return ""
+    return _extract_file_text(path)
 
 
 def extract_resume_text(path: str) -> str:
@@ -416,31 +470,15 @@ def extract_resume_text(path: str) -> str:
         print(f"[PHASE 2.5] WARNING: Resume file not found at: {path}")
         return ""
 
-    if path.lower().endswith(".pdf"):
-        return extract_text_from_pdf(path)
-    elif path.lower().endswith(".docx"):
-        return extract_text_from_docx(path)
-    elif path.lower().endswith(".txt"):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                return f.read().lower()
-        except Exception as e:
-            print(f"[PHASE 2.5] TXT read error: {e}")
-            return ""
+    if not path.lower().endswith((".pdf", ".docx", ".txt")):
+        print("[PHASE 2.5] WARNING: Unsupported resume format (use PDF, DOCX, or TXT).")
+        return ""
 
-    print("[PHASE 2.5] WARNING: Unsupported resume format (use PDF, DOCX, or TXT).")
-    return ""
+    return _extract_file_text(path)
 
 
 def extract_skills_from_resume(resume_text: str, reference_skills: List[str]) -> List[str]:
-    resume_skills = []
-    text = resume_text.lower()
-
-    for skill in reference_skills:
-        if skill.lower() in text:
-            resume_skills.append(skill.lower())
-
-    return sorted(set(resume_skills))
+    return sorted(get_matcher(tuple(reference_skills)).matched(resume_text or ""))
 
 
 def integrate_resume_skills(result: Dict[str, Any]) -> Dict[str, Any]:
@@ -480,57 +518,18 @@ def filter_visa_eligibility(result: Dict[str, Any]) -> Dict[str, Any]:
     visa_status = result["user"].get("visa_status", "").lower()
     ranked_jobs = result["ranked"]
 
+    # Rules (phrases, negation context, severity) live in app/services/visa_rules.json
+    visa_filter = VisaFilter(visa_status)
+
     # US citizens / PR: everything allowed
-    if visa_status in [
-        "citizen", "us citizen", "u.s. citizen",
-        "pr", "green card", "green-card", "permanent resident",
-        "us citizen / pr", "citizen/pr"
-    ]:
+    if visa_filter.exempt:
         print("[PHASE 3.5] Status indicates US citizen / PR → all jobs eligible.")
         result["eligible_jobs"] = ranked_jobs
         result["ineligible_jobs"] = []
         return result
 
-    # Otherwise: apply visa restriction filters
-    visa_block_keywords = [
-        # citizenship / PR
-        "us citizen", "u.s. citizen", "citizen only",
-        "us person", "u.s. person",
-        "green card required", "permanent resident only",
-        "permanent resident",
-        # clearance / federal
-        "security clearance", "ts/sci", "top secret",
-        "dod clearance", "federal contractor",
-        # sponsorship bans
-        "no sponsorship", "cannot sponsor", "not able to sponsor",
-        "sponsorship not available",
-        "h1b not supported", "h-1b not supported",
-        "opt/cpt not accepted",
-        "must be authorized to work in the us without sponsorship",
-        "must be authorized to work in the united states without sponsorship"
-    ]
-
-    eligible, ineligible = [], []
-
-    for job in ranked_jobs:
-        combined = (
-            job["title"] + " " +
-            job["company"] + " " +
-            job.get("description", "")
-        ).lower()
-
-        failed = None
-        for kw in visa_block_keywords:
-            if kw in combined:
-                failed = f"Failed visa eligibility check due to: '{kw}'"
-                break
-
-        if failed:
-            j = job.copy()
-            j["ineligibility_reason"] = failed
-            ineligible.append(j)
-        else:
-            eligible.append(job)
+    eligible, ineligible = visa_filter.split(ranked_jobs)
+    result["visa_filter"] = visa_filter.stats()
 
     result["eligible_jobs"] = eligible
     result["ineligible_jobs"] = ineligible
@@ -543,40 +542,106 @@ def filter_visa_eligibility(result: Dict[str, Any]) -> Dict[str, Any]:
 # PHASE 3 — AUTOMATION (Daily & Weekly Job Pull Framework)
 # ======================================================================
 
-def save_daily_run(result: Dict[str, Any], folder: str = "history_daily"):
+class HistoryWriter:
+    """
+    Writes a history file ({..., "eligible_jobs": [...], "ineligible_jobs":
+    [...], "user": {...}}) one job at a time. Both lists are spooled to
+    temp files, so neither has to be held in memory. On close the eligible
+    jobs are copied out in rank_jobs order (score, then title, then
+    arrival), from a small in-memory index of sort keys and spool offsets;
+    ineligible jobs keep their arrival order. The file is written under a
+    .tmp name and moved into place when complete.
+    """
+
+    def __init__(self, path: str, header: Dict[str, Any], user: Dict[str, Any]):
+        self.path = path
+        self.user = user
+        self.counts = {True: 0, False: 0}
+        self._tmp_path = path + ".tmp"
+        self._f = open(self._tmp_path, "w", encoding="utf-8")
+        self._spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self._eligible = tempfile.TemporaryFile("w+b")
+        self._order: List[Any] = []  # (rank key, offset, length) per eligible job
+        self._f.write("{\n")
+        for k, v in header.items():
+            self._f.write(f"  {json.dumps(k)}: {json.dumps(v)},\n")
+        self._f.write('  "eligible_jobs": [')
+
+    def add(self, job: Dict[str, Any], eligible: bool = True) -> None:
+        if eligible:
+            line = json.dumps(job).encode("utf-8")
+            key = (-job.get("score", 0), job.get("title", ""), self.counts[True])
+            self._order.append((key, self._eligible.tell(), len(line)))
+            self._eligible.write(line)
+        else:
+            self._spool.write(("," if self.counts[False] else "") + "\n    " + json.dumps(job))
+        self.counts[eligible] += 1
+
+    def close(self) -> None:
+        self._order.sort(key=lambda e: e[0])
+        for i, (_, offset, length) in enumerate(self._order):
+            self._eligible.seek(offset)
+            self._f.write(("," if i else "") + "\n    " + self._eligible.read(length).decode("utf-8"))
+        self._eligible.close()
+        self._f.write('\n  ],\n  "ineligible_jobs": [')
+        self._spool.seek(0)
+        shutil.copyfileobj(self._spool, self._f)
+        self._f.write('\n  ],\n  "user": ' + json.dumps(self.user) + "\n}\n")
+        self._spool.close()
+        self._f.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        self._eligible.close()
+        self._spool.close()
+        self._f.close()
+        os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def open_daily_history(user: Dict[str, Any], folder: str = "history_daily") -> HistoryWriter:
     if not os.path.exists(folder):
         os.makedirs(folder)
 
     today = datetime.date.today().isoformat()
-    path = os.path.join(folder, f"jobs_{today}.json")
-
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({
-            "date": today,
-            "eligible_jobs": result.get("eligible_jobs", []),
-            "ineligible_jobs": result.get("ineligible_jobs", []),
-            "user": result["user"]
-        }, f, indent=2)
+    return HistoryWriter(os.path.join(folder, f"jobs_{today}.json"), {"date": today}, user)
 
-    print(f"[PHASE 3] Daily job report saved → {path}")
 
-
-def save_weekly_summary(result: Dict[str, Any], folder: str = "history_weekly"):
+def open_weekly_history(user: Dict[str, Any], folder: str = "history_weekly") -> HistoryWriter:
     if not os.path.exists(folder):
         os.makedirs(folder)
 
     week = datetime.date.today().isocalendar().week
-    path = os.path.join(folder, f"week_{week}.json")
+    return HistoryWriter(os.path.join(folder, f"week_{week}.json"), {"week": week}, user)
+
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({
-            "week": week,
-            "eligible_jobs": result.get("eligible_jobs", []),
-            "ineligible_jobs": result.get("ineligible_jobs", []),
-            "user": result["user"]
-        }, f, indent=2)
+def _write_history(history: HistoryWriter, result: Dict[str, Any]) -> None:
+    for job in result.get("eligible_jobs", []):
+        history.add(job, eligible=True)
+    for job in result.get("ineligible_jobs", []):
+        history.add(job, eligible=False)
 
-    print(f"[PHASE 3] Weekly summary saved → {path}")
+
+def save_daily_run(result: Dict[str, Any], folder: str = "history_daily"):
+    with open_daily_history(result["user"], folder) as history:
+        _write_history(history, result)
+
+    print(f"[PHASE 3] Daily job report saved → {history.path}")
+
+
+def save_weekly_summary(result: Dict[str, Any], folder: str = "history_weekly"):
+    with open_weekly_history(result["user"], folder) as history:
+        _write_history(history, result)
+
+    print(f"[PHASE 3] Weekly summary saved → {history.path}")
 
 
 # ======================================================================
@@ -741,38 +806,102 @@ def send_daily_email(result: Dict[str, Any], max_jobs: int = 10) -> None:
         print(f"[PHASE 4 ERROR] Failed to send via Outlook: {e}")
 
 # ======================================================================
-# MAIN EXECUTION
+# STREAMING PIPELINE — FETCH → RANK → VISA FILTER → EXPORT / HISTORY
 # ======================================================================
 
-if __name__ == "__main__":
-    # Phase 1 — core flow (scrape + rank)
-    result = run_skillscout(USER_CONFIG_PATH)
+# Ineligible jobs kept for the terminal / email summary (all of them go to history)
+REMOVED_PREVIEW = 25
+
+
+def run_pipeline(config_path: str = USER_CONFIG_PATH, top_n: int = 10, max_pages: int = MAX_PAGES) -> Dict[str, Any]:
+    """
+    Phases 1 → 3 as one streaming pass over paged TheirStack results.
+
+    Jobs go through scoring and the visa filter one at a time and are
+    written to the daily / weekly history as they arrive. Only the top_n
+    eligible jobs (bounded heap) and the first REMOVED_PREVIEW ineligible
+    ones are kept, so memory stays flat however many pages are pulled.
+    """
+    print("\n[PHASE 1] Starting core SkillScout pipeline...")
+    user = prompt_user_info()
+    config = load_user_config(config_path)
+
+    print("\n=== TheirStack Search Body ===")
+    body, skills = build_job_search_body(config)
+    print(json.dumps(body, indent=2))
+
+    # Phase 2.5 — resume enrichment does not depend on the jobs, so it runs first
+    result = integrate_resume_skills({"user": user, "config": config})
+
+    print("\n=== Calling TheirStack API ===")
+    scored = score_jobs(iter_theirstack_jobs(body, max_pages=max_pages), skills)
+
+    # Phase 3.5 — visa eligibility, applied as jobs stream past
+    visa_filter = VisaFilter(user.get("visa_status", "").lower())
+    if visa_filter.exempt:
+        print("[PHASE 3.5] Status indicates US citizen / PR → all jobs eligible.")
 
-    # Phase 2.5 — resume enrichment (optional)
-    result = integrate_resume_skills(result)
+    top = TopJobs(top_n)
+    removed: List[Dict[str, Any]] = []
 
-    # Phase 3.5 — visa eligibility filtering
-    result = filter_visa_eligibility(result)
+    # Phase 3 — history files are written as the jobs arrive; a failed pull discards them
+    try:
+        with open_daily_history(user) as daily, open_weekly_history(user) as weekly:
+            for eligible, job in visa_filter.stream(scored):
+                daily.add(job, eligible)
+                weekly.add(job, eligible)
+                if eligible:
+                    top.push(job)
+                elif len(removed) < REMOVED_PREVIEW:
+                    removed.append(job)
+    except Exception as e:
+        print(f"[ERROR] Job pull stopped after {visa_filter.scanned} jobs; history files not saved.")
+        result.update({"eligible_jobs": [], "ineligible_jobs": [], "error": str(e)})
+        return result
 
-    # Phase 1 / 2 — print and export only ELIGIBLE jobs
+    print(f"[PHASE 1] Jobs retrieved and ranked: {visa_filter.scanned}")
+    print(f"[PHASE 3.5] Eligible jobs: {daily.counts[True]} | Ineligible: {daily.counts[False]}")
+    print(f"[PHASE 3] Daily job report saved → {daily.path}")
+    print(f"[PHASE 3] Weekly summary saved → {weekly.path}")
+
+    result.update({
+        "eligible_jobs": top.ranked(),
+        "ineligible_jobs": removed,
+        "eligible_count": daily.counts[True],
+        "ineligible_count": daily.counts[False],
+        "visa_filter": visa_filter.stats(),
+    })
+    return result
+
+
+# ======================================================================
+# MAIN EXECUTION
+# ======================================================================
+
+if __name__ == "__main__":
+    # Phases 1 → 3 — fetch, rank, resume enrichment, visa filter and history logging, streamed
+    result = run_pipeline(USER_CONFIG_PATH, top_n=10)
+    if "error" in result:
+        raise SystemExit(1)
+
+    # Phase 1 / 2 — print and export only ELIGIBLE jobs (already the ranked top 10)
     eligible_result = {
         "user": result["user"],
-        "ranked": result.get("eligible_jobs", [])
+        "ranked": result["eligible_jobs"]
     }
 
     print_top_jobs(eligible_result, top_n=10)
     export_results(eligible_result, top_n=10)
 
-    # Phase 3 — logging
-    save_daily_run(result)
-    save_weekly_summary(result)
-
     # Phase 4 — save Outlook-ready email drafts (HTML + text)
     save_email_draft(result, max_jobs=10)
 
     # Show removed jobs (if any)
-    if result.get("ineligible_jobs"):
+    if result["ineligible_jobs"]:
         print("\n=== Jobs Removed Due to Visa Restrictions ===\n")
         for j in result["ineligible_jobs"]:
             print(f"{j['title']} @ {j['company']}")
             print(f"Reason: {j['ineligibility_reason']}\n")
+        more = result["ineligible_count"] - len(result["ineligible_jobs"])
+        if more > 0:
+            print(f"... and {more} more (see the daily history file)")
@@ -0,0 +1,285 @@
+"""
+Database engines, request-scoped sessions and connection-pool metrics.
+
+Sync routes take ``db: Session = Depends(get_db)``. Async routes take
+``db: AsyncSession = Depends(get_async_db)``, which runs on an asyncio engine
+(asyncpg for PostgreSQL, aiosqlite for SQLite) so waiting on the database
+does not hold a threadpool worker. Either session is closed (and rolled
+back if the route raised) when the request finishes. Tables are created
+once by init_db() at startup.
+"""
+import os
+import time
+import threading
+from collections import deque
+from typing import AsyncIterator, Iterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./jobfinder.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))      # seconds to wait for a connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))      # seconds before a connection is replaced
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def _sqlite_pragmas(dbapi_conn, _record) -> None:
+    """WAL lets readers run during a write; busy_timeout waits for locks instead of failing"""
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.close()
+
+
+def make_engine(url: str = DATABASE_URL) -> Engine:
+    """Engine with the pool settings for the database backend in `url`"""
+    if url.startswith("sqlite"):
+        eng = create_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        )
+        event.listen(eng, "connect", _sqlite_pragmas)
+        return eng
+    connect_args = {"connect_timeout": 10} if url.startswith("postgresql") else {}
+    return create_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+def async_url(url: str) -> str:
+    """Same database through its asyncio driver"""
+    for prefix, driver in (("postgresql+psycopg2://", "postgresql+asyncpg://"),
+                           ("postgresql://", "postgresql+asyncpg://"),
+                           ("postgres://", "postgresql+asyncpg://"),
+                           ("sqlite:///", "sqlite+aiosqlite:///")):
+        if url.startswith(prefix):
+            return driver + url[len(prefix):]
+    return url
+
+
+def make_async_engine(url: str = DATABASE_URL) -> AsyncEngine:
+    """Asyncio engine with the same pool settings as make_engine"""
+    url = async_url(url)
+    if url.startswith("sqlite"):
+        eng = create_async_engine(url, connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000})
+        event.listen(eng.sync_engine, "connect", _sqlite_pragmas)
+        return eng
+    return create_async_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={"timeout": 10} if url.startswith("postgresql+asyncpg") else {},
+    )
+
+
+engine = make_engine()
+SessionLocal = sessionmaker(bind=engine)
+
+# Created on first use so importing this module does not require the async drivers
+_async_engine: Optional[AsyncEngine] = None
+_AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        _async_engine = make_async_engine()
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    get_async_engine()
+    return _AsyncSessionLocal()
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine, _AsyncSessionLocal = None, None
+
+
+def dialect_insert(dialect_name: str):
+    """insert() with on_conflict_do_update for PostgreSQL and SQLite, None for other backends"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def init_db() -> None:
+    """Create any missing tables, and add columns/indexes that were added to existing tables"""
+    from .models import Base
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns(Base.metadata)
+
+
+def _add_missing_columns(metadata) -> None:
+    """
+    create_all skips tables that already exist; add new nullable columns and their indexes.
+
+    Each column and index is its own transaction, so one failure (e.g. an
+    index the existing data cannot carry) does not roll back the others.
+    """
+    from sqlalchemy import inspect, text
+    insp = inspect(engine)
+    existing_tables = set(insp.get_table_names())
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        columns = {c["name"]: c for c in insp.get_columns(table.name)}
+        for col in table.columns:
+            if col.name not in columns and col.nullable:
+                col_type = col.type.compile(dialect=engine.dialect)
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}"))
+                    print(f"✅ Added column {table.name}.{col.name}")
+                except Exception as e:
+                    print(f"❌ Could not add column {table.name}.{col.name}: {e}")
+        for index in table.indexes:
+            if not _gin_columns_ready(index, columns):
+                continue
+            try:
+                with engine.begin() as conn:
+                    index.create(conn, checkfirst=True)
+            except Exception as e:
+                print(f"⚠️ Skipped index {index.name}: {e}")
+
+
+def _gin_columns_ready(index, columns: dict) -> bool:
+    """
+    PostgreSQL GIN indexes need JSONB; tables created before the JSONB columns
+    have json ones. Convert those first, or skip the index if that fails.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.dialects.postgresql import JSON as PG_JSON, JSONB
+    if engine.dialect.name != "postgresql" or index.dialect_options["postgresql"].get("using") != "gin":
+        return True
+    for col in index.columns:
+        existing = columns.get(col.name)
+        if existing is None or isinstance(existing["type"], JSONB) or not isinstance(existing["type"], PG_JSON):
+            continue
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {index.table.name} ALTER COLUMN {col.name} TYPE JSONB USING {col.name}::jsonb"
+                ))
+            print(f"✅ Converted {index.table.name}.{col.name} to JSONB")
+        except Exception as e:
+            print(f"⚠️ Skipped index {index.name}: {index.table.name}.{col.name} is json, not jsonb ({e})")
+            return False
+    return True
+
+
+# ===== POOL METRICS =====
+
+class PoolMetrics:
+    """Checkout latency (time spent waiting for a pooled connection) and saturation"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._latencies.append(seconds * 1000)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self, eng: Engine) -> dict:
+        with self._lock:
+            lat = sorted(self._latencies)
+        pool = eng.pool
+        checked_out = pool.checkedout() if hasattr(pool, "checkedout") else None
+        size = pool.size() if hasattr(pool, "size") else None
+        max_overflow = getattr(pool, "_max_overflow", None)
+        capacity = size + max_overflow if size is not None and max_overflow is not None and max_overflow >= 0 else None
+        return {
+            "pool": type(pool).__name__,
+            "size": size,
+            "checked_out": checked_out,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "capacity": capacity,
+            "saturation": round(checked_out / capacity, 3) if capacity and checked_out is not None else None,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "checkout_ms_avg": round(sum(lat) / len(lat), 3) if lat else None,
+            "checkout_ms_p95": round(lat[int(0.95 * (len(lat) - 1))], 3) if lat else None,
+            "checkout_ms_max": round(lat[-1], 3) if lat else None,
+        }
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+def get_db() -> Iterator[Session]:
+    """FastAPI dependency: one session per request, always closed"""
+    db = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        try:
+            db.connection()  # check out now so the wait for a pooled connection is measured
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record(time.perf_counter() - t0)
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: one AsyncSession per request, always closed"""
+    db = AsyncSessionLocal()
+    try:
+        t0 = time.perf_counter()
+        try:
+            await db.connection()
+        except PoolTimeoutError:
+            async_pool_metrics.record_timeout()
+            raise
+        async_pool_metrics.record(time.perf_counter() - t0)
+        yield db
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+def pool_stats(eng: Optional[Engine] = None) -> dict:
+    return pool_metrics.stats(eng or engine)
+
+
+def async_pool_stats() -> Optional[dict]:
+    return async_pool_metrics.stats(_async_engine.sync_engine) if _async_engine is not None else None
@@ -4,27 +4,26 @@ Run this to ensure all database tables are created.
 """
 import os
 import sys
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+from app.db import make_engine
+
 def init_database():
     """Initialize database tables"""
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./jobfinder.db")
     
     print(f"Connecting to database: {DATABASE_URL.split('@')[-1] if '@' in DATABASE_URL else DATABASE_URL}")
     
-    if DATABASE_URL.startswith("postgresql"):
-        engine = create_engine(DATABASE_URL, pool_pre_ping=True, connect_args={"connect_timeout": 10})
-    else:
-        engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    engine = make_engine(DATABASE_URL)
     
     try:
         # Import models to register them with Base
         from app.models import Base
-        from app.models import UserProfile, UserPreferences, UserUpload
+        from app.models import UserProfile, UserPreferences, UserUpload, JobPosting, JobRefreshWatermark
         
         # Create all tables
         Base.metadata.create_all(bind=engine)
@@ -48,7 +47,7 @@ def init_database():
             print(f"📊 Created tables: {', '.join(tables)}")
             
             # Check if tables have the expected structure
-            expected_tables = ['user_profiles', 'user_preferences', 'user_uploads']
+            expected_tables = ['user_profiles', 'user_preferences', 'user_uploads', 'jobs', 'job_refresh_watermarks']
             missing = [t for t in expected_tables if t not in tables]
             if missing:
                 print(f"⚠️  Warning: Missing tables: {', '.join(missing)}")
@@ -25,6 +25,7 @@ CREATE TABLE IF NOT EXISTS user_preferences (
     target_skills JSON,
     industry VARCHAR(255),
     location_preference VARCHAR(255),
+    remote BOOLEAN,
     salary_min INTEGER,
     salary_max INTEGER,
     preferences_data JSON,
@@ -33,6 +34,8 @@ CREATE TABLE IF NOT EXISTS user_preferences (
 );
 
 CREATE INDEX IF NOT EXISTS idx_user_preferences_user_id ON user_preferences(user_id);
+CREATE INDEX IF NOT EXISTS ix_user_preferences_location_preference ON user_preferences(location_preference);
+CREATE INDEX IF NOT EXISTS ix_user_preferences_remote_salary_min ON user_preferences(remote, salary_min);
 
 -- User Uploads table
 CREATE TABLE IF NOT EXISTS user_uploads (
@@ -48,3 +51,29 @@ CREATE TABLE IF NOT EXISTS user_uploads (
 
 CREATE INDEX IF NOT EXISTS idx_user_uploads_user_id ON user_uploads(user_id);
 
+-- Jobs table (TheirStack postings, upserted by id)
+CREATE TABLE IF NOT EXISTS jobs (
+    id VARCHAR(64) PRIMARY KEY,
+    title VARCHAR(500) NOT NULL,
+    company VARCHAR(255),
+    location VARCHAR(255),
+    url VARCHAR(1000),
+    description TEXT,
+    posted_at DATE,
+    source VARCHAR(50),
+    content_hash VARCHAR(64) NOT NULL,
+    first_seen DATETIME DEFAULT CURRENT_TIMESTAMP,
+    last_seen DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_jobs_posted_at ON jobs(posted_at);
+CREATE INDEX IF NOT EXISTS ix_jobs_company ON jobs(company);
+CREATE INDEX IF NOT EXISTS ix_jobs_location ON jobs(location);
+
+-- Incremental refresh watermarks (newest posted_at fetched per search)
+CREATE TABLE IF NOT EXISTS job_refresh_watermarks (
+    query_key VARCHAR(64) PRIMARY KEY,
+    watermark DATE NOT NULL,
+    last_run_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    jobs_seen INTEGER DEFAULT 0
+);
@@ -1,7 +1,212 @@
 """TheirStack job search integration"""
-from typing import List
+import os
+import json
+import random
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional
+
+import httpx
+
 from ..schemas import Job, UserProfile, UserPreferences
 
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+THEIRSTACK_API_KEY = os.getenv("THEIRSTACK_API_KEY", "")
+THEIRSTACK_BASE_URL = os.getenv("THEIRSTACK_BASE_URL", "https://api.theirstack.com")
+THEIRSTACK_TIMEOUT = float(os.getenv("THEIRSTACK_TIMEOUT", "20"))
+THEIRSTACK_MAX_RETRIES = int(os.getenv("THEIRSTACK_MAX_RETRIES", "3"))
+THEIRSTACK_MAX_CONNECTIONS = int(os.getenv("THEIRSTACK_MAX_CONNECTIONS", "20"))
+
+JOBS_SEARCH_PATH = "/v1/jobs/search"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TheirStackError(Exception):
+    """TheirStack request failed after retries"""
+
+
+class TheirStackClient:
+    """
+    Async TheirStack client on one pooled httpx.AsyncClient.
+
+    Connections are kept alive and reused across requests (HTTP/2 when the
+    `h2` package is installed). Timeouts, transport errors and 429/5xx
+    responses are retried with exponential backoff and jitter, honouring
+    Retry-After when the server sends it.
+    """
+
+    def __init__(self, api_key: str = THEIRSTACK_API_KEY, base_url: str = THEIRSTACK_BASE_URL,
+                 timeout: float = THEIRSTACK_TIMEOUT, max_retries: int = THEIRSTACK_MAX_RETRIES,
+                 backoff: float = 0.5, max_connections: int = THEIRSTACK_MAX_CONNECTIONS):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(timeout, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0,
+            ),
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+        )
+        self.requests_sent = 0
+        self.retries = 0
+
+    async def _post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        last_error: Optional[str] = None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                self.requests_sent += 1
+                resp = await self._client.post(path, json=body)
+                if resp.status_code not in RETRY_STATUSES:
+                    resp.raise_for_status()
+                    try:
+                        return resp.json()
+                    except ValueError as e:
+                        raise TheirStackError(f"Invalid JSON response: {e}; body: {resp.text[:200]}") from e
+                last_error = f"HTTP {resp.status_code}: {resp.text[:200]}"
+                retry_after = resp.headers.get("Retry-After")
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                last_error = f"{type(e).__name__}: {e}"
+            except httpx.HTTPStatusError as e:
+                # 4xx other than 429 will not succeed on retry
+                raise TheirStackError(f"HTTP {e.response.status_code}: {e.response.text[:200]}") from e
+
+            if attempt == self.max_retries:
+                break
+            self.retries += 1
+            delay = self.backoff * (2 ** attempt) * (1 + random.random())
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            await asyncio.sleep(delay)
+        raise TheirStackError(f"TheirStack request failed after {self.max_retries + 1} attempts: {last_error}")
+
+    async def search_jobs_raw(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /v1/jobs/search with a JobSearchFilters body"""
+        return await self._post(JOBS_SEARCH_PATH, body)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> dict:
+        return {"requests": self.requests_sent, "retries": self.retries, "http2": HTTP2_AVAILABLE}
+
+
+_client: Optional[TheirStackClient] = None
+
+
+def is_configured() -> bool:
+    return bool(THEIRSTACK_API_KEY)
+
+
+def get_client() -> TheirStackClient:
+    """Process-wide pooled client"""
+    global _client
+    if _client is None:
+        _client = TheirStackClient()
+    return _client
+
+
+def client_stats() -> dict:
+    return _client.stats() if _client is not None else {"requests": 0, "retries": 0, "http2": HTTP2_AVAILABLE}
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# ===== REQUEST / RESPONSE MAPPING =====
+
+def map_experience_to_seniority(exp_level: str) -> List[str]:
+    """Map our experience string to TheirStack seniority enums"""
+    if not exp_level:
+        return []
+    e = exp_level.lower()
+    if "mid" in e and "senior" in e:
+        return ["mid_level", "senior"]
+    if "mid" in e:
+        return ["mid_level"]
+    if "senior" in e:
+        return ["senior"]
+    if "junior" in e or "entry" in e:
+        return ["junior"]
+    if "c-level" in e or "c level" in e or "executive" in e:
+        return ["c_level"]
+    return []
+
+
+def location_pattern(user_preferences: UserPreferences) -> str:
+    loc = user_preferences.location
+    if loc.city and loc.state:
+        return f"{loc.city}, {loc.state}".lower()
+    return (loc.city or loc.state or loc.country or "").lower()
+
+
+def build_search_body(user_profile: UserProfile, user_preferences: UserPreferences,
+                      limit: int = 50) -> Dict[str, Any]:
+    """JobSearchFilters body for a profile + preferences"""
+    loc = user_preferences.location
+    salary = user_preferences.salary
+    pattern = location_pattern(user_preferences)
+    body = {
+        "job_title_or": user_profile.target_titles,
+        "job_location_pattern_or": [pattern] if pattern and not loc.remote else [],
+        "job_country_code_or": [loc.country.upper()] if len(loc.country or "") == 2 else [],
+        "posted_at_max_age_days": user_preferences.job_age_limit_days,
+        "min_salary_usd": salary.min if salary else None,
+        "max_salary_usd": salary.max if salary else None,
+        "remote": True if loc.remote else None,
+        "job_seniority_or": map_experience_to_seniority(user_profile.experience_level),
+        "employment_statuses_or": [e.replace("-", "_") for e in user_preferences.employment_type],
+        "job_description_pattern_not": user_preferences.exclude_keywords,
+        "company_name_not": user_preferences.company_preferences.avoid,
+        "limit": limit,
+    }
+    return {k: v for k, v in body.items() if v not in (None, [], "")}
+
+
+def job_id(raw: Dict[str, Any]) -> str:
+    """TheirStack id, else a stable hash of the job URL (or of its content when there is no URL)"""
+    if raw.get("id") not in (None, ""):
+        return str(raw["id"])
+    key = raw.get("final_url") or raw.get("url") or raw.get("source_url")
+    if not key:
+        fields = ("job_title", "company", "company_object", "location", "description", "date_posted")
+        key = json.dumps({k: raw.get(k) for k in fields}, sort_keys=True, default=str)
+    return "sha256:" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def to_job(raw: Dict[str, Any]) -> Job:
+    """Map a TheirStack job object onto our Job schema"""
+    company = raw.get("company") or (raw.get("company_object") or {}).get("name") or ""
+    return Job(
+        id=job_id(raw),
+        title=raw.get("job_title") or "",
+        company=company,
+        location=raw.get("long_location") or raw.get("location") or raw.get("short_location") or "",
+        url=raw.get("final_url") or raw.get("url") or raw.get("source_url") or "",
+        description=raw.get("description") or "",
+        posted_at=raw.get("date_posted"),
+        source="theirstack",
+    )
+
 
 async def search_jobs(
     user_profile: UserProfile,
@@ -9,5 +214,6 @@ async def search_jobs(
     limit: int = 50
 ) -> List[Job]:
     """Search jobs using TheirStack API"""
-    # TODO: Implement actual TheirStack API integration
-    return []
+    body = build_search_body(user_profile, user_preferences, limit)
+    data = await get_client().search_jobs_raw(body)
+    return [to_job(raw) for raw in data.get("data", [])]
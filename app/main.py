@@ -1,42 +1,134 @@
 # app/main.py - SkillScout API
-import os
 from dotenv import load_dotenv
-from fastapi import FastAPI, Body
-from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from typing import Dict, Any, Optional
-from pydantic import BaseModel
-from .schemas import MatchInput, UserProfile, UserPreferences, SearchRequest
-from .services.matching import compute_match
 
-# Load environment variables
+# Load environment variables (before app modules read their settings)
 load_dotenv()
 
-# Database setup
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./jobfinder.db")
-if DATABASE_URL.startswith("postgresql"):
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True, connect_args={"connect_timeout": 10})
-else:
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-
-SessionLocal = sessionmaker(bind=engine)
-
-# Import models
-try:
-    from .models import Base, UserProfile as UserProfileModel
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables initialized successfully")
-except Exception as e:
-    print(f"❌ DB init warning: {e}")
-    import traceback
-    traceback.print_exc()
+from fastapi import FastAPI, Body, Depends, File, Form, UploadFile
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+import threading
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel
+from .schemas import MatchInput, BatchMatchInput, TopMatchInput, MatchSessionEdit, UserProfile, UserPreferences, SearchRequest
+from .services.matching import compute_match, compute_match_batch, token_cache_stats
+from .services.tfidf_model import load_model, get_model_version
+from .services.job_index import job_index
+from .services.semantic import get_semantic_engine, profile_query_text, rank_search_results, semantic_stats, top_matches
+from .services.worker_pool import start_pool, shutdown_pool, pool_size, run_scoring
+from .services.match_session import create_session, get_session, close_session, session_stats
+from .services import search_planner
+from .services.search_cache import fingerprint, get_search_cache
+from .services.single_flight import SingleFlight
+from .services.health import HealthMonitor
+from .services.profile_store import upsert_profile, upsert_profiles, find_alert_recipients
+from .services.job_store import upsert_jobs, refresh_jobs, iter_jobs, job_count, get_descriptions
+from .services.resume_extract import ResumeExtractError, get_extractor, shutdown_page_pool
+from .integrations import theirstack
+from .db import SessionLocal, get_db, get_async_db, init_db, pool_stats, async_pool_stats, dispose_async_engine
+from .models import UserProfile as UserProfileModel
 
 # Create FastAPI app
 app = FastAPI(title="SkillScout API")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
+def _readiness_details() -> dict:
+    return {
+        "db_pool": pool_stats(),
+        "theirstack": {"configured": theirstack.is_configured(), **theirstack.client_stats()},
+        "tfidf_model": get_model_version(),
+        "match_workers": pool_size(),
+    }
+
+health_monitor = HealthMonitor(SessionLocal, extra=_readiness_details)
+
+# Concurrent identical /search and /match requests share one computation
+_search_flight = SingleFlight()
+_match_flight = SingleFlight()
+
+
+@app.on_event("startup")
+def create_tables():
+    """Create database tables once, before anything reads them"""
+    try:
+        init_db()
+        print("✅ Database tables initialized successfully")
+    except Exception as e:
+        print(f"❌ DB init warning: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+@app.on_event("startup")
+def load_matching_model():
+    """Load the corpus-fitted TF-IDF model once for all /match requests"""
+    try:
+        if load_model() is not None:
+            print("✅ TF-IDF model loaded")
+        else:
+            print("⚠️ No TF-IDF model found; run `python -m app.services.tfidf_model fit` to create one")
+    except Exception as e:
+        print(f"❌ TF-IDF model load warning: {e}")
+
+
+@app.on_event("startup")
+def load_stored_jobs():
+    """Rebuild the in-memory keyword index from the persistent job store"""
+    try:
+        with SessionLocal() as db:
+            job_index.add_many((job_id, description) for job_id, _, description in iter_jobs(db))
+        if len(job_index):
+            print(f"✅ Job index loaded from store ({len(job_index)} jobs)")
+    except Exception as e:
+        print(f"❌ Job store load warning: {e}")
+
+
+@app.on_event("startup")
+def start_match_workers():
+    """Pre-warm the scoring worker processes (MATCH_WORKERS > 0)"""
+    try:
+        if start_pool() is not None:
+            print(f"✅ Match worker pool started ({pool_size()} processes)")
+    except Exception as e:
+        print(f"❌ Match worker pool warning: {e}")
+
+
+@app.on_event("startup")
+async def start_health_monitor():
+    """First dependency probe, then keep the health snapshot fresh in the background"""
+    await health_monitor.refresh()
+    health_monitor.start()
+
+
+@app.on_event("shutdown")
+async def stop_health_monitor():
+    await health_monitor.stop()
+
+
+@app.on_event("shutdown")
+def stop_match_workers():
+    shutdown_pool()
+
+
+@app.on_event("shutdown")
+def stop_resume_page_workers():
+    shutdown_page_pool()
+
+
+@app.on_event("shutdown")
+async def close_async_db():
+    await dispose_async_engine()
+
+
+@app.on_event("shutdown")
+async def close_theirstack_client():
+    """Close pooled TheirStack connections"""
+    await theirstack.close_client()
+
 # ===== PYDANTIC MODELS =====
 class ProfileData(BaseModel):
     name: Optional[str] = None
@@ -52,42 +144,62 @@ class ProfileData(BaseModel):
 # ===== ENDPOINTS =====
 
 @app.get("/")
-def root():
+async def root():
     """Root endpoint"""
-    # Check database connection
-    db_status = "connected"
-    try:
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
-    except Exception as e:
-        db_status = f"error: {str(e)}"
-    
     return {
         "status": "running", 
         "api": "SkillScout",
-        "database": db_status
+        "database": health_monitor.snapshot()["database"]
     }
 
+@app.get("/livez")
+async def livez():
+    """Liveness: the process is serving requests (no I/O)"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness from the cached dependency probe; 503 if the DB is down or the probe is stale"""
+    snap = health_monitor.snapshot()
+    ready = snap["ready"] and not snap["stale"]
+    return JSONResponse(status_code=200 if ready else 503, content={**snap, "ready": ready})
+
 @app.get("/health")
-def health():
-    """Health check with database status"""
-    try:
-        db = SessionLocal()
-        # Test database connection
-        db.execute(text("SELECT 1"))
-        db.close()
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "api": "SkillScout"
-        }
-    except Exception as e:
-        return {
-            "status": "degraded",
-            "database": f"error: {str(e)}",
-            "api": "SkillScout"
-        }
+async def health():
+    """Health check with database status (cached snapshot, refreshed in the background)"""
+    snap = health_monitor.snapshot()
+    return {
+        "status": snap["status"],
+        "database": snap["database"],
+        "api": "SkillScout",
+        "checked_at": snap.get("checked_at")
+    }
+
+@app.get("/metrics")
+def metrics():
+    """Runtime counters for monitoring"""
+    return {
+        # Each match worker keeps its own token cache; these counters are the API process's only
+        "token_cache": {**token_cache_stats(), "scope": "api_process" if pool_size() else "all"},
+        "job_index": job_index.stats(),
+        "semantic": semantic_stats(),
+        "match_workers": pool_size(),
+        "match_sessions": session_stats(),
+        "theirstack": theirstack.client_stats(),
+        "search_cache": get_search_cache().stats(),
+        "single_flight": {"search": _search_flight.stats(), "match": _match_flight.stats()},
+        "job_store": _job_store_count(),
+        "db_pool": pool_stats(),
+        "db_pool_async": async_pool_stats(),
+        "resume_extract": get_extractor().stats()
+    }
+
+def _job_store_count() -> int:
+    try:
+        with SessionLocal() as db:
+            return job_count(db)
+    except Exception:
+        return -1
 
 @app.get("/test")
 def test_endpoint():
@@ -97,19 +209,26 @@ def test_endpoint():
         "endpoints": {
             "GET /profile/{user_id}": "Fetch user profile",
             "POST /profile/{user_id}": "Save user profile (send JSON body)",
+            "POST /profiles/bulk": "Upsert many profiles at once",
+            "GET /alerts/recipients": "Users whose preferences match an alert",
+            "GET /livez": "Liveness probe (no I/O)",
+            "GET /readyz": "Readiness from the cached DB/pool/upstream probe",
             "POST /search": "Search jobs",
-            "POST /uploads": "Upload files",
+            "POST /jobs/refresh": "Fetch jobs posted since the last refresh into the job store",
+            "POST /match/batch": "Rank many jobs against one resume",
+            "POST /match/top": "Top-k keyword coverage over indexed jobs",
+            "POST /match/session": "Start an incremental match session",
+            "PATCH /match/session/{session_id}": "Re-score after resume edits",
+            "POST /uploads": "Upload resume / cover letter files and extract their text",
             "GET /docs": "API documentation"
         }
     }
 
 @app.get("/profile/{user_id}")
-def get_profile(user_id: str):
+async def get_profile(user_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get profile - returns empty dict for now"""
     try:
-        db = SessionLocal()
-        profile = db.query(UserProfileModel).filter(UserProfileModel.user_id == user_id).first()
-        db.close()
+        profile = await db.scalar(select(UserProfileModel).where(UserProfileModel.user_id == user_id))
         if profile and profile.profile_data:
             return profile.profile_data
         return {}
@@ -117,116 +236,260 @@ def get_profile(user_id: str):
         return {"error": str(e)}
 
 @app.post("/profile")
-def save_profile(body: Dict[str, Any] = Body(...)):
+async def save_profile(body: Dict[str, Any] = Body(...), db: AsyncSession = Depends(get_async_db)):
     """Save profile - accepts profile and preferences from Streamlit app"""
-    db = None
     try:
-        # Ensure tables exist (in case they weren't created on startup)
-        try:
-            Base.metadata.create_all(bind=engine)
-        except Exception as create_error:
-            print(f"Warning: Could not ensure tables exist: {create_error}")
-        
-        db = SessionLocal()
         # Use a default user_id or extract from body if provided
         user_id = body.get("user_id", "default_user")
         profile_data = body.get("profile", {})
         preferences_data = body.get("preferences", {})
-        
-        # Combine profile and preferences
-        combined_data = {
-            "profile": profile_data,
-            "preferences": preferences_data
-        }
-        
-        existing = db.query(UserProfileModel).filter(UserProfileModel.user_id == user_id).first()
-        if existing:
-            existing.profile_data = combined_data
-        else:
-            new_profile = UserProfileModel(user_id=user_id, profile_data=combined_data)
-            db.add(new_profile)
-        
-        db.commit()
+
+        await upsert_profile(db, user_id, profile_data, preferences_data)
         return {"ok": True, "user_id": user_id, "message": "Profile saved"}
     except Exception as e:
-        if db:
-            db.rollback()
+        await db.rollback()
         import traceback
         error_details = traceback.format_exc()
         print(f"Error saving profile: {error_details}")
         return {"ok": False, "error": str(e)}
-    finally:
-        if db:
-            db.close()
 
 @app.post("/profile/{user_id}")
-def save_profile_by_id(user_id: str, body: ProfileData = Body(...)):
+async def save_profile_by_id(user_id: str, body: ProfileData = Body(...), db: AsyncSession = Depends(get_async_db)):
     """Save profile - accepts ProfileData model (legacy endpoint)"""
     try:
-        db = SessionLocal()
         profile_dict = body.dict(exclude_none=True)
         
-        existing = db.query(UserProfileModel).filter(UserProfileModel.user_id == user_id).first()
-        if existing:
-            existing.profile_data = profile_dict
-        else:
-            new_profile = UserProfileModel(user_id=user_id, profile_data=profile_dict)
-            db.add(new_profile)
-        
-        db.commit()
-        db.close()
+        legacy_prefs = {
+            "location": profile_dict.get("location"),
+            "salary": {"min": profile_dict.get("min_salary"), "max": profile_dict.get("max_salary")}
+        }
+        await upsert_profile(db, user_id, profile_dict, legacy_prefs, profile_data=profile_dict)
         return {"ok": True, "user_id": user_id, "message": "Profile saved"}
     except Exception as e:
-        db.rollback()
-        db.close()
+        await db.rollback()
         return {"ok": False, "error": str(e)}
 
+@app.post("/profiles/bulk")
+async def save_profiles_bulk(body: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    """Bulk import - list of {"user_id", "profile", "preferences"} for onboarding batches"""
+    try:
+        if any("user_id" not in item for item in body):
+            return {"ok": False, "error": "every item needs a user_id"}
+        count = await upsert_profiles(db, body)
+        return {"ok": True, "count": count}
+    except Exception as e:
+        await db.rollback()
+        return {"ok": False, "error": str(e)}
+
+@app.get("/alerts/recipients")
+async def alert_recipients(title: Optional[str] = None, remote: Optional[bool] = None,
+                           min_salary: Optional[int] = None, location: Optional[str] = None,
+                           limit: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
+    """Users whose saved preferences match an alert (title, remote, minimum salary, location)"""
+    try:
+        users = await find_alert_recipients(db, title=title, remote=remote, min_salary=min_salary,
+                                            location=location, limit=limit)
+        return {"ok": True, "count": len(users), "users": users}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+def _mock_jobs(body: SearchRequest, limit: int) -> list:
+    """Placeholder results used when no TheirStack API key is configured"""
+    return [
+        {
+            "id": f"job_{i}",
+            "title": body.user_profile.target_titles[0] if body.user_profile.target_titles else "Software Engineer",
+            "company": f"Tech Corp {i}",
+            "location": f"{body.user_preferences.location.city}, {body.user_preferences.location.state}",
+            "description": f"Great opportunity for {body.user_profile.experience_level} level position",
+            "url": f"https://example.com/job/{i}",
+            "posted_at": "2024-01-15",
+            "source": "theirstack"
+        }
+        for i in range(1, min(limit + 1, 11))
+    ]
+
+# Stored jobs not embedded yet; the semantic index is only built when a semantic/hybrid query needs it
+_unembedded: set = set()
+_embeddings_synced = False
+_embed_lock = threading.Lock()
+
+def _ingest_jobs(jobs: list) -> None:
+    """Add stored jobs to the keyword index and queue them for embedding"""
+    job_index.add_many((job["id"], job["description"]) for job in jobs)
+    with _embed_lock:
+        _unembedded.update(job["id"] for job in jobs)
+
+def _sync_embeddings() -> int:
+    """
+    Embed queued jobs before a semantic/hybrid query. The first sync in a
+    process also embeds stored jobs the semantic index has never seen.
+    """
+    global _embeddings_synced
+    with _embed_lock:
+        engine_ = get_semantic_engine()
+        pending = set(_unembedded)
+        with SessionLocal() as db:
+            rows = iter_jobs(db, job_ids=None if not _embeddings_synced else pending)
+            batch = [(job_id, f"{title} {description}") for job_id, title, description in rows
+                     if job_id in pending or job_id not in engine_]
+        if batch:
+            engine_.add_many(batch)
+        _unembedded.difference_update(pending)
+        _embeddings_synced = True
+        return len(batch)
+
+def _stored_descriptions(job_ids: List[str]) -> Dict[str, str]:
+    with SessionLocal() as db:
+        return get_descriptions(db, job_ids)
+
+def _store_jobs(jobs: list) -> dict:
+    """Upsert fetched jobs into the job store"""
+    with SessionLocal() as db:
+        return upsert_jobs(db, jobs)
+
+async def _fetch_jobs(body: SearchRequest, limit: int) -> list:
+    """Upstream search; new or changed jobs are stored and indexed"""
+    found = await search_planner.search_jobs(body.user_profile, body.user_preferences, limit)
+    jobs = [job.model_dump() for job in found]
+    changed = set((await run_in_threadpool(_store_jobs, jobs))["changed_ids"])
+    await run_in_threadpool(_ingest_jobs, [job for job in jobs if job["id"] in changed])
+    return jobs
+
 @app.post("/search")
-def search(body: SearchRequest = Body(...)):
+async def search(body: SearchRequest = Body(...)):
     """Search jobs - accepts SearchRequest with user_profile and user_preferences"""
     try:
-        # TODO: Integrate with TheirStack API or other job search services
-        # For now, return mock data based on the search request
         limit = body.limit or 20
-        
-        # Mock job results
-        jobs = [
-            {
-                "id": f"job_{i}",
-                "title": body.user_profile.target_titles[0] if body.user_profile.target_titles else "Software Engineer",
-                "company": f"Tech Corp {i}",
-                "location": f"{body.user_preferences.location.city}, {body.user_preferences.location.state}",
-                "description": f"Great opportunity for {body.user_profile.experience_level} level position",
-                "url": f"https://example.com/job/{i}",
-                "posted_at": "2024-01-15",
-                "source": "theirstack"
-            }
-            for i in range(1, min(limit + 1, 11))
-        ]
-        
-        return jobs
+        if theirstack.is_configured():
+            key = fingerprint(search_planner.plan_queries(body.user_profile, body.user_preferences, limit))
+            jobs = await _search_flight.do(
+                key, lambda: get_search_cache().get_or_fetch(key, lambda: _fetch_jobs(body, limit))
+            )
+        else:
+            # Placeholders are never indexed: /match/top must only rank real jobs
+            jobs = _mock_jobs(body, limit)
+        return await run_in_threadpool(
+            rank_search_results, jobs, profile_query_text(body.user_profile), body.engine
+        )
     except Exception as e:
         return {"error": str(e)}
 
+@app.post("/jobs/refresh")
+async def refresh_stored_jobs(body: SearchRequest = Body(...), db: Session = Depends(get_db)):
+    """Fetch only jobs posted since this search's last refresh and upsert them into the store"""
+    if not theirstack.is_configured():
+        return {"ok": False, "error": "THEIRSTACK_API_KEY is not set"}
+    try:
+        stats = await refresh_jobs(db, body.user_profile, body.user_preferences, body.limit or 100)
+        changed = set(stats["changed_ids"])
+        await run_in_threadpool(_ingest_jobs, [job for job in stats.pop("jobs") if job["id"] in changed])
+        stats.pop("changed_ids")
+        return {"ok": True, **stats}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
 @app.post("/uploads")
-def upload():
-    """Upload placeholder"""
-    return {"ok": True}
+async def upload(
+    purpose: Optional[str] = Form(None),
+    user_id: Optional[str] = Form(None),
+    upload_type: Optional[str] = Form(None),
+    resume: Optional[UploadFile] = File(None),
+    cover: Optional[UploadFile] = File(None),
+    file: Optional[UploadFile] = File(None),
+):
+    """Extract text from uploaded resume / cover letter files (PDF, DOCX or TXT)"""
+    files = {}
+    try:
+        for field, upload_file in (("resume", resume), ("cover", cover), (upload_type or "file", file)):
+            if upload_file is None:
+                continue
+            # Parsed straight from the upload's file handle; repeat uploads are served from the hash cache
+            entry = await run_in_threadpool(get_extractor().extract, upload_file.file, upload_file.filename)
+            files[field] = {k: v for k, v in entry.items() if k not in ("extractor_version", "extracted_at")}
+        return {"ok": True, "user_id": user_id, "purpose": purpose, "files": files}
+    except ResumeExtractError as e:
+        return {"ok": False, "error": str(e), "files": files}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
 
 @app.post("/match")
-def match_job(body: MatchInput = Body(...)):
+async def match_job(body: MatchInput = Body(...)):
     """Compute match score between job and resume/cover letter"""
     try:
-        result = compute_match(
+        params = dict(
+            job_description=body.job.description,
+            resume_text=body.resume_text,
+            cover_text=body.cover_text,
+            threshold=body.threshold,
+            engine=body.engine
+        )
+        return await _match_flight.do(fingerprint(params), lambda: run_scoring(compute_match, **params))
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+@app.post("/match/batch")
+async def match_jobs_batch(body: BatchMatchInput = Body(...)):
+    """Score one resume/cover letter against many jobs, ranked by score"""
+    try:
+        # Posted jobs are scored here only; /match/top ranks the job store's jobs
+        return await run_scoring(
+            compute_match_batch,
+            jobs=[(job.id, job.description) for job in body.jobs],
+            resume_text=body.resume_text,
+            cover_text=body.cover_text,
+            threshold=body.threshold,
+            top_k=body.top_k
+        )
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+@app.post("/match/top")
+def match_top(body: TopMatchInput = Body(...)):
+    """Best indexed jobs for a resume (keyword coverage, ANN embeddings, or both)"""
+    try:
+        if body.engine != "lexical":
+            _sync_embeddings()
+        return top_matches(body.resume_text, body.k, body.engine, job_index, descriptions=_stored_descriptions)
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+@app.post("/match/session")
+def start_match_session(body: MatchInput = Body(...)):
+    """Start an incremental match session for a job/resume pair"""
+    if body.engine != "lexical":
+        # Edits arrive as removed/added fragments, so the session never holds
+        # the edited resume an embedding would need
+        return JSONResponse(status_code=422, content={
+            "ok": False, "error": f"Match sessions support engine 'lexical' only, got '{body.engine}'"})
+    try:
+        session = create_session(
             job_description=body.job.description,
             resume_text=body.resume_text,
             cover_text=body.cover_text,
             threshold=body.threshold
         )
-        return result
+        return session.result()
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
+@app.patch("/match/session/{session_id}")
+def edit_match_session(session_id: str, body: MatchSessionEdit = Body(...)):
+    """Apply resume edits (removed/added fragments) and return the updated match"""
+    session = get_session(session_id)
+    if session is None:
+        return {"ok": False, "error": "Unknown or expired match session"}
+    try:
+        for edit in body.edits:
+            session.apply_edit(edit.removed, edit.added)
+        return session.result()
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+@app.delete("/match/session/{session_id}")
+def end_match_session(session_id: str):
+    return {"ok": close_session(session_id)}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
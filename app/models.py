@@ -1,12 +1,16 @@
 """
 SQLAlchemy models for JobFinder app.
 """
-from sqlalchemy import Column, String, Integer, DateTime, Text, JSON
+from sqlalchemy import Column, String, Integer, Boolean, Date, DateTime, Text, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
 Base = declarative_base()
 
+# JSON everywhere, JSONB on PostgreSQL so list columns can carry GIN indexes
+JSONList = JSON().with_variant(JSONB(), "postgresql")
+
 
 class UserProfile(Base):
     """Store user profile information"""
@@ -30,16 +34,23 @@ class UserPreferences(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String(255), unique=True, index=True)
-    target_titles = Column(JSON, nullable=True)  # List of target job titles
-    target_skills = Column(JSON, nullable=True)  # List of required skills
+    target_titles = Column(JSONList, nullable=True)  # List of target job titles (lowercased)
+    target_skills = Column(JSONList, nullable=True)  # List of required skills (lowercased)
     industry = Column(String(255), nullable=True)
-    location_preference = Column(String(255), nullable=True)
+    location_preference = Column(String(255), nullable=True, index=True)
+    remote = Column(Boolean, nullable=True)
     salary_min = Column(Integer, nullable=True)
     salary_max = Column(Integer, nullable=True)
     preferences_data = Column(JSON, nullable=True)  # Store full preferences as JSON
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_user_preferences_remote_salary_min", "remote", "salary_min"),
+        Index("ix_user_preferences_target_titles_gin", "target_titles", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index("ix_user_preferences_target_skills_gin", "target_skills", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
 
 class UserUpload(Base):
     """Store user file uploads (resumes, cover letters, etc.)"""
@@ -53,3 +64,30 @@ class UserUpload(Base):
     file_names = Column(JSON, nullable=True)  # Store original file names
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class JobPosting(Base):
+    """Jobs fetched from TheirStack, upserted by id on every search/refresh"""
+    __tablename__ = "jobs"
+
+    id = Column(String(64), primary_key=True)  # TheirStack job id
+    title = Column(String(500), nullable=False)
+    company = Column(String(255), nullable=True, index=True)
+    location = Column(String(255), nullable=True, index=True)
+    url = Column(String(1000), nullable=True)
+    description = Column(Text, nullable=True)
+    posted_at = Column(Date, nullable=True, index=True)
+    source = Column(String(50), nullable=True)
+    content_hash = Column(String(64), nullable=False)  # sha256 of the fields above; changes mean the posting was edited
+    first_seen = Column(DateTime, default=datetime.utcnow)
+    last_seen = Column(DateTime, default=datetime.utcnow)
+
+
+class JobRefreshWatermark(Base):
+    """Newest posted_at already fetched for a search, so refreshes only ask for newer jobs"""
+    __tablename__ = "job_refresh_watermarks"
+
+    query_key = Column(String(64), primary_key=True)  # fingerprint of the search filters
+    watermark = Column(Date, nullable=False)
+    last_run_at = Column(DateTime, default=datetime.utcnow)
+    jobs_seen = Column(Integer, default=0)
@@ -1,6 +1,8 @@
 """Pydantic schemas for request/response validation"""
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import List, Literal, Optional, Dict
+
+MatchEngine = Literal["lexical", "semantic", "hybrid"]
 
 
 class UserProfile(BaseModel):
@@ -17,6 +19,7 @@ class LocationPref(BaseModel):
     country: str
     remote: bool = False
     radius_miles: Optional[int] = 25
+    additional_locations: List[str] = []  # extra "City, ST" patterns to search alongside city/state
 
 
 class SalaryPref(BaseModel):
@@ -59,6 +62,7 @@ class SearchRequest(BaseModel):
     user_profile: UserProfile
     user_preferences: UserPreferences
     limit: int = 50
+    engine: MatchEngine = "lexical"
 
 
 class Job(BaseModel):
@@ -77,3 +81,28 @@ class MatchInput(BaseModel):
     resume_text: str
     cover_text: Optional[str] = None
     threshold: float = 0.70
+    engine: MatchEngine = "lexical"
+
+
+class BatchMatchInput(BaseModel):
+    jobs: List[Job]
+    resume_text: str
+    cover_text: Optional[str] = None
+    threshold: float = 0.70
+    top_k: Optional[int] = None
+
+
+class TopMatchInput(BaseModel):
+    resume_text: str
+    k: int = 10
+    engine: MatchEngine = "lexical"
+
+
+class ResumeEdit(BaseModel):
+    removed: str = ""
+    added: str = ""
+
+
+class MatchSessionEdit(BaseModel):
+    edits: List[ResumeEdit]
+    engine: Literal["lexical"] = "lexical"  # sessions score edits lexically only
@@ -0,0 +1,354 @@
+"""
+Paginated TheirStack harvester with page prefetch and on-disk checkpoints.
+
+A harvest walks one search body page by page (TheirStack page/limit
+pagination) and yields the pages in order while the next HARVEST_PREFETCH
+pages are already being fetched. The run is pinned to the moment it
+started (discovered_at_lte), so jobs discovered mid-run do not shift the
+pages still to come.
+
+With a checkpoint directory, the run's page cursor is saved after each
+page is consumed. An interrupted pull resumes at the first unconsumed page
+instead of paying for the earlier pages again. Pages that were prefetched
+but not consumed when the run stopped are spooled next to the checkpoint
+and read back on resume, not fetched twice. When a run completes, its
+start time becomes the watermark and the next run of the same search only
+asks for jobs discovered since (discovered_at_gte).
+
+Usage:
+    python -m app.services.harvester run search.json --out jobs.jsonl --max-pages 50
+    python -m app.services.harvester status search.json
+"""
+import os
+import json
+import asyncio
+import hashlib
+import argparse
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from ..integrations.theirstack import TheirStackClient
+
+HARVEST_PAGE_SIZE = int(os.getenv("HARVEST_PAGE_SIZE", "100"))
+HARVEST_PREFETCH = int(os.getenv("HARVEST_PREFETCH", "3"))
+HARVEST_CHECKPOINT_DIR = os.getenv("HARVEST_CHECKPOINT_DIR", "./harvest_checkpoints")
+
+# Body fields that are set by the harvester, not part of what is being searched for
+_PAGING_FIELDS = ("page", "offset", "limit", "include_total_results", "discovered_at_gte", "discovered_at_lte")
+
+
+def harvest_key(body: Dict[str, Any]) -> str:
+    """Stable fingerprint of a search body's filters"""
+    filters = {k: v for k, v in body.items() if k not in _PAGING_FIELDS}
+    return hashlib.sha256(json.dumps(filters, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+
+def _utc_now() -> str:
+    return datetime.utcnow().replace(microsecond=0).isoformat()
+
+
+class Checkpoint:
+    """Per-search state file: the last completed run's watermark and the run in progress"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.state: Dict[str, Any] = {"watermark": None, "run": None}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class Harvester:
+    """
+    Walk the pages of one search.
+
+    `fetch` posts a body and returns the TheirStack response (defaults to a
+    TheirStackClient created and closed by the harvest). `max_pages` caps
+    the run; a run that reaches it is complete. Pass checkpoint_dir=None for
+    a one-off pull with prefetch but no checkpoint or watermark.
+    """
+
+    def __init__(self, body: Dict[str, Any], fetch=None, page_size: Optional[int] = None,
+                 prefetch: int = HARVEST_PREFETCH, max_pages: Optional[int] = None,
+                 checkpoint_dir: Optional[str] = HARVEST_CHECKPOINT_DIR, client_kwargs: Optional[dict] = None):
+        self.body = {k: v for k, v in body.items() if k not in _PAGING_FIELDS}
+        self.page_size = page_size or body.get("limit") or HARVEST_PAGE_SIZE
+        self.prefetch = max(1, prefetch)
+        self.max_pages = max_pages
+        self.fetch = fetch
+        self.client_kwargs = client_kwargs or {}
+        self.key = harvest_key(body)
+        self.checkpoint = Checkpoint(os.path.join(checkpoint_dir, f"{self.key}.json") if checkpoint_dir else None)
+        self.spool_dir = os.path.join(checkpoint_dir, f"{self.key}.pages") if checkpoint_dir else None
+        self.resumed = False
+        self.pages_fetched = 0
+        self.pages_spooled = 0
+        self.pages_unspooled = 0
+        self.jobs_fetched = 0
+        self._run: Optional[Dict[str, Any]] = None
+
+    @property
+    def run(self) -> Optional[Dict[str, Any]]:
+        return self.checkpoint.state.get("run")
+
+    def start(self) -> Dict[str, Any]:
+        """Resume the checkpointed run or start a new one (idempotent); returns the run state"""
+        if self._run is None:
+            self._run = self._start_run()
+        return self._run
+
+    def _start_run(self) -> Dict[str, Any]:
+        run = self.run
+        if run is not None and run.get("page_size") == self.page_size:
+            self.resumed = True
+            if self.max_pages is not None:
+                run["max_pages"] = self.max_pages
+            return run
+        run = {
+            "started_at": _utc_now(),
+            "since": self.checkpoint.state.get("watermark") if self.checkpoint.path else None,
+            "page_size": self.page_size,
+            "max_pages": self.max_pages,
+            "next_page": 0,
+            "total_pages": None,
+            "jobs_seen": 0,
+            "extra": {},
+        }
+        self._clear_spool()
+        self.checkpoint.state["run"] = run
+        self.checkpoint.save()
+        return run
+
+    # --- spool of prefetched pages the consumer never got to
+
+    def _spool_path(self, page: int) -> str:
+        return os.path.join(self.spool_dir, f"{page}.json")
+
+    def _spool(self, page: int, jobs: List[Dict[str, Any]]) -> None:
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = self._spool_path(page)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(jobs, f, default=str)
+        os.replace(path + ".tmp", path)
+        self.pages_spooled += 1
+
+    def _unspool(self, page: int) -> Optional[List[Dict[str, Any]]]:
+        if not self.spool_dir or not os.path.exists(self._spool_path(page)):
+            return None
+        with open(self._spool_path(page), "r", encoding="utf-8") as f:
+            jobs = json.load(f)
+        self.pages_unspooled += 1
+        return jobs
+
+    def _drop_spooled(self, page: int) -> None:
+        if self.spool_dir and os.path.exists(self._spool_path(page)):
+            os.remove(self._spool_path(page))
+
+    def _clear_spool(self) -> None:
+        if self.spool_dir and os.path.isdir(self.spool_dir):
+            for name in os.listdir(self.spool_dir):
+                os.remove(os.path.join(self.spool_dir, name))
+            os.rmdir(self.spool_dir)
+
+    def _page_body(self, run: Dict[str, Any], page: int) -> Dict[str, Any]:
+        body = dict(self.body, page=page, limit=self.page_size, discovered_at_lte=run["started_at"])
+        if run["since"]:
+            body["discovered_at_gte"] = run["since"]
+        if run["total_pages"] is None:
+            body["include_total_results"] = True
+        return body
+
+    def _last_page(self, run: Dict[str, Any]) -> Optional[int]:
+        """Exclusive end page if known"""
+        ends = [n for n in (run["total_pages"], run["max_pages"]) if n is not None]
+        return min(ends) if ends else None
+
+    async def pages(self) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """(page number, jobs) in page order; the checkpoint advances once the consumer asks for the next page"""
+        run = self.start()
+        client = None
+        fetch = self.fetch
+        if fetch is None:
+            client = TheirStackClient(**self.client_kwargs)
+            fetch = client.search_jobs_raw
+        tasks: Dict[int, asyncio.Task] = {}
+
+        async def get(page: int) -> List[Dict[str, Any]]:
+            spooled = self._unspool(page)
+            if spooled is not None:
+                return spooled
+            resp = await fetch(self._page_body(run, page))
+            self.pages_fetched += 1
+            total = (resp.get("metadata") or {}).get("total_results")
+            if total is not None and run["total_pages"] is None:
+                run["total_pages"] = -(-total // self.page_size)
+            return resp.get("data") or []
+
+        def schedule(start: int) -> None:
+            end = self._last_page(run)
+            for p in range(start, start + self.prefetch):
+                if end is not None and p >= end:
+                    break
+                if p not in tasks:
+                    tasks[p] = asyncio.ensure_future(get(p))
+
+        try:
+            page = run["next_page"]
+            if run["total_pages"] is None and (self._last_page(run) is None or page < self._last_page(run)):
+                # One page first to learn the total, so prefetch never runs past the end
+                tasks[page] = asyncio.ensure_future(get(page))
+                await asyncio.wait([tasks[page]])
+            while True:
+                end = self._last_page(run)
+                if end is not None and page >= end:
+                    break
+                schedule(page)
+                jobs = await tasks.pop(page)
+                self.jobs_fetched += len(jobs)
+                yield page, jobs
+                page += 1
+                run["next_page"] = page
+                run["jobs_seen"] += len(jobs)
+                self.checkpoint.save()
+                self._drop_spooled(page - 1)
+                if len(jobs) < self.page_size:
+                    break
+            # Run complete: later runs only ask for what was discovered after it started
+            self.checkpoint.state["watermark"] = run["started_at"]
+            self.checkpoint.state["run"] = None
+            self.checkpoint.state["last_run"] = {k: run[k] for k in ("started_at", "since", "jobs_seen")}
+            self.checkpoint.save()
+            self._clear_spool()
+        except Exception:
+            # A page failed: let the pages already in flight finish, they are paid for either way
+            if tasks:
+                await asyncio.wait(list(tasks.values()))
+            raise
+        finally:
+            for t in tasks.values():
+                t.cancel()
+            if tasks:
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+            if self.spool_dir and self.run is not None:
+                for p, t in sorted(tasks.items()):
+                    if not t.cancelled() and t.exception() is None:
+                        self._spool(p, t.result())
+                self.checkpoint.save()  # total_pages learned from spooled pages
+            if client is not None:
+                await client.aclose()
+
+    async def jobs(self) -> AsyncIterator[Dict[str, Any]]:
+        async for _, jobs in self.pages():
+            for job in jobs:
+                yield job
+
+    def stats(self) -> Dict[str, Any]:
+        run = self.run or {}
+        return {
+            "key": self.key,
+            "resumed": self.resumed,
+            "pages_fetched": self.pages_fetched,
+            "pages_spooled": self.pages_spooled,
+            "pages_unspooled": self.pages_unspooled,
+            "jobs_fetched": self.jobs_fetched,
+            "next_page": run.get("next_page"),
+            "total_pages": run.get("total_pages"),
+            "complete": self.run is None,
+            "watermark": self.checkpoint.state.get("watermark"),
+        }
+
+
+def harvest_sync(body: Dict[str, Any], **kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    Harvester.jobs() for synchronous callers, on a private event loop.
+
+    Prefetched pages keep downloading while the loop runs, i.e. while the
+    caller waits for the next job of a page that has not arrived yet.
+    """
+    harvester = Harvester(body, **kwargs)
+    loop = asyncio.new_event_loop()
+    pages = harvester.pages()
+    try:
+        while True:
+            try:
+                _, jobs = loop.run_until_complete(pages.__anext__())
+            except StopAsyncIteration:
+                break
+            yield from jobs
+    finally:
+        loop.run_until_complete(pages.aclose())
+        loop.close()
+
+
+async def harvest_to_jsonl(body: Dict[str, Any], out_path: str, **kwargs) -> Dict[str, Any]:
+    """
+    Append every job of a harvest to a JSONL file.
+
+    The file size is checkpointed when the run starts and with each page,
+    so a resumed run first truncates anything written after the last
+    checkpoint and no job is written twice. New runs (e.g. the next
+    incremental pull) append.
+    """
+    harvester = Harvester(body, **kwargs)
+    mode = "r+b" if os.path.exists(out_path) else "wb"
+    with open(out_path, mode) as f:
+        extra = harvester.start()["extra"]
+        if "out_bytes" in extra:
+            f.truncate(extra["out_bytes"])
+        else:
+            extra["out_bytes"] = f.seek(0, os.SEEK_END)
+            harvester.checkpoint.save()
+        async for _, jobs in harvester.pages():
+            f.seek(0, os.SEEK_END)
+            for job in jobs:
+                f.write(json.dumps(job, default=str).encode("utf-8") + b"\n")
+            f.flush()
+            extra["out_bytes"] = f.tell()
+    return harvester.stats()
+
+
+# ===== CLI =====
+
+def _load_body(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Resumable TheirStack harvester")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_p = sub.add_parser("run", help="Harvest a search body (JSON file) into JSONL, resuming if interrupted")
+    run_p.add_argument("body")
+    run_p.add_argument("--out", required=True)
+    run_p.add_argument("--page-size", type=int, default=HARVEST_PAGE_SIZE)
+    run_p.add_argument("--prefetch", type=int, default=HARVEST_PREFETCH)
+    run_p.add_argument("--max-pages", type=int)
+    run_p.add_argument("--checkpoint-dir", default=HARVEST_CHECKPOINT_DIR)
+    status_p = sub.add_parser("status", help="Show the checkpoint of a search body")
+    status_p.add_argument("body")
+    status_p.add_argument("--checkpoint-dir", default=HARVEST_CHECKPOINT_DIR)
+    args = parser.parse_args(argv)
+
+    body = _load_body(args.body)
+    if args.command == "run":
+        stats = asyncio.run(harvest_to_jsonl(
+            body, args.out, page_size=args.page_size, prefetch=args.prefetch,
+            max_pages=args.max_pages, checkpoint_dir=args.checkpoint_dir,
+        ))
+        print(f"✅ {stats['jobs_fetched']} jobs from {stats['pages_fetched']} pages → {args.out}")
+        print(json.dumps(stats, indent=2))
+    elif args.command == "status":
+        print(json.dumps(Checkpoint(os.path.join(args.checkpoint_dir, f"{harvest_key(body)}.json")).state, indent=2))
+
+
+if __name__ == "__main__":
+    main()
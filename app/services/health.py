@@ -0,0 +1,87 @@
+"""
+Background health monitor.
+
+A task probes the database (SELECT 1 through the pool) every
+HEALTH_REFRESH_SECONDS and stores a snapshot together with pool and
+upstream status. /health and /readyz only read that snapshot, so frequent
+polling from the Streamlit pages costs no database round trips.
+"""
+import os
+import time
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+HEALTH_REFRESH_SECONDS = float(os.getenv("HEALTH_REFRESH_SECONDS", "10"))
+HEALTH_DB_TIMEOUT = float(os.getenv("HEALTH_DB_TIMEOUT", "5"))
+
+
+class HealthMonitor:
+    def __init__(self, session_factory: Callable, extra: Optional[Callable[[], Dict[str, Any]]] = None,
+                 interval: float = HEALTH_REFRESH_SECONDS):
+        self.session_factory = session_factory
+        self.extra = extra
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._snapshot: Dict[str, Any] = {"status": "starting", "database": "unknown", "ready": False}
+        self._checked_at = 0.0
+
+    def _probe_db(self) -> None:
+        with self.session_factory() as db:
+            db.execute(text("SELECT 1"))
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Probe dependencies once and replace the snapshot"""
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(run_in_threadpool(self._probe_db), HEALTH_DB_TIMEOUT)
+            database, db_ok = "connected", True
+        except asyncio.TimeoutError:
+            database, db_ok = f"error: no response within {HEALTH_DB_TIMEOUT:g}s", False
+        except Exception as e:
+            database, db_ok = f"error: {str(e)}", False
+        snapshot = {
+            "status": "healthy" if db_ok else "degraded",
+            "ready": db_ok,
+            "database": database,
+            "database_latency_ms": round((time.perf_counter() - t0) * 1000, 2),
+            "checked_at": datetime.utcnow().isoformat() + "Z",
+        }
+        if self.extra is not None:
+            try:
+                snapshot.update(self.extra())
+            except Exception as e:
+                snapshot["extra_error"] = str(e)
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+        return snapshot
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"⚠️ Health refresh failed: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Last probe result; `stale` once it is older than three refresh intervals"""
+        age = time.monotonic() - self._checked_at if self._checked_at else None
+        stale = age is None or age > 3 * self.interval
+        return {**self._snapshot, "age_seconds": round(age, 2) if age is not None else None, "stale": stale}
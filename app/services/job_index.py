@@ -0,0 +1,156 @@
+"""In-process inverted index over job descriptions for corpus-wide coverage scoring"""
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .matching import keyword_set, top_k_indices
+
+
+class JobIndex:
+    """
+    Inverted index from normalized keyword to the jobs that contain it.
+
+    Each job gets an integer slot; posting lists are compact int arrays of
+    slots. Coverage for a resume (|job keywords ∩ resume keywords| / |job
+    keywords|, the same as coverage_score) is computed by concatenating the
+    postings of the resume's keywords and counting slots with np.bincount,
+    so only jobs sharing at least one keyword are ever touched.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, array] = {}
+        self._slot_by_id: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []           # slot -> job id (None once removed)
+        self._keywords: List[Optional[frozenset]] = []
+        self._sizes = array("i")                      # slot -> keyword count (0 once removed)
+
+    def __len__(self) -> int:
+        return len(self._slot_by_id)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._slot_by_id
+
+    def add(self, job_id: str, description: str) -> None:
+        """Index a job; re-adding an id replaces its previous description"""
+        kws = keyword_set(description or "")
+        with self._lock:
+            old = self._slot_by_id.get(job_id)
+            if old is not None:
+                if self._keywords[old] == kws:
+                    return
+                self._remove_slot(old)
+            slot = len(self._ids)
+            self._ids.append(job_id)
+            self._keywords.append(kws)
+            self._sizes.append(len(kws))
+            self._slot_by_id[job_id] = slot
+            for kw in kws:
+                posting = self._postings.get(kw)
+                if posting is None:
+                    posting = self._postings[kw] = array("i")
+                posting.append(slot)
+
+    def add_many(self, jobs: Iterable[Tuple[str, str]]) -> int:
+        """Index (job_id, description) pairs; returns how many were given"""
+        n = 0
+        for job_id, description in jobs:
+            self.add(job_id, description)
+            n += 1
+        return n
+
+    def remove(self, job_id: str) -> bool:
+        with self._lock:
+            slot = self._slot_by_id.get(job_id)
+            if slot is None:
+                return False
+            self._remove_slot(slot)
+            return True
+
+    def _remove_slot(self, slot: int) -> None:
+        # Postings keep the stale slot; a zero size makes it score 0.0
+        del self._slot_by_id[self._ids[slot]]
+        self._ids[slot] = None
+        self._keywords[slot] = None
+        self._sizes[slot] = 0
+        if len(self._ids) > 1024 and len(self._ids) > 2 * len(self._slot_by_id):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rebuild postings without the slots of removed jobs"""
+        live = [(job_id, kws) for job_id, kws in zip(self._ids, self._keywords) if job_id is not None]
+        self._postings = {}
+        self._slot_by_id = {}
+        self._ids = []
+        self._keywords = []
+        self._sizes = array("i")
+        for slot, (job_id, kws) in enumerate(live):
+            self._ids.append(job_id)
+            self._keywords.append(kws)
+            self._sizes.append(len(kws))
+            self._slot_by_id[job_id] = slot
+            for kw in kws:
+                posting = self._postings.get(kw)
+                if posting is None:
+                    posting = self._postings[kw] = array("i")
+                posting.append(slot)
+
+    def coverage_scores(self, resume_keywords: frozenset) -> Tuple[np.ndarray, np.ndarray]:
+        """Overlap counts and coverage per slot for a resume keyword set"""
+        with self._lock:
+            n_slots = len(self._ids)
+            postings = [self._postings[kw] for kw in resume_keywords if kw in self._postings]
+            if postings:
+                slots = np.concatenate([np.frombuffer(p, dtype=np.intc) for p in postings])
+            else:
+                slots = np.empty(0, dtype=np.intc)
+            sizes = np.frombuffer(self._sizes, dtype=np.intc).astype(np.float64)
+        overlap = np.bincount(slots, minlength=n_slots)
+        coverage = np.divide(overlap, sizes, out=np.zeros(n_slots), where=sizes > 0)
+        return overlap, coverage
+
+    def top_coverage(self, resume_text: str, k: int = 10) -> List[dict]:
+        """Best-covered jobs in the whole index for a resume, with missing keywords"""
+        res_kw = keyword_set(resume_text)
+        with self._lock:
+            # Compaction swaps in new lists, so these references stay consistent
+            ids, keywords = self._ids, self._keywords
+            overlap, coverage = self.coverage_scores(res_kw)
+        results = []
+        for slot in top_k_indices(coverage, k):
+            if coverage[slot] <= 0:
+                break
+            job_id, kws = ids[slot], keywords[slot]
+            if job_id is None:
+                continue
+            results.append({
+                "job_id": job_id,
+                "coverage": round(float(coverage[slot]), 3),
+                "matched": int(overlap[slot]),
+                "missing": list(kws - res_kw)[:12],
+            })
+        return results
+
+    def coverage_for(self, resume_text: str, job_ids: Iterable[str]) -> Dict[str, float]:
+        """Coverage of specific indexed jobs by a resume"""
+        res_kw = keyword_set(resume_text)
+        scores = {}
+        with self._lock:
+            for job_id in job_ids:
+                slot = self._slot_by_id.get(job_id)
+                if slot is not None and self._sizes[slot]:
+                    scores[job_id] = len(self._keywords[slot] & res_kw) / self._sizes[slot]
+        return scores
+
+    def stats(self) -> dict:
+        return {
+            "jobs": len(self._slot_by_id),
+            "slots": len(self._ids),
+            "keywords": len(self._postings),
+        }
+
+
+# Process-wide index fed by search results and ingestion
+job_index = JobIndex()
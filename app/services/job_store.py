@@ -0,0 +1,187 @@
+"""
+Persistent job store: bulk upsert of fetched jobs and watermark-based refresh.
+
+Jobs are keyed by TheirStack id. Each upsert is one INSERT ... ON CONFLICT
+DO UPDATE per batch (PostgreSQL and SQLite), which keeps first_seen, bumps
+last_seen and replaces the content. The content hash tells callers which
+jobs are new or edited, so only those need re-indexing. Refreshes remember
+the newest posted_at fetched for each search and ask TheirStack only for
+jobs posted on or after it (posted_at_gte).
+"""
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..db import dialect_insert
+from ..integrations.theirstack import build_search_body
+from ..models import JobPosting, JobRefreshWatermark
+from ..schemas import UserProfile, UserPreferences
+from .search_planner import search_window
+
+UPSERT_BATCH_SIZE = 500
+_CONTENT_FIELDS = ("title", "company", "location", "url", "description", "posted_at")
+
+
+def content_hash(job: Dict[str, Any]) -> str:
+    """sha256 over the fields that make up a posting's content"""
+    payload = "\x1f".join(str(job.get(f) or "") for f in _CONTENT_FIELDS)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _row(job: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    return {
+        "id": str(job["id"]),
+        "title": (job.get("title") or "")[:500],
+        "company": (job.get("company") or "")[:255] or None,
+        "location": (job.get("location") or "")[:255] or None,
+        "url": (job.get("url") or "")[:1000] or None,
+        "description": job.get("description") or "",
+        "posted_at": _parse_date(job.get("posted_at")),
+        "source": job.get("source") or "theirstack",
+        "content_hash": content_hash(job),
+        "first_seen": now,
+        "last_seen": now,
+    }
+
+
+def upsert_jobs(db: Session, jobs: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Insert or update Job-shaped dicts in batches and commit.
+
+    Returns counts of inserted / updated / unchanged rows and `changed_ids`,
+    the ids that are new or whose content hash changed.
+    """
+    now = datetime.utcnow()
+    # Last occurrence wins if the same id appears twice in one call
+    rows = list({r["id"]: r for r in (_row(j, now) for j in jobs if j.get("id") is not None)}.values())
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0, "changed_ids": []}
+    insert = dialect_insert(db.get_bind().dialect.name)
+
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        batch = rows[start:start + UPSERT_BATCH_SIZE]
+        existing = dict(db.execute(
+            select(JobPosting.id, JobPosting.content_hash).where(JobPosting.id.in_([r["id"] for r in batch]))
+        ).all())
+        for r in batch:
+            old = existing.get(r["id"])
+            if old is None:
+                stats["inserted"] += 1
+                stats["changed_ids"].append(r["id"])
+            elif old != r["content_hash"]:
+                stats["updated"] += 1
+                stats["changed_ids"].append(r["id"])
+            else:
+                stats["unchanged"] += 1
+
+        if insert is not None:
+            stmt = insert(JobPosting).values(batch)
+            updated = {c: getattr(stmt.excluded, c) for c in batch[0] if c not in ("id", "first_seen")}
+            db.execute(stmt.on_conflict_do_update(index_elements=[JobPosting.id], set_=updated))
+        else:
+            for r in batch:
+                if r["id"] in existing:
+                    r = {k: v for k, v in r.items() if k != "first_seen"}
+                db.merge(JobPosting(**r))
+    db.commit()
+    return stats
+
+
+def iter_jobs(db: Session, batch_size: int = 1000,
+              job_ids: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str, str]]:
+    """Stream (id, title, description) for every stored job, or for the given ids"""
+    query = select(JobPosting.id, JobPosting.title, JobPosting.description)
+    if job_ids is not None:
+        query = query.where(JobPosting.id.in_(list(job_ids)))
+    result = db.execute(query.execution_options(yield_per=batch_size))
+    for job_id, title, description in result:
+        yield job_id, title or "", description or ""
+
+
+def get_descriptions(db: Session, job_ids: Iterable[str]) -> Dict[str, str]:
+    """Description of each stored job among `job_ids`"""
+    rows = db.execute(select(JobPosting.id, JobPosting.description).where(JobPosting.id.in_(list(job_ids))))
+    return {job_id: description or "" for job_id, description in rows}
+
+
+def job_count(db: Session) -> int:
+    return db.execute(select(func.count()).select_from(JobPosting)).scalar_one()
+
+
+# ===== INCREMENTAL REFRESH =====
+
+def query_key(user_profile: UserProfile, user_preferences: UserPreferences) -> str:
+    """Stable fingerprint of a search's filters (time window and limit excluded)"""
+    body = build_search_body(user_profile, user_preferences)
+    for k in ("limit", "posted_at_max_age_days", "posted_at_gte"):
+        body.pop(k, None)
+    return hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+
+def get_watermark(db: Session, key: str) -> Optional[date]:
+    row = db.get(JobRefreshWatermark, key)
+    return row.watermark if row is not None else None
+
+
+def set_watermark(db: Session, key: str, watermark: date, jobs_seen: int) -> None:
+    row = db.get(JobRefreshWatermark, key)
+    if row is None:
+        row = JobRefreshWatermark(query_key=key, watermark=watermark, jobs_seen=0)
+        db.add(row)
+    row.watermark = max(row.watermark, watermark)
+    row.last_run_at = datetime.utcnow()
+    row.jobs_seen = (row.jobs_seen or 0) + jobs_seen
+    db.commit()
+
+
+async def refresh_jobs(db: Session, user_profile: UserProfile, user_preferences: UserPreferences,
+                       limit: int = 100, fetch=None) -> Dict[str, Any]:
+    """
+    Fetch only jobs posted since this search's watermark and upsert them.
+
+    The first refresh of a search falls back to its job_age_limit_days window.
+    Every sub-query is paged through the whole window (`limit` jobs per
+    page), so the watermark moves forward even when the window holds more
+    than one page. The watermark is inclusive (posted_at_gte is a date), so
+    postings from the watermark day are re-fetched and come back as
+    unchanged. If a sub-query failed or ran into REFRESH_MAX_PAGES, there may
+    be unseen jobs in the window, so the watermark is not advanced
+    (`complete` is False) and the next run asks for it again.
+    """
+    key = query_key(user_profile, user_preferences)
+    since = await run_in_threadpool(get_watermark, db, key)
+    filters = {"posted_at_gte": since.isoformat()} if since else None
+    found, complete = await search_window(user_profile, user_preferences, limit, fetch=fetch, filters=filters)
+    jobs = [j.model_dump() for j in found]
+    stats = await run_in_threadpool(upsert_jobs, db, jobs)
+    newest = max((d for d in (_parse_date(j.get("posted_at")) for j in jobs) if d), default=None)
+    watermark = since
+    if complete and newest is not None:
+        await run_in_threadpool(set_watermark, db, key, newest, len(jobs))
+        watermark = max(newest, since) if since else newest
+    stats.update({
+        "query_key": key,
+        "since": since.isoformat() if since else None,
+        "watermark": watermark.isoformat() if watermark else None,
+        "fetched": len(jobs),
+        "complete": complete,
+        "jobs": jobs,
+    })
+    return stats
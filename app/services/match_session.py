@@ -0,0 +1,187 @@
+"""
+Incremental matching sessions for the Job Detail "edit resume, re-score" loop.
+
+A session keeps the job description's precomputed features (keyword set and
+L2-normalized TF-IDF weights) and the resume's keyword multiset and term
+counts. Each edit is sent as the removed and added text fragments, and
+coverage, cosine and the missing-keyword list are updated from those
+fragments alone, in time proportional to the size of the edit.
+
+Bigrams that straddle a fragment boundary are not re-counted, so after many
+edits the cosine can drift slightly from a from-scratch compute_match.
+
+Without a corpus model, compute_match fits TF-IDF on the (job, resume) pair,
+so an edit can change the vocabulary and every IDF weight. In that mode the
+session keeps term counts of both texts and recomputes the pair cosine from
+them on each result, in time proportional to the two texts' vocabulary.
+"""
+import os
+import math
+import uuid
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize as l2_normalize
+
+from .matching import _build_tweaks, compute_match, keyword_set, lexical_blend, normalize
+from .tfidf_model import get_model
+from .token_cache import LRUCache
+
+MATCH_SESSION_MAX = int(os.getenv("MATCH_SESSION_MAX", "1000"))
+MATCH_SESSION_TTL = float(os.getenv("MATCH_SESSION_TTL", "1800"))  # seconds idle
+
+
+class MatchSession:
+    """Match state for one job and one resume that is being edited"""
+
+    def __init__(self, job_description: str, resume_text: str, cover_text: Optional[str] = None,
+                 threshold: float = 0.70):
+        self.id = uuid.uuid4().hex
+        self.threshold = threshold
+        self._lock = threading.Lock()
+
+        # --- coverage state
+        self.jd_keywords = keyword_set(job_description)
+        self.resume_keywords: Counter = Counter(normalize(resume_text))
+        self.missing = {kw for kw in self.jd_keywords if not self.resume_keywords[kw]}
+
+        # --- cosine state: same vectorizer the stateless path would use
+        vec = get_model()
+        self._pair_fit = vec is None
+        self._term_counts: Counter = Counter()
+        self._dot = 0.0
+        self._sq_norm = 0.0
+        if self._pair_fit:
+            # Terms by string: the pair vocabulary changes as the resume is edited
+            self._analyzer = TfidfVectorizer(ngram_range=(1, 2)).build_analyzer()
+            self._jd_counts: Counter = Counter(self._analyzer(job_description))
+        else:
+            self._analyzer = vec.build_analyzer()
+            self._vocab: Dict[str, int] = vec.vocabulary_
+            self._idf = vec.idf_
+            self._sublinear = vec.sublinear_tf
+            jd_row = l2_normalize(vec.transform([job_description]), norm="l2")
+            self._jd_weights: Dict[int, float] = dict(zip(jd_row.indices.tolist(), jd_row.data.tolist()))
+        self._update_terms(self._analyzer(resume_text), +1)
+
+        # --- cover letter is not edited in a session; score it once
+        self._cover = None
+        if cover_text:
+            self._cover = compute_match(job_description, cover_text, threshold=threshold)
+
+    def _weight(self, term: int, count: int) -> float:
+        if count <= 0:
+            return 0.0
+        tf = 1.0 + math.log(count) if self._sublinear else float(count)
+        return tf * self._idf[term]
+
+    def _update_terms(self, terms: List[str], sign: int) -> None:
+        if self._pair_fit:
+            for term, n in Counter(terms).items():
+                new = self._term_counts[term] + sign * n
+                if new > 0:
+                    self._term_counts[term] = new
+                else:
+                    self._term_counts.pop(term, None)
+            return
+        deltas = Counter(self._vocab[t] for t in terms if t in self._vocab)
+        for term, n in deltas.items():
+            old = self._term_counts[term]
+            new = max(0, old + sign * n)
+            w_old, w_new = self._weight(term, old), self._weight(term, new)
+            self._sq_norm += w_new * w_new - w_old * w_old
+            self._dot += (w_new - w_old) * self._jd_weights.get(term, 0.0)
+            if new:
+                self._term_counts[term] = new
+            else:
+                del self._term_counts[term]
+
+    def _update_keywords(self, tokens: List[str], sign: int) -> None:
+        for kw, n in Counter(tokens).items():
+            new = max(0, self.resume_keywords[kw] + sign * n)
+            if new:
+                self.resume_keywords[kw] = new
+            else:
+                self.resume_keywords.pop(kw, None)
+            if kw in self.jd_keywords:
+                if new:
+                    self.missing.discard(kw)
+                else:
+                    self.missing.add(kw)
+
+    def _pair_cosine(self) -> float:
+        """Cosine of a TF-IDF fit on (job, resume), from the term counts (smooth IDF, n=2 docs)"""
+        jd, resume = self._jd_counts, self._term_counts
+        dot = jd_sq = res_sq = 0.0
+        for term, c in jd.items():
+            idf = math.log(3 / (2 + (term in resume))) + 1.0
+            jd_sq += (c * idf) ** 2
+            if term in resume:
+                dot += c * resume[term] * idf * idf
+        for term, c in resume.items():
+            idf = math.log(3 / (2 + (term in jd))) + 1.0
+            res_sq += (c * idf) ** 2
+        if jd_sq <= 1e-12 or res_sq <= 1e-12:
+            return 0.0
+        return dot / math.sqrt(jd_sq * res_sq)
+
+    def apply_edit(self, removed: str = "", added: str = "") -> None:
+        """Apply one edit given the text that was removed and the text that replaced it"""
+        with self._lock:
+            if removed:
+                self._update_keywords(normalize(removed), -1)
+                self._update_terms(self._analyzer(removed), -1)
+            if added:
+                self._update_keywords(normalize(added), +1)
+                self._update_terms(self._analyzer(added), +1)
+
+    def result(self) -> dict:
+        """Current match breakdown, same shape as compute_match"""
+        with self._lock:
+            cov = 0.0
+            if self.jd_keywords:
+                cov = (len(self.jd_keywords) - len(self.missing)) / len(self.jd_keywords)
+            if self._pair_fit:
+                cos = self._pair_cosine()
+            else:
+                cos = 0.0 if self._sq_norm <= 1e-12 else self._dot / math.sqrt(self._sq_norm)
+            final = lexical_blend(cov, cos)
+            final_c, missing_c = None, None
+            if self._cover is not None:
+                final_c = self._cover["score"]
+                missing_c = next((t["keywords"] for t in self._cover["tweaks"] if t["type"] == "resume"), [])
+            return {
+                "session_id": self.id,
+                "score": round(final, 3),
+                "coverage": round(cov, 3),
+                "cosine": round(cos, 3),
+                "tweaks": _build_tweaks(final, list(self.missing), self.threshold, final_c, missing_c)
+            }
+
+
+# Live sessions; idle ones expire after MATCH_SESSION_TTL
+_sessions = LRUCache(maxsize=MATCH_SESSION_MAX, ttl=MATCH_SESSION_TTL)
+
+
+def create_session(job_description: str, resume_text: str, cover_text: Optional[str] = None,
+                   threshold: float = 0.70) -> MatchSession:
+    session = MatchSession(job_description, resume_text, cover_text, threshold)
+    _sessions.set(session.id, session)
+    return session
+
+
+def get_session(session_id: str) -> Optional[MatchSession]:
+    session = _sessions.get(session_id)
+    if session is not None:
+        _sessions.set(session_id, session)  # refresh idle TTL
+    return session
+
+
+def close_session(session_id: str) -> bool:
+    return _sessions.pop(session_id) is not None
+
+
+def session_stats() -> dict:
+    return _sessions.stats()
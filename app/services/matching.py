@@ -1,21 +1,68 @@
 """Job matching service"""
 import re
-import math
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize as l2_normalize
+from .tfidf_model import get_model, get_model_version
+from .token_cache import LRUCache, text_key
+
+# Preprocessing results keyed by content hash: token list, keyword set and
+# (once a corpus model is loaded) the L2-normalized TF-IDF row
+_token_cache = LRUCache()
+
+
+# A token is a maximal run of [a-z0-9-+/#] at least 3 characters long; every
+# other character acts as a separator
+_TOKEN_RE = re.compile(r"[a-z0-9\-+/#]{3,}")
 
 
 def normalize(text: str) -> List[str]:
     """Normalize text for keyword extraction"""
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9\s\-+/#]", " ", text)
-    toks = [t for t in text.split() if len(t) > 2]
-    return toks
+    return _TOKEN_RE.findall(text.lower())
+
 
+def iter_tokens(text: str) -> Iterator[str]:
+    """Yield normalized tokens in a single streaming pass (no token list is built)"""
+    for m in _TOKEN_RE.finditer(text.lower()):
+        yield m.group()
 
-def keyword_set(text: str) -> set:
+
+def text_features(text: str) -> dict:
+    """Cached preprocessing results for a text"""
+    key = text_key(text)
+    entry = _token_cache.get(key)
+    if entry is None:
+        tokens = tuple(normalize(text))
+        entry = {"tokens": tokens, "keywords": frozenset(tokens), "vector": None, "vector_version": None}
+        _token_cache.set(key, entry)
+    return entry
+
+
+def keyword_set(text: str) -> frozenset:
     """Extract keyword set from text"""
-    return set(normalize(text))
+    if _token_cache.maxsize <= 0:
+        return frozenset(normalize(text))
+    return text_features(text)["keywords"]
+
+
+def tfidf_vectors(texts: List[str]) -> sparse.csr_matrix:
+    """L2-normalized TF-IDF rows from the corpus model, reusing cached rows"""
+    model, version = get_model(), get_model_version()
+    entries = [text_features(t) for t in texts]
+    missing = [i for i, e in enumerate(entries) if e["vector_version"] != version]
+    if missing:
+        X = l2_normalize(model.transform([texts[i] for i in missing]), norm="l2", copy=False)
+        for row, i in enumerate(missing):
+            entries[i]["vector"] = X[row]
+            entries[i]["vector_version"] = version
+    return sparse.vstack([e["vector"] for e in entries], format="csr")
+
+
+def token_cache_stats() -> dict:
+    """Hit/miss counters for the preprocessing cache"""
+    return _token_cache.stats()
 
 
 def coverage_score(jd_text: str, resume_text: str) -> Tuple[float, List[str]]:
@@ -32,16 +79,53 @@ def coverage_score(jd_text: str, resume_text: str) -> Tuple[float, List[str]]:
 
 def cosine_match(jd_text: str, resume_text: str) -> float:
     """Calculate cosine similarity between job description and resume"""
-    vec = TfidfVectorizer(ngram_range=(1, 2), min_df=2, max_df=0.9)
-    X = vec.fit_transform([jd_text, resume_text])
-    a = X[0].toarray()[0]
-    b = X[1].toarray()[0]
-    dot = (a * b).sum()
-    denom = math.sqrt((a * a).sum()) * math.sqrt((b * b).sum())
-    return 0.0 if denom == 0 else dot / denom
+    if get_model() is not None:
+        X = tfidf_vectors([jd_text, resume_text])
+    else:
+        # No corpus model loaded: fall back to fitting on the pair itself
+        X = TfidfVectorizer(ngram_range=(1, 2)).fit_transform([jd_text, resume_text])
+        X = l2_normalize(X, norm="l2", copy=False)
+    # With L2-normalized CSR rows the cosine is a sparse dot product over
+    # the non-zero terms only; empty rows stay all-zero and score 0.0
+    return float(X[0].multiply(X[1]).sum())
 
 
-def compute_match(job_description: str, resume_text: str, cover_text: str = None, threshold: float = 0.70) -> dict:
+def _build_tweaks(final: float, missing: List[str], threshold: float,
+                  final_c: Optional[float] = None, missing_c: Optional[List[str]] = None) -> List[dict]:
+    """Suggested resume / cover letter tweaks for scores under the threshold"""
+    tweaks = []
+    if final < threshold:
+        top_missing = missing[:12]  # keep it digestible
+        tweaks.append({
+            "type": "resume",
+            "message": "Consider incorporating these keywords/phrases to improve ATS match:",
+            "keywords": top_missing
+        })
+    if final_c is not None and final_c < threshold:
+        tweaks.append({
+            "type": "cover_letter",
+            "message": "Suggested edits for your cover letter:",
+            "keywords": missing_c[:12]
+        })
+    return tweaks
+
+
+def lexical_blend(coverage: float, cosine: float) -> float:
+    """Lexical score: more weight on coverage for explainability"""
+    return 0.7 * coverage + 0.3 * cosine
+
+
+def blend_scores(lexical: float, semantic: Optional[float], engine: str = "lexical") -> float:
+    """Final score for an engine: lexical blend, semantic similarity, or their average"""
+    if engine == "semantic":
+        return semantic
+    if engine == "hybrid":
+        return 0.5 * lexical + 0.5 * semantic
+    return lexical
+
+
+def compute_match(job_description: str, resume_text: str, cover_text: str = None, threshold: float = 0.70,
+                  engine: str = "lexical") -> dict:
     """
     Compute match score between job and candidate.
     
@@ -50,35 +134,138 @@ def compute_match(job_description: str, resume_text: str, cover_text: str = None
         resume_text: Resume text
         cover_text: Optional cover letter text
         threshold: Minimum score threshold for suggestions
+        engine: "lexical" (coverage + TF-IDF), "semantic" (embeddings) or "hybrid"
         
     Returns:
         Dictionary with score, coverage, cosine similarity, and tweaks
     """
+    similarity = None
+    if engine != "lexical":
+        # Embedder only: worker processes must not open the ANN index for one pairwise score
+        from .semantic import pair_similarity as similarity
+
     cov, missing = coverage_score(job_description, resume_text)
     cos = cosine_match(job_description, resume_text)
-    # blend: put more weight on coverage for explainability
-    final = 0.7 * cov + 0.3 * cos
-    tweaks = []
-    if final < threshold:
-        top_missing = missing[:12]  # keep it digestible
-        tweaks.append({
-            "type": "resume",
-            "message": "Consider incorporating these keywords/phrases to improve ATS match:",
-            "keywords": top_missing
-        })
+    lexical = lexical_blend(cov, cos)
+    sem = similarity(job_description, resume_text) if similarity else None
+    final = blend_scores(lexical, sem, engine)
+    final_c, missing_c = None, None
     if cover_text:
         cov_c, missing_c = coverage_score(job_description, cover_text)
         cos_c = cosine_match(job_description, cover_text)
-        final_c = 0.7 * cov_c + 0.3 * cos_c
-        if final_c < threshold:
-            tweaks.append({
-                "type": "cover_letter",
-                "message": "Suggested edits for your cover letter:",
-                "keywords": missing_c[:12]
-            })
-    return {
+        sem_c = similarity(job_description, cover_text) if similarity else None
+        final_c = blend_scores(lexical_blend(cov_c, cos_c), sem_c, engine)
+    result = {
         "score": round(final, 3),
         "coverage": round(cov, 3),
         "cosine": round(cos, 3),
-        "tweaks": tweaks
+        "tweaks": _build_tweaks(final, missing, threshold, final_c, missing_c)
     }
+    if sem is not None:
+        result["semantic"] = round(sem, 3)
+    return result
+
+
+def top_k_indices(scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first.
+
+    Uses argpartition so only the selected k are sorted; k=None ranks everything.
+    """
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def _keyword_matrix(jd_keywords: List[set]) -> Tuple[sparse.csr_matrix, Dict[str, int]]:
+    """Binary job × keyword matrix plus its vocabulary"""
+    vocab: Dict[str, int] = {}
+    indices: List[int] = []
+    indptr = [0]
+    for kws in jd_keywords:
+        for kw in kws:
+            indices.append(vocab.setdefault(kw, len(vocab)))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float64)
+    J = sparse.csr_matrix((data, indices, indptr), shape=(len(jd_keywords), len(vocab)))
+    return J, vocab
+
+
+def _keyword_vector(kws: set, vocab: Dict[str, int]) -> sparse.csr_matrix:
+    """Binary column vector of the keywords that appear in the job vocabulary"""
+    rows = [vocab[kw] for kw in kws if kw in vocab]
+    data = np.ones(len(rows), dtype=np.float64)
+    return sparse.csr_matrix((data, (rows, [0] * len(rows))), shape=(len(vocab), 1))
+
+
+def compute_match_batch(jobs: List[Tuple[str, str]], resume_text: str, cover_text: str = None,
+                        threshold: float = 0.70, top_k: Optional[int] = None) -> List[dict]:
+    """
+    Score one resume (and optional cover letter) against many jobs at once.
+
+    The resume is tokenized and vectorized once. Keyword overlap and TF-IDF
+    dot products for every job come out of a single sparse matrix product
+    of [keyword matrix | TF-IDF matrix] against a block-diagonal query matrix.
+    Without a corpus model the cosine falls back to compute_match's per-pair
+    fit, so batch and single scores agree.
+
+    Args:
+        jobs: (job_id, job_description) pairs
+        resume_text: Resume text
+        cover_text: Optional cover letter text
+        threshold: Minimum score threshold for suggestions
+        top_k: Only return (and explain) the k best jobs
+
+    Returns:
+        Per-job match results ranked by score (best first)
+    """
+    if not jobs:
+        return []
+    ids = [job_id for job_id, _ in jobs]
+    descriptions = [desc or "" for _, desc in jobs]
+    queries = [resume_text] + ([cover_text] if cover_text else [])
+
+    jd_keywords = [keyword_set(d) for d in descriptions]
+    query_keywords = [keyword_set(q) for q in queries]
+    J, vocab = _keyword_matrix(jd_keywords)
+
+    n_queries = len(queries)
+    K = sparse.hstack([_keyword_vector(kws, vocab) for kws in query_keywords], format="csr")
+    if get_model() is not None:
+        # Columns: [resume overlap, cover overlap, ...] then [resume dot, cover dot, ...]
+        Q = sparse.block_diag([K, tfidf_vectors(queries).T], format="csr")
+        M = sparse.hstack([J, tfidf_vectors(descriptions)], format="csr")
+        S = (M @ Q).toarray()
+        overlap, cosine = S[:, :n_queries], S[:, n_queries:]
+    else:
+        # No corpus model loaded: IDF fitted over the whole batch would score
+        # each pair differently from /match, so fall back to per-pair fits
+        overlap = (J @ K).toarray()
+        cosine = np.array([[cosine_match(d, q) for q in queries] for d in descriptions])
+
+    jd_sizes = np.diff(J.indptr).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coverage = np.where(jd_sizes[:, None] > 0, overlap / jd_sizes[:, None], 0.0)
+    final = lexical_blend(coverage, cosine)
+
+    # Missing keywords and tweaks are only built for the jobs being returned
+    results = []
+    for i in top_k_indices(final[:, 0], top_k):
+        job_id = ids[i]
+        missing = list(jd_keywords[i] - query_keywords[0])
+        final_c, missing_c = None, None
+        if cover_text:
+            final_c = final[i, 1]
+            missing_c = list(jd_keywords[i] - query_keywords[1])
+        results.append({
+            "job_id": job_id,
+            "score": round(float(final[i, 0]), 3),
+            "coverage": round(float(coverage[i, 0]), 3),
+            "cosine": round(float(cosine[i, 0]), 3),
+            "tweaks": _build_tweaks(final[i, 0], missing, threshold, final_c, missing_c)
+        })
+    return results
@@ -0,0 +1,246 @@
+"""
+Profile and preference writes as single-statement upserts, and alert queries.
+
+Each save is one INSERT ... ON CONFLICT (user_id) DO UPDATE on PostgreSQL
+and SQLite, so concurrent saves for the same user cannot race between a
+SELECT and an INSERT. upsert_profiles imports many users in batched
+multi-row statements for onboarding jobs.
+
+Saves also fill the typed columns (name, email, location; titles, skills,
+salary range, remote) so alert queries filter on indexed columns instead of
+parsing profile_data JSON.
+
+Bulk import CLI (JSON list or JSONL of {"user_id", "profile", "preferences"}):
+    python -m app.services.profile_store import users.jsonl
+"""
+import json
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import exists, func, literal, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db import AsyncSessionLocal, dialect_insert, dispose_async_engine, init_db
+from ..models import UserProfile as UserProfileModel, UserPreferences as UserPreferencesModel
+
+UPSERT_BATCH_SIZE = 500
+
+
+async def _upsert(db: AsyncSession, model, rows: List[Dict[str, Any]]) -> None:
+    """Insert rows or update the existing ones with the same user_id"""
+    if not rows:
+        return
+    now = datetime.utcnow()
+    rows = [{**r, "created_at": now, "updated_at": now} for r in rows]
+    insert = dialect_insert(db.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(model).values(rows)
+        updated = {c: getattr(stmt.excluded, c) for c in rows[0] if c not in ("user_id", "created_at")}
+        await db.execute(stmt.on_conflict_do_update(index_elements=[model.user_id], set_=updated))
+        return
+    # Other backends: look up existing ids, then update or add
+    existing = {
+        obj.user_id: obj for obj in
+        (await db.scalars(select(model).where(model.user_id.in_([r["user_id"] for r in rows])))).all()
+    }
+    for r in rows:
+        obj = existing.get(r["user_id"])
+        if obj is None:
+            db.add(model(**r))
+        else:
+            for k, v in r.items():
+                if k != "created_at":
+                    setattr(obj, k, v)
+
+
+def _norm_list(values: Any) -> Optional[List[str]]:
+    """Lowercased, de-duplicated strings, the form the indexed list columns are queried in"""
+    if not values:
+        return None
+    if isinstance(values, str):
+        values = values.split(",")
+    out = [" ".join(str(v).lower().split()) for v in values]
+    return list(dict.fromkeys(v for v in out if v)) or None
+
+
+def _location_text(location: Any) -> Optional[str]:
+    if isinstance(location, dict):
+        return ", ".join(p for p in (location.get("city"), location.get("state")) if p) or None
+    return location or None
+
+
+def _remote(profile: Dict[str, Any], preferences: Dict[str, Any]) -> Optional[bool]:
+    location = preferences.get("location")
+    if isinstance(location, dict) and location.get("remote") is not None:
+        return bool(location["remote"])
+    job_types = {str(t).lower() for t in profile.get("job_types") or []}
+    if "remote" in job_types:
+        return True
+    if "on-site" in job_types:
+        return False
+    return None
+
+
+def profile_row(user_id: str, profile: Dict[str, Any], preferences: Dict[str, Any],
+                profile_data: Dict[str, Any]) -> Dict[str, Any]:
+    """user_profiles row: the stored JSON plus its typed columns"""
+    return {
+        "user_id": user_id,
+        "full_name": profile.get("name"),
+        "email": profile.get("email"),
+        "phone": profile.get("phone"),
+        "location": _location_text(preferences.get("location") or profile.get("location")),
+        "resume_text": profile.get("resume_text"),
+        "profile_data": profile_data,
+    }
+
+
+def preferences_row(user_id: str, profile: Dict[str, Any], preferences: Dict[str, Any]) -> Dict[str, Any]:
+    """user_preferences row: titles and skills come from the profile part, the rest from preferences"""
+    salary = preferences.get("salary") or {}
+    titles = profile.get("target_titles") or ([profile["title"]] if profile.get("title") else [])
+    industries = profile.get("industries") or []
+    return {
+        "user_id": user_id,
+        "target_titles": _norm_list(titles),
+        "target_skills": _norm_list(profile.get("skills")),
+        "industry": industries[0] if industries else None,
+        "location_preference": _location_text(preferences.get("location") or profile.get("location")),
+        "remote": _remote(profile, preferences),
+        "salary_min": salary.get("min", profile.get("min_salary")),
+        "salary_max": salary.get("max", profile.get("max_salary")),
+        "preferences_data": preferences,
+    }
+
+
+async def upsert_profile(db: AsyncSession, user_id: str, profile: Dict[str, Any],
+                         preferences: Optional[Dict[str, Any]] = None,
+                         profile_data: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Save one user's profile and preferences and commit.
+
+    `profile_data` is the JSON stored on user_profiles (defaults to
+    {"profile", "preferences"}, the POST /profile shape); typed columns on
+    both tables are filled from `profile` and `preferences`.
+    """
+    preferences = preferences or {}
+    if profile_data is None:
+        profile_data = {"profile": profile, "preferences": preferences}
+    await _upsert(db, UserProfileModel, [profile_row(user_id, profile, preferences, profile_data)])
+    await _upsert(db, UserPreferencesModel, [preferences_row(user_id, profile, preferences)])
+    await db.commit()
+
+
+async def upsert_profiles(db: AsyncSession, items: Iterable[Dict[str, Any]],
+                          batch_size: int = UPSERT_BATCH_SIZE) -> int:
+    """
+    Bulk import {"user_id", "profile", "preferences"} items, stored like POST /profile.
+
+    Runs one multi-row upsert per table per batch and commits per batch.
+    Returns the number of users written.
+    """
+    batch: Dict[str, Dict[str, Any]] = {}
+    written = 0
+
+    async def flush():
+        nonlocal written
+        if not batch:
+            return
+        profiles, prefs = [], []
+        for uid, it in batch.items():
+            profile, preferences = it.get("profile") or {}, it.get("preferences") or {}
+            profiles.append(profile_row(uid, profile, preferences, {"profile": profile, "preferences": preferences}))
+            prefs.append(preferences_row(uid, profile, preferences))
+        await _upsert(db, UserProfileModel, profiles)
+        await _upsert(db, UserPreferencesModel, prefs)
+        await db.commit()
+        written += len(batch)
+        batch.clear()
+
+    for item in items:
+        # A user_id repeated within a batch would hit ON CONFLICT twice in one statement; last one wins
+        batch[str(item["user_id"])] = item
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+    return written
+
+
+# ===== ALERT QUERIES =====
+
+def _contains(column, value: str, dialect: str):
+    """`value` is an element of the JSON list column (GIN-indexed @> on PostgreSQL)"""
+    if dialect == "postgresql":
+        return type_coerce(column, JSONB).contains([value])
+    each = func.json_each(column).table_valued("value")
+    return exists(select(literal(1)).select_from(each).where(each.c.value == value))
+
+
+async def find_alert_recipients(db: AsyncSession, title: Optional[str] = None, remote: Optional[bool] = None,
+                                min_salary: Optional[int] = None, skills: Optional[List[str]] = None,
+                                location: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Users whose saved preferences match an alert, e.g. remote data-engineer roles over $120k:
+    find_alert_recipients(db, title="data engineer", remote=True, min_salary=120000).
+
+    `min_salary` selects users whose own minimum is at least that amount.
+    """
+    dialect = db.get_bind().dialect.name
+    P = UserPreferencesModel
+    stmt = select(P.user_id, P.target_titles, P.remote, P.salary_min, P.salary_max, P.location_preference)
+    if title:
+        stmt = stmt.where(_contains(P.target_titles, _norm_list([title])[0], dialect))
+    for skill in _norm_list(skills) or []:
+        stmt = stmt.where(_contains(P.target_skills, skill, dialect))
+    if remote is not None:
+        stmt = stmt.where(P.remote.is_(remote))
+    if min_salary is not None:
+        stmt = stmt.where(P.salary_min >= min_salary)
+    if location:
+        stmt = stmt.where(P.location_preference == location)
+    stmt = stmt.order_by(P.user_id)
+    if limit:
+        stmt = stmt.limit(limit)
+    return [dict(row._mapping) for row in await db.execute(stmt)]
+
+
+# ===== CLI =====
+
+def _read_items(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+
+async def _import(paths: List[str]) -> int:
+    init_db()
+    total = 0
+    try:
+        async with AsyncSessionLocal() as db:
+            for path in paths:
+                n = await upsert_profiles(db, _read_items(path))
+                print(f"✅ {path}: {n} profiles upserted")
+                total += n
+    finally:
+        await dispose_async_engine()
+    return total
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk profile import")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Upsert profiles from JSON / JSONL files")
+    imp.add_argument("paths", nargs="+")
+    args = parser.parse_args(argv)
+    if args.command == "import":
+        total = asyncio.run(_import(args.paths))
+        print(f"Imported {total} profiles")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Resume text extraction with a content-addressed disk cache.
+
+Files are identified by the SHA-256 of their bytes, and the extracted text
+and parse metadata are cached under RESUME_CACHE_DIR, so the same resume is
+parsed once however often it is uploaded or re-run. The cache holds resume
+text in plaintext: it is capped at RESUME_CACHE_MAX_MB (oldest entries are
+evicted first), entries expire after RESUME_CACHE_TTL_DAYS, and the API's
+extractor only uses it when RESUME_CACHE_API=1. Sources can be paths,
+bytes or file-like objects (an upload's file handle is read directly, no
+temp copy). PDFs with at least RESUME_PDF_PARALLEL_PAGES pages have their
+pages extracted in parallel worker processes.
+
+Bulk import of a folder runs one file per core:
+    python -m app.services.resume_extract bulk resumes/ --out resumes.jsonl
+    python -m app.services.resume_extract extract resume.pdf
+"""
+import os
+import io
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    from pypdf import PdfReader  # type: ignore
+    PDF_PARSER = "pypdf"
+except ImportError:
+    try:
+        from PyPDF2 import PdfReader  # type: ignore
+        PDF_PARSER = "PyPDF2"
+    except ImportError:
+        PdfReader = None  # type: ignore
+        PDF_PARSER = None
+
+try:
+    import docx  # python-docx
+except ImportError:
+    docx = None  # type: ignore
+
+RESUME_CACHE_DIR = os.getenv("RESUME_CACHE_DIR", "./resume_cache")
+RESUME_CACHE_MAX_MB = float(os.getenv("RESUME_CACHE_MAX_MB", "256"))
+RESUME_CACHE_TTL_DAYS = float(os.getenv("RESUME_CACHE_TTL_DAYS", "30"))
+RESUME_CACHE_API = os.getenv("RESUME_CACHE_API", "0") == "1"  # uploads are cached only if opted in
+RESUME_PDF_PARALLEL_PAGES = int(os.getenv("RESUME_PDF_PARALLEL_PAGES", "16"))
+RESUME_PDF_WORKERS = int(os.getenv("RESUME_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Bump when extraction output changes, so older cache entries are re-parsed
+EXTRACTOR_VERSION = 1
+READ_CHUNK = 1 << 16
+SUPPORTED_SUFFIXES = (".pdf", ".docx", ".txt")
+
+Source = Union[str, bytes, BinaryIO]
+
+
+class ResumeExtractError(Exception):
+    """The file could not be parsed (unsupported format, missing parser, corrupt file)"""
+
+
+def read_source(source: Source) -> Tuple[bytes, str]:
+    """(bytes, sha256) of a path, bytes or binary file-like object, hashed while reading"""
+    if isinstance(source, (bytes, bytearray)):
+        data = bytes(source)
+        return data, hashlib.sha256(data).hexdigest()
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return read_source(f)
+    h = hashlib.sha256()
+    buf = io.BytesIO()
+    while True:
+        chunk = source.read(READ_CHUNK)
+        if not chunk:
+            break
+        h.update(chunk)
+        buf.write(chunk)
+    return buf.getvalue(), h.hexdigest()
+
+
+def detect_format(data: bytes, filename: str = "") -> str:
+    """pdf / docx / txt from the file's magic bytes, falling back to its extension"""
+    if data[:5] == b"%PDF-":
+        return "pdf"
+    if data[:4] == b"PK\x03\x04" and not filename.lower().endswith((".pdf", ".txt")):
+        return "docx"
+    suffix = os.path.splitext(filename.lower())[1]
+    if suffix in (".pdf", ".docx"):
+        raise ResumeExtractError(f"{filename} does not look like a valid {suffix[1:].upper()} file")
+    if suffix and suffix != ".txt":
+        raise ResumeExtractError(f"Unsupported resume format: {suffix} (use PDF, DOCX, or TXT)")
+    return "txt"
+
+
+# ===== PARSERS =====
+
+def _pdf_pages(data: bytes, start: int, end: int) -> List[str]:
+    """Text of pages [start, end); runs in worker processes for long PDFs"""
+    reader = PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+_page_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_page_pool() -> ProcessPoolExecutor:
+    global _page_pool
+    if _page_pool is None:
+        # spawn: workers must not inherit the API's threads, sockets or DB pool
+        _page_pool = ProcessPoolExecutor(max_workers=RESUME_PDF_WORKERS,
+                                         mp_context=multiprocessing.get_context("spawn"))
+    return _page_pool
+
+
+def shutdown_page_pool() -> None:
+    global _page_pool
+    if _page_pool is not None:
+        _page_pool.shutdown(wait=True, cancel_futures=True)
+        _page_pool = None
+
+
+def extract_pdf(data: bytes, parallel: bool = True) -> Tuple[str, Dict[str, Any]]:
+    if PdfReader is None:
+        raise ResumeExtractError("No PDF library installed (pypdf / PyPDF2)")
+    try:
+        n_pages = len(PdfReader(io.BytesIO(data)).pages)
+        workers = min(RESUME_PDF_WORKERS, n_pages)
+        if parallel and workers > 1 and n_pages >= RESUME_PDF_PARALLEL_PAGES:
+            step = -(-n_pages // workers)
+            ranges = [(s, min(s + step, n_pages)) for s in range(0, n_pages, step)]
+            pool = _get_page_pool()
+            futures = [pool.submit(_pdf_pages, data, s, e) for s, e in ranges]
+            pages = [text for f in futures for text in f.result()]
+        else:
+            workers = 1
+            pages = _pdf_pages(data, 0, n_pages)
+    except ResumeExtractError:
+        raise
+    except Exception as e:
+        raise ResumeExtractError(f"PDF read error: {e}") from e
+    text = "\n".join(p for p in pages if p)
+    return text, {"pages": n_pages, "parser": PDF_PARSER, "workers": workers}
+
+
+def extract_docx(data: bytes) -> Tuple[str, Dict[str, Any]]:
+    if docx is None:
+        raise ResumeExtractError("python-docx not installed; cannot read DOCX")
+    try:
+        document = docx.Document(io.BytesIO(data))
+    except Exception as e:
+        raise ResumeExtractError(f"DOCX read error: {e}") from e
+    paragraphs = [p.text for p in document.paragraphs]
+    return "\n".join(paragraphs), {"paragraphs": len(paragraphs), "parser": "python-docx"}
+
+
+def extract_txt(data: bytes) -> Tuple[str, Dict[str, Any]]:
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise ResumeExtractError(f"Not a UTF-8 text file (invalid byte at offset {e.start}); use PDF, DOCX, or TXT") from e
+    if "\x00" in text:
+        raise ResumeExtractError("Not a text file (contains NUL bytes); use PDF, DOCX, or TXT")
+    return text, {"parser": "utf-8"}
+
+
+# ===== CACHED EXTRACTOR =====
+
+class ResumeExtractor:
+    """Extract text from resume files, cached on disk by content hash"""
+
+    def __init__(self, cache_dir: Optional[str] = RESUME_CACHE_DIR,
+                 max_bytes: int = int(RESUME_CACHE_MAX_MB * 1024 * 1024),
+                 ttl: float = RESUME_CACHE_TTL_DAYS * 86400):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.evicted = 0
+        self._cache_bytes: Optional[int] = None  # running total, measured on the first store
+
+    def _cache_path(self, digest: str) -> Optional[str]:
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json") if self.cache_dir else None
+
+    def cached(self, digest: str) -> Optional[Dict[str, Any]]:
+        path = self._cache_path(digest)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            if self.ttl > 0 and time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                self.evicted += 1
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("extractor_version") == EXTRACTOR_VERSION else None
+
+    def _store(self, entry: Dict[str, Any]) -> None:
+        path = self._cache_path(entry["hash"])
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        size = os.path.getsize(path)
+        if self._cache_bytes is None:
+            self._cache_bytes = sum(size for _, size, _ in self._entries())
+        else:
+            self._cache_bytes += size
+        if self.max_bytes > 0 and self._cache_bytes > self.max_bytes:
+            self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every cache file"""
+        out = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the oldest ones until the cache is under 90% of max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        cutoff = time.time() - self.ttl if self.ttl > 0 else float("-inf")
+        target = int(self.max_bytes * 0.9)
+        for mtime, size, path in entries:
+            if mtime >= cutoff and total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evicted += 1
+        self._cache_bytes = total
+
+    def extract(self, source: Source, filename: Optional[str] = None, parallel: bool = True) -> Dict[str, Any]:
+        """
+        {"hash", "text", "format", "chars", "cached", ...parse metadata} for one file.
+
+        Raises ResumeExtractError if the file cannot be parsed.
+        """
+        if filename is None and isinstance(source, str):
+            filename = source
+        filename = os.path.basename(filename or "")
+        data, digest = read_source(source)
+        entry = self.cached(digest)
+        if entry is not None:
+            self.hits += 1
+            return {**entry, "filename": filename or entry.get("filename", ""), "cached": True}
+
+        self.misses += 1
+        t0 = time.perf_counter()
+        try:
+            fmt = detect_format(data, filename)
+            if fmt == "pdf":
+                text, meta = extract_pdf(data, parallel=parallel)
+            elif fmt == "docx":
+                text, meta = extract_docx(data)
+            else:
+                text, meta = extract_txt(data)
+        except ResumeExtractError:
+            self.errors += 1
+            raise
+        entry = {
+            "hash": digest,
+            "filename": filename,
+            "format": fmt,
+            "bytes": len(data),
+            "chars": len(text),
+            **meta,
+            "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2),
+            "extracted_at": datetime.utcnow().isoformat() + "Z",
+            "extractor_version": EXTRACTOR_VERSION,
+            "text": text,
+        }
+        self._store(entry)
+        return {**entry, "cached": False}
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+            "cache_dir": self.cache_dir,
+            "cache_bytes": self._cache_bytes,
+            "evicted": self.evicted,
+            "pdf_parser": PDF_PARSER,
+            "docx_parser": "python-docx" if docx is not None else None,
+        }
+
+
+_extractor: Optional[ResumeExtractor] = None
+
+
+def get_extractor() -> ResumeExtractor:
+    global _extractor
+    if _extractor is None:
+        _extractor = ResumeExtractor(RESUME_CACHE_DIR if RESUME_CACHE_API else None)
+    return _extractor
+
+
+# ===== BULK =====
+
+def _extract_one(args: Tuple[str, Optional[str]]) -> Dict[str, Any]:
+    """Worker: one file, pages serially (the pool is already one file per core)"""
+    path, cache_dir = args
+    try:
+        return ResumeExtractor(cache_dir).extract(path, parallel=False)
+    except (ResumeExtractError, OSError) as e:
+        return {"filename": os.path.basename(path), "error": str(e)}
+
+
+def iter_resume_files(folder: str) -> Iterator[str]:
+    for root, _, files in os.walk(folder):
+        for name in sorted(files):
+            if name.lower().endswith(SUPPORTED_SUFFIXES):
+                yield os.path.join(root, name)
+
+
+def extract_folder(folder: str, workers: Optional[int] = None,
+                   cache_dir: Optional[str] = RESUME_CACHE_DIR) -> Iterator[Dict[str, Any]]:
+    """Extract every resume under `folder` across `workers` processes (default: all cores), in file order"""
+    paths = list(iter_resume_files(folder))
+    workers = workers or os.cpu_count() or 1
+    jobs = [(p, cache_dir) for p in paths]
+    if workers <= 1 or len(paths) < 2:
+        yield from map(_extract_one, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        yield from pool.map(_extract_one, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+
+
+# ===== CLI =====
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Resume text extraction")
+    sub = parser.add_subparsers(dest="command", required=True)
+    one = sub.add_parser("extract", help="Extract one file and print its metadata")
+    one.add_argument("path")
+    bulk = sub.add_parser("bulk", help="Extract every PDF / DOCX / TXT under a folder")
+    bulk.add_argument("folder")
+    bulk.add_argument("--out", help="Write one JSON object per file here (JSONL)")
+    bulk.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    if args.command == "extract":
+        entry = ResumeExtractor().extract(args.path)
+        print(json.dumps({k: v for k, v in entry.items() if k != "text"}, indent=2))
+        return
+
+    t0 = time.perf_counter()
+    done = failed = cached = 0
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    try:
+        for entry in extract_folder(args.folder, workers=args.workers):
+            if "error" in entry:
+                failed += 1
+                print(f"❌ {entry['filename']}: {entry['error']}")
+            else:
+                done += 1
+                cached += entry["cached"]
+            if out is not None:
+                out.write(json.dumps(entry) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+    print(f"✅ {done} resumes extracted ({cached} from cache), {failed} failed "
+          f"in {time.perf_counter() - t0:.1f}s with {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Cache of upstream job-search results keyed by a fingerprint of the TheirStack filters.
+
+Repeated searches (re-clicking "Run Search", page reloads) are served from
+the cache instead of spending TheirStack credits. Entries are fresh for
+SEARCH_CACHE_TTL seconds. For a further SEARCH_CACHE_STALE_TTL seconds a
+stale entry is still returned immediately while one background task
+re-fetches it (stale-while-revalidate).
+
+Backends (SEARCH_CACHE_BACKEND):
+    memory  in-process LRU (default)
+    sqlite  shared file at SEARCH_CACHE_PATH, usable by several API workers
+    redis   any Redis-compatible server at SEARCH_CACHE_URL (needs the `redis` package)
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from .token_cache import LRUCache
+
+SEARCH_CACHE_BACKEND = os.getenv("SEARCH_CACHE_BACKEND", "memory")
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "900"))              # seconds fresh
+SEARCH_CACHE_STALE_TTL = float(os.getenv("SEARCH_CACHE_STALE_TTL", "3600"))  # extra seconds served stale
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "512"))
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", "./search_cache.db")
+SEARCH_CACHE_URL = os.getenv("SEARCH_CACHE_URL", "redis://localhost:6379/0")
+
+Entry = Tuple[Any, float]  # (value, stored_at unix time)
+
+# Filters TheirStack matches case-insensitively; only these are case- and whitespace-folded.
+# Everything else (company_name_not, description patterns, ...) is kept verbatim.
+FREE_TEXT_FIELDS = frozenset({"job_title_or", "job_title_not", "job_location_pattern_or", "job_location_pattern_not"})
+
+
+def _canonical(value: Any, free_text: bool = False) -> Any:
+    """Normalize filters so equivalent requests produce the same fingerprint"""
+    if isinstance(value, dict):
+        return {k: _canonical(v, k in FREE_TEXT_FIELDS) for k, v in sorted(value.items())
+                if v not in (None, [], "", {})}
+    if isinstance(value, (list, tuple, set)):
+        items = [_canonical(v, free_text) for v in value]
+        return sorted(items, key=lambda v: json.dumps(v, sort_keys=True, default=str))
+    if isinstance(value, str) and free_text:
+        return " ".join(value.lower().split())
+    return value
+
+
+def fingerprint(filters: Any) -> str:
+    """sha256 of the canonical JSON form of a request's upstream filters"""
+    payload = json.dumps(_canonical(filters), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ===== BACKENDS =====
+
+class MemoryBackend:
+    name = "memory"
+    blocking = False
+
+    def __init__(self, maxsize: int = SEARCH_CACHE_SIZE, max_age: float = SEARCH_CACHE_TTL + SEARCH_CACHE_STALE_TTL):
+        self._lru = LRUCache(maxsize=maxsize, ttl=max_age)
+
+    def get(self, key: str) -> Optional[Entry]:
+        return self._lru.get(key)
+
+    def set(self, key: str, value: Any, stored_at: float) -> None:
+        self._lru.set(key, (value, stored_at))
+
+    def delete(self, key: str) -> None:
+        self._lru.pop(key)
+
+    def clear(self) -> None:
+        self._lru.clear()
+
+    def size(self) -> int:
+        return len(self._lru)
+
+
+class SQLiteBackend:
+    """Shared across processes through one SQLite file; values are stored as JSON"""
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str = SEARCH_CACHE_PATH, max_age: float = SEARCH_CACHE_TTL + SEARCH_CACHE_STALE_TTL):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, stored_at FROM search_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if time.time() - row[1] > self.max_age:
+            self.delete(key)
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, stored_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO search_cache (key, value, stored_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, stored_at = excluded.stored_at",
+                (key, json.dumps(value, default=str), stored_at),
+            )
+            self._conn.execute("DELETE FROM search_cache WHERE stored_at < ?", (time.time() - self.max_age,))
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+
+
+class RedisBackend:
+    """Any Redis-compatible server; expiry is delegated to the server"""
+    name = "redis"
+    blocking = True
+
+    def __init__(self, url: str = SEARCH_CACHE_URL, max_age: float = SEARCH_CACHE_TTL + SEARCH_CACHE_STALE_TTL):
+        import redis  # optional dependency
+        self._redis = redis.Redis.from_url(url)
+        self.max_age = max_age
+        self.prefix = "skillscout:search:"
+
+    def get(self, key: str) -> Optional[Entry]:
+        raw = self._redis.get(self.prefix + key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["value"], entry["stored_at"]
+
+    def set(self, key: str, value: Any, stored_at: float) -> None:
+        payload = json.dumps({"value": value, "stored_at": stored_at}, default=str)
+        self._redis.set(self.prefix + key, payload, ex=max(1, int(self.max_age)))
+
+    def delete(self, key: str) -> None:
+        self._redis.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        for k in self._redis.scan_iter(self.prefix + "*"):
+            self._redis.delete(k)
+
+    def size(self) -> int:
+        return sum(1 for _ in self._redis.scan_iter(self.prefix + "*"))
+
+
+def make_backend(name: str = SEARCH_CACHE_BACKEND):
+    if name == "sqlite":
+        return SQLiteBackend()
+    if name == "redis":
+        return RedisBackend()
+    return MemoryBackend()
+
+
+# ===== CACHE =====
+
+class SearchCache:
+    """Fresh / stale / miss lookups with background revalidation and credit accounting"""
+
+    def __init__(self, backend=None, ttl: float = SEARCH_CACHE_TTL, stale_ttl: float = SEARCH_CACHE_STALE_TTL):
+        self.backend = backend or MemoryBackend(max_age=ttl + stale_ttl)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.revalidation_errors = 0
+        self.credits_saved = 0  # TheirStack bills one credit per job returned
+
+    async def _backend_call(self, method: str, *args) -> Any:
+        """Backend I/O (file locks, sockets) runs in the threadpool, never on the event loop"""
+        fn = getattr(self.backend, method)
+        if getattr(self.backend, "blocking", True):
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[list]]) -> list:
+        entry = await self._backend_call("get", key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age <= self.ttl:
+                self.hits += 1
+                self.credits_saved += len(value)
+                return value
+            if age <= self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self.credits_saved += len(value)
+                self._revalidate(key, fetch)
+                return value
+        self.misses += 1
+        value = await fetch()
+        await self._backend_call("set", key, value, time.time())
+        return value
+
+    def _revalidate(self, key: str, fetch: Callable[[], Awaitable[list]]) -> None:
+        """Start one background refresh per key"""
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                value = await fetch()
+                await self._backend_call("set", key, value, time.time())
+                self.revalidations += 1
+            except Exception as e:
+                self.revalidation_errors += 1
+                print(f"⚠️ Search cache revalidation failed: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.get_running_loop().create_task(refresh())
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        if key is None:
+            self.backend.clear()
+        else:
+            self.backend.delete(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "size": self.backend.size(),
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+            "revalidations": self.revalidations,
+            "revalidation_errors": self.revalidation_errors,
+            "credits_saved": self.credits_saved,
+        }
+
+
+_cache: Optional[SearchCache] = None
+
+
+def get_search_cache() -> SearchCache:
+    """Process-wide cache on the configured backend"""
+    global _cache
+    if _cache is None:
+        _cache = SearchCache(make_backend())
+    return _cache
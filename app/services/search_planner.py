@@ -0,0 +1,196 @@
+"""
+Search planner: expand a profile into TheirStack sub-queries and run them concurrently.
+
+One search body per (target title × location × seniority) is sent in
+parallel, bounded by SEARCH_CONCURRENCY, and the results are merged
+round-robin and deduplicated by job id and URL. End-to-end latency is the
+slowest sub-query rather than the sum of them. TheirStack bills per job
+returned, so the sub-queries together never ask for more than
+SEARCH_BUDGET_FACTOR × limit jobs. Combinations beyond that budget are
+dropped, interleaved by title so extra locations and seniorities go before
+other titles.
+
+search_window pages every sub-query through its whole window instead
+(Harvester.pages), for refreshes that must see every matching job.
+"""
+import os
+import math
+import asyncio
+from itertools import product, zip_longest
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from ..integrations import theirstack
+from ..schemas import Job, UserProfile, UserPreferences
+from .harvester import Harvester
+
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "4"))
+SEARCH_MAX_SUBQUERIES = int(os.getenv("SEARCH_MAX_SUBQUERIES", "24"))
+SEARCH_MIN_PER_QUERY = int(os.getenv("SEARCH_MIN_PER_QUERY", "10"))
+SEARCH_BUDGET_FACTOR = float(os.getenv("SEARCH_BUDGET_FACTOR", "2"))
+REFRESH_MAX_PAGES = int(os.getenv("REFRESH_MAX_PAGES", "50"))  # per sub-query, in search_window
+
+Fetch = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def plan_queries(user_profile: UserProfile, user_preferences: UserPreferences,
+                 limit: int = 50, max_queries: int = SEARCH_MAX_SUBQUERIES,
+                 filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """One JobSearchFilters body per title × location × seniority; `filters` are added to every body"""
+    base = theirstack.build_search_body(user_profile, user_preferences, limit)
+    base.update(filters or {})
+    loc = user_preferences.location
+
+    titles = [[t] for t in dict.fromkeys(user_profile.target_titles)] or [None]
+    locations: List[Optional[List[str]]] = [None]
+    if not loc.remote:
+        patterns = [theirstack.location_pattern(user_preferences)] + [
+            p.lower() for p in loc.additional_locations
+        ]
+        patterns = [p for p in dict.fromkeys(patterns) if p]
+        locations = [[p] for p in patterns] or [None]
+    seniorities = [[s] for s in theirstack.map_experience_to_seniority(user_profile.experience_level)] or [None]
+
+    # Round-robin over titles, so truncating the list drops locations / seniorities before titles
+    per_title = [list(product([t], locations, seniorities)) for t in titles]
+    combos = [c for row in zip_longest(*per_title) for c in row if c is not None][:max(1, max_queries)]
+    # Each sub-query asks for its share of the limit, but enough to survive dedupe
+    per_query = min(limit, max(math.ceil(limit / len(combos)), SEARCH_MIN_PER_QUERY))
+    # ...and all of them together at most SEARCH_BUDGET_FACTOR × limit credits
+    combos = combos[:max(1, int(SEARCH_BUDGET_FACTOR * limit) // per_query)]
+
+    bodies = []
+    for title, location, seniority in combos:
+        body = dict(base, limit=per_query)
+        for key, value in (("job_title_or", title), ("job_location_pattern_or", location),
+                           ("job_seniority_or", seniority)):
+            if value is not None:
+                body[key] = value
+        bodies.append(body)
+    return bodies
+
+
+async def _fetch_all(bodies: List[Dict[str, Any]], fetch: Fetch,
+                     concurrency: int = SEARCH_CONCURRENCY) -> List[Optional[List[Dict[str, Any]]]]:
+    """Run sub-queries with at most `concurrency` in flight; failed sub-queries yield None"""
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(body):
+        async with sem:
+            return await fetch(body)
+
+    responses = await asyncio.gather(*(one(b) for b in bodies), return_exceptions=True)
+    errors = [r for r in responses if isinstance(r, BaseException)]
+    if errors and len(errors) == len(responses):
+        raise errors[0]
+    for err in errors:
+        print(f"⚠️ Search sub-query failed: {err}")
+    return [None if isinstance(r, BaseException) else r.get("data", []) for r in responses]
+
+
+async def run_queries(bodies: List[Dict[str, Any]], fetch: Fetch,
+                      concurrency: int = SEARCH_CONCURRENCY) -> List[List[Dict[str, Any]]]:
+    """Run sub-queries with at most `concurrency` in flight; failed sub-queries yield []"""
+    return [rows or [] for rows in await _fetch_all(bodies, fetch, concurrency)]
+
+
+def _url_key(url: str) -> str:
+    parts = urlsplit(url.strip().lower())
+    return f"{parts.netloc}{parts.path.rstrip('/')}"
+
+
+def merge_results(result_lists: List[List[Dict[str, Any]]], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Interleave sub-query results and drop duplicates by job id or URL"""
+    seen_ids, seen_urls = set(), set()
+    merged = []
+    for row in zip_longest(*result_lists):
+        for raw in row:
+            if raw is None:
+                continue
+            job_id = raw.get("id")
+            urls = {_url_key(u) for u in (raw.get("final_url"), raw.get("url")) if u}
+            if (job_id is not None and job_id in seen_ids) or urls & seen_urls:
+                continue
+            if job_id is not None:
+                seen_ids.add(job_id)
+            seen_urls |= urls
+            merged.append(raw)
+            if limit is not None and len(merged) >= limit:
+                return merged
+    return merged
+
+
+async def search_jobs_with_status(user_profile: UserProfile, user_preferences: UserPreferences,
+                                  limit: int = 50, fetch: Optional[Fetch] = None,
+                                  concurrency: int = SEARCH_CONCURRENCY,
+                                  filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Job], bool]:
+    """
+    (merged, deduplicated jobs, complete) for a profile.
+
+    The result is complete only if every sub-query succeeded and returned
+    fewer rows than it asked for, and the merged list was not cut at
+    `limit`; otherwise TheirStack may hold matching jobs that were not fetched.
+    """
+    fetch = fetch or theirstack.get_client().search_jobs_raw
+    bodies = plan_queries(user_profile, user_preferences, limit, filters=filters)
+    results = await _fetch_all(bodies, fetch, concurrency)
+    complete = all(rows is not None and len(rows) < body["limit"] for body, rows in zip(bodies, results))
+    merged = merge_results([rows or [] for rows in results])
+    complete = complete and len(merged) <= limit
+    return [theirstack.to_job(raw) for raw in merged[:limit]], complete
+
+
+async def _harvest_all(bodies: List[Dict[str, Any]], fetch: Fetch, concurrency: int = SEARCH_CONCURRENCY,
+                       max_pages: Optional[int] = REFRESH_MAX_PAGES) -> List[Optional[Tuple[List[Dict[str, Any]], bool]]]:
+    """
+    (rows, exhausted) per sub-query, paging each one to the end of its window;
+    exhausted is False if it stopped at max_pages on a full page. Failed
+    sub-queries yield None.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(body):
+        async with sem:
+            harvester = Harvester(body, fetch=fetch, page_size=body["limit"], max_pages=max_pages,
+                                  checkpoint_dir=None)
+            rows, pages, full = [], 0, False
+            async for page, jobs in harvester.pages():
+                rows.extend(jobs)
+                pages, full = page + 1, len(jobs) >= body["limit"]
+            return rows, not (max_pages is not None and pages >= max_pages and full)
+
+    results = await asyncio.gather(*(one(b) for b in bodies), return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors and len(errors) == len(results):
+        raise errors[0]
+    for err in errors:
+        print(f"⚠️ Search sub-query failed: {err}")
+    return [None if isinstance(r, BaseException) else r for r in results]
+
+
+async def search_window(user_profile: UserProfile, user_preferences: UserPreferences,
+                        limit: int = 50, fetch: Optional[Fetch] = None,
+                        concurrency: int = SEARCH_CONCURRENCY, filters: Optional[Dict[str, Any]] = None,
+                        max_pages: Optional[int] = REFRESH_MAX_PAGES) -> Tuple[List[Job], bool]:
+    """
+    (every job in the window, complete) for a profile.
+
+    Each sub-query is paged to its end (`limit` sets the page size), so the
+    result is complete unless a sub-query failed or ran into `max_pages`.
+    Credits are spent on every job in the window, once.
+    """
+    fetch = fetch or theirstack.get_client().search_jobs_raw
+    bodies = plan_queries(user_profile, user_preferences, limit, filters=filters)
+    results = await _harvest_all(bodies, fetch, concurrency, max_pages)
+    complete = all(r is not None and r[1] for r in results)
+    merged = merge_results([r[0] if r else [] for r in results])
+    return [theirstack.to_job(raw) for raw in merged], complete
+
+
+async def search_jobs(user_profile: UserProfile, user_preferences: UserPreferences,
+                      limit: int = 50, fetch: Optional[Fetch] = None,
+                      concurrency: int = SEARCH_CONCURRENCY,
+                      filters: Optional[Dict[str, Any]] = None) -> List[Job]:
+    """Fan the profile out into sub-queries and return merged, deduplicated jobs"""
+    jobs, _ = await search_jobs_with_status(user_profile, user_preferences, limit, fetch, concurrency, filters)
+    return jobs
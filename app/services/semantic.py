@@ -0,0 +1,390 @@
+"""
+Semantic matching engine: local CPU embeddings plus an IVF nearest-neighbour index.
+
+Texts are embedded offline on CPU. By default the embedder is a hashed
+random projection (word uni/bigrams hashed into 2**18 buckets, projected to
+EMBEDDING_DIM dense dims), so no model download is needed. If SEMANTIC_MODEL
+names a sentence-transformers model and the package is installed, that model
+is used instead.
+
+Job vectors live in a memory-mapped float32 matrix under SEMANTIC_INDEX_DIR.
+Search is exact below IVF_MIN_ROWS vectors and switches to an inverted-file
+(IVF) index with a spherical k-means coarse quantizer above that.
+"""
+import os
+import json
+import threading
+from array import array
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.random_projection import SparseRandomProjection
+
+from .matching import top_k_indices
+
+try:
+    from sentence_transformers import SentenceTransformer  # type: ignore
+except ImportError:
+    SentenceTransformer = None  # type: ignore
+
+SEMANTIC_MODEL = os.getenv("SEMANTIC_MODEL", "")
+SEMANTIC_INDEX_DIR = os.getenv("SEMANTIC_INDEX_DIR", "./models/semantic")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+IVF_MIN_ROWS = int(os.getenv("IVF_MIN_ROWS", "4096"))
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "16"))
+
+ENGINES = ("lexical", "semantic", "hybrid")
+
+
+def _l2_rows(X: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (X / norms).astype(np.float32, copy=False)
+
+
+# ===== EMBEDDERS =====
+
+class HashedProjectionEmbedder:
+    """Feature hashing followed by a fixed sparse random projection"""
+
+    name = "hashed-projection"
+
+    def __init__(self, dim: int = EMBEDDING_DIM, n_features: int = 2 ** 18, seed: int = 42):
+        self.dim = dim
+        self._hasher = HashingVectorizer(
+            ngram_range=(1, 2), n_features=n_features, alternate_sign=False, norm="l2"
+        )
+        # Fitting only draws the random matrix from the input shape
+        self._projection = SparseRandomProjection(n_components=dim, dense_output=True, random_state=seed)
+        self._projection.fit(self._hasher.transform([""]))
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return _l2_rows(self._projection.transform(self._hasher.transform(texts)))
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model pinned to CPU"""
+
+    def __init__(self, model_name: str):
+        self.name = model_name
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return _l2_rows(np.asarray(self._model.encode(texts, batch_size=32), dtype=np.float32))
+
+
+def build_embedder():
+    if SEMANTIC_MODEL and SentenceTransformer is not None:
+        return SentenceTransformerEmbedder(SEMANTIC_MODEL)
+    if SEMANTIC_MODEL:
+        print(f"⚠️ sentence-transformers not installed; using hashed projection instead of {SEMANTIC_MODEL}")
+    return HashedProjectionEmbedder()
+
+
+@lru_cache(maxsize=1)
+def get_embedder():
+    """
+    Process-wide embedder. It holds no index state, so match workers use it
+    for pairwise similarity without opening the vector store.
+    """
+    return build_embedder()
+
+
+def pair_similarity(a: str, b: str) -> float:
+    X = get_embedder().embed([a, b])
+    return max(0.0, float(X[0] @ X[1]))
+
+
+# ===== VECTOR STORE =====
+
+class VectorStore:
+    """Append/overwrite float32 vectors in a memory-mapped file, addressed by job id"""
+
+    def __init__(self, path: str, dim: int, embedder_name: str):
+        self.path = path
+        self.dim = dim
+        os.makedirs(path, exist_ok=True)
+        self._vec_path = os.path.join(path, "vectors.f32")
+        self._ids_path = os.path.join(path, "ids.jsonl")
+        meta_path = os.path.join(path, "meta.json")
+
+        meta = {"dim": dim, "embedder": embedder_name}
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                if json.load(f) != meta:
+                    # Different embedder: stored vectors are not comparable
+                    for p in (self._vec_path, self._ids_path):
+                        if os.path.exists(p):
+                            os.remove(p)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        self.ids: List[str] = []
+        if os.path.exists(self._ids_path):
+            with open(self._ids_path, "r", encoding="utf-8") as f:
+                self.ids = [json.loads(line) for line in f if line.strip()]
+        self.row_of: Dict[str, int] = {job_id: i for i, job_id in enumerate(self.ids)}
+        self._mm: Optional[np.memmap] = None
+        self._open(max(1024, len(self.ids)))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _open(self, capacity: int) -> None:
+        size = capacity * self.dim * 4
+        mode = "r+b" if os.path.exists(self._vec_path) else "w+b"
+        with open(self._vec_path, mode) as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < size:
+                f.truncate(size)
+        if self._mm is not None:
+            self._mm.flush()
+        self._mm = np.memmap(self._vec_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def upsert(self, job_ids: List[str], vectors: np.ndarray) -> List[int]:
+        """Write vectors; returns the row of each id"""
+        new_ids = [j for j in dict.fromkeys(job_ids) if j not in self.row_of]
+        needed = len(self.ids) + len(new_ids)
+        if needed > self._mm.shape[0]:
+            self._open(max(needed, 2 * self._mm.shape[0]))
+        if new_ids:
+            with open(self._ids_path, "a", encoding="utf-8") as f:
+                for job_id in new_ids:
+                    self.row_of[job_id] = len(self.ids)
+                    self.ids.append(job_id)
+                    f.write(json.dumps(job_id) + "\n")
+        rows = [self.row_of[j] for j in job_ids]
+        self._mm[rows] = vectors
+        self._mm.flush()
+        return rows
+
+    def matrix(self) -> np.ndarray:
+        return self._mm[:len(self.ids)]
+
+
+# ===== IVF INDEX =====
+
+class IVFIndex:
+    """Inverted-file ANN index over unit vectors (inner product = cosine)"""
+
+    def __init__(self, nprobe: int = IVF_NPROBE):
+        self.nprobe = nprobe
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[array] = []
+        self.trained_rows = 0
+
+    def train(self, X: np.ndarray, n_iter: int = 10, seed: int = 0) -> None:
+        """Spherical k-means over (a sample of) X, then assign every row"""
+        n = X.shape[0]
+        nlist = max(8, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        sample = X[rng.choice(n, size=min(n, 64 * nlist), replace=False)]
+        C = sample[rng.choice(sample.shape[0], size=nlist, replace=False)].copy()
+        for _ in range(n_iter):
+            assign = np.argmax(sample @ C.T, axis=1)
+            sums = np.zeros_like(C)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=nlist)
+            empty = counts == 0
+            # Re-seed empty clusters from random sample rows
+            sums[empty] = sample[rng.choice(sample.shape[0], size=int(empty.sum()))]
+            C = _l2_rows(sums)
+        self.centroids = C
+        self.lists = [array("i") for _ in range(nlist)]
+        self.add(np.arange(n), X)
+        self.trained_rows = n
+
+    def add(self, rows: Iterable[int], vectors: np.ndarray) -> None:
+        rows = np.asarray(list(rows) if not isinstance(rows, np.ndarray) else rows)
+        assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        for row, c in zip(rows.tolist(), assign.tolist()):
+            self.lists[c].append(row)
+
+    def candidates(self, q: np.ndarray) -> np.ndarray:
+        probe = np.argsort(-(self.centroids @ q))[:self.nprobe]
+        lists = [np.frombuffer(self.lists[c], dtype=np.intc) for c in probe if len(self.lists[c])]
+        return np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.intc)
+
+
+# ===== ENGINE =====
+
+class SemanticEngine:
+    """Embed, store and search job descriptions"""
+
+    def __init__(self, index_dir: str = SEMANTIC_INDEX_DIR):
+        self.embedder = get_embedder()
+        self.store = VectorStore(index_dir, self.embedder.dim, self.embedder.name)
+        self.ivf: Optional[IVFIndex] = None
+        self._lock = threading.RLock()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.embedder.embed(texts)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self.store.row_of
+
+    def similarity(self, a: str, b: str) -> float:
+        return pair_similarity(a, b)
+
+    def add_many(self, jobs: Iterable[Tuple[str, str]]) -> int:
+        jobs = list(jobs)
+        if not jobs:
+            return 0
+        vectors = self.embed([desc or "" for _, desc in jobs])
+        with self._lock:
+            n_before = len(self.store)
+            rows = self.store.upsert([job_id for job_id, _ in jobs], vectors)
+            new_rows = [r for r in rows if r >= n_before]
+            if self.ivf is not None and new_rows:
+                self.ivf.add(new_rows, self.store.matrix()[new_rows])
+            self._maybe_train()
+        return len(jobs)
+
+    def _maybe_train(self) -> None:
+        n = len(self.store)
+        if n < IVF_MIN_ROWS:
+            self.ivf = None
+        elif self.ivf is None or n > 4 * self.ivf.trained_rows:
+            ivf = IVFIndex()
+            ivf.train(np.asarray(self.store.matrix()))
+            self.ivf = ivf
+
+    def scores_for(self, query_vec: np.ndarray, job_ids: List[str]) -> Dict[str, float]:
+        """Cosine of the query against specific stored jobs"""
+        with self._lock:
+            rows = [self.store.row_of[j] for j in job_ids if j in self.store.row_of]
+            if not rows:
+                return {}
+            sims = self.store.matrix()[rows] @ query_vec
+            return {self.store.ids[r]: float(s) for r, s in zip(rows, sims)}
+
+    def search(self, text: str, k: int = 10, exact: bool = False) -> List[Tuple[str, float]]:
+        """k nearest stored jobs to a text, best first"""
+        q = self.embed([text])[0]
+        return self.search_vector(q, k, exact=exact)
+
+    def search_vector(self, q: np.ndarray, k: int = 10, exact: bool = False) -> List[Tuple[str, float]]:
+        with self._lock:
+            X = self.store.matrix()
+            if not len(X):
+                return []
+            if self.ivf is None or exact:
+                cand = None
+                sims = X @ q
+            else:
+                cand = self.ivf.candidates(q)
+                sims = X[cand] @ q
+            top = top_k_indices(sims, k)
+            rows = top if cand is None else cand[top]
+            return [(self.store.ids[r], float(sims[t])) for r, t in zip(rows, top)]
+
+    def stats(self) -> dict:
+        return {
+            "embedder": self.embedder.name,
+            "dim": self.embedder.dim,
+            "vectors": len(self.store),
+            "ivf_lists": len(self.ivf.lists) if self.ivf is not None else 0,
+        }
+
+
+_engine: Optional[SemanticEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_semantic_engine() -> SemanticEngine:
+    """Process-wide engine, created on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SemanticEngine()
+                with _engine._lock:
+                    _engine._maybe_train()
+    return _engine
+
+
+def semantic_stats() -> Optional[dict]:
+    """Engine stats if the engine is loaded; never creates it (or its index directory)"""
+    engine_ = _engine
+    return engine_.stats() if engine_ is not None else None
+
+
+# ===== ENGINE-AWARE RANKING =====
+
+def profile_query_text(user_profile) -> str:
+    """Query text for a search profile: titles, skills, industries and level"""
+    parts = list(user_profile.target_titles) + list(user_profile.skills) + list(user_profile.industries)
+    parts.append(user_profile.experience_level)
+    return " ".join(p for p in parts if p)
+
+
+def rank_search_results(jobs: List[dict], query_text: str, engine: str) -> List[dict]:
+    """
+    Rank search results against the profile: by keyword coverage (lexical),
+    or by semantic similarity / the hybrid blend, with compute_match's
+    lexical score (0.7·coverage + 0.3·cosine) in the hybrid.
+
+    Returns a new list, and new job dicts where scores are added: `jobs`
+    may be a cached or shared list and is not modified.
+    """
+    from .matching import blend_scores, cosine_match, coverage_score, lexical_blend
+    if not jobs:
+        return []
+    texts = [f"{job.get('title', '')} {job.get('description', '')}" for job in jobs]
+    if engine == "lexical":
+        coverage = [coverage_score(text, query_text)[0] for text in texts]
+        order = sorted(range(len(jobs)), key=lambda i: -coverage[i])
+        return [jobs[i] for i in order]
+    embedder = get_embedder()
+    q = embedder.embed([query_text])[0]
+    sims = np.clip(embedder.embed(texts) @ q, 0.0, 1.0)
+    ranked = []
+    for job, text, sim in zip(jobs, texts, sims.tolist()):
+        lexical = None
+        if engine == "hybrid":
+            lexical = lexical_blend(coverage_score(text, query_text)[0], cosine_match(text, query_text))
+        ranked.append({**job, "semantic_score": round(sim, 3),
+                       "match_score": round(blend_scores(lexical, sim, engine), 3)})
+    return sorted(ranked, key=lambda j: -j["match_score"])
+
+
+def top_matches(resume_text: str, k: int, engine: str, job_index,
+                descriptions: Optional[Callable[[List[str]], Dict[str, str]]] = None) -> List[dict]:
+    """
+    Top-k indexed jobs for a resume using the lexical index, the ANN index, or both.
+
+    Hybrid scores use compute_match's blend, so `descriptions` (job id ->
+    description lookup) is needed for the TF-IDF cosine; jobs it does not
+    return get a cosine of 0.
+    """
+    from .matching import blend_scores, cosine_match, lexical_blend
+    if engine == "lexical":
+        return job_index.top_coverage(resume_text, k=k)
+    engine_ = get_semantic_engine()
+    q = engine_.embed([resume_text])[0]
+    if engine == "semantic":
+        return [{"job_id": job_id, "semantic": round(sim, 3)} for job_id, sim in engine_.search_vector(q, k)]
+
+    # hybrid: union of both candidate sets, re-scored on the blend
+    candidates = {r["job_id"] for r in job_index.top_coverage(resume_text, k=4 * k)}
+    candidates.update(job_id for job_id, _ in engine_.search_vector(q, 4 * k))
+    candidates = list(candidates)
+    coverage = job_index.coverage_for(resume_text, candidates)
+    sims = engine_.scores_for(q, candidates)
+    texts = descriptions(candidates) if descriptions else {}
+    results = []
+    for job_id in candidates:
+        cov, sim = coverage.get(job_id, 0.0), max(0.0, sims.get(job_id, 0.0))
+        cos = cosine_match(texts[job_id], resume_text) if job_id in texts else 0.0
+        results.append({
+            "job_id": job_id,
+            "score": round(blend_scores(lexical_blend(cov, cos), sim, engine), 3),
+            "coverage": round(cov, 3),
+            "cosine": round(cos, 3),
+            "semantic": round(sim, 3),
+        })
+    results.sort(key=lambda r: -r["score"])
+    return results[:k]
@@ -0,0 +1,42 @@
+"""Request coalescing: concurrent calls with the same key share one in-flight computation"""
+import copy
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    The first caller for a key (the leader) runs the coroutine; callers that
+    arrive while it is running await the same future instead of repeating the
+    work. The key is forgotten as soon as the call finishes, so this only
+    coalesces overlapping requests and never serves old results.
+
+    Followers get a deep copy of the leader's result, so a caller that
+    modifies what it got back cannot change another caller's response.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.followers += 1
+            return copy.deepcopy(await asyncio.shield(task))
+        self.leaders += 1
+        # The work runs in its own task, so no single caller disconnecting cancels it for the others
+        task = asyncio.get_running_loop().create_task(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.followers
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.followers,
+            "coalesced_rate": round(self.followers / calls, 4) if calls else None,
+        }
@@ -0,0 +1,102 @@
+"""
+Compiled multi-skill matcher: one regex per skill list, one pass per text.
+
+All skills are merged into a single prefix-trie regex with alphanumeric
+boundaries, so "r" does not match inside "react", "go" does not match
+inside "google", and "c++", ".net" and "node.js" still match. Python's
+regex engine walks the trie instead of trying every skill at every
+position, so the scan is linear in the text and close to flat in the
+number of skills.
+
+At any position the longest skill wins ("machine learning" over
+"learning"). Skills that are whole words of a matched skill are credited
+as well, so "machine learning" also counts for "learning" if both are
+listed; "c++" and "c#" do not count for "c".
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+
+_BOUNDARY_START = r"(?<![a-z0-9])"
+_BOUNDARY_END = r"(?![a-z0-9])"
+
+
+def normalize_skill(skill: str) -> str:
+    return " ".join(skill.lower().split())
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation factored into a prefix trie ("spark|sql|scala" -> "s(?:park|ql|cala)")"""
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        end = "" in node
+        branches = []
+        # Branches start with distinct characters, so at most one of them can match here
+        for ch in sorted(k for k in node if k):
+            atom = r"\s+" if ch == " " else re.escape(ch)
+            branches.append(atom + build(node[ch]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            # A skill ends here but longer ones continue; the greedy ? tries the longer ones first
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class SkillMatcher:
+    """Scan text for a fixed list of skills in a single pass"""
+
+    def __init__(self, skills: Iterable[str]):
+        self.skills: List[str] = list(dict.fromkeys(s for s in (normalize_skill(x) for x in skills) if s))
+        self._pattern = re.compile(_BOUNDARY_START + "(" + trie_pattern(self.skills) + ")" + _BOUNDARY_END) \
+            if self.skills else None
+        # skill -> the other listed skills that are whole words of it ("sql" in "postgre sql", not "c" in "c++")
+        self._nested: Dict[str, Tuple[str, ...]] = {}
+        for outer in self.skills:
+            inner = tuple(
+                s for s in self.skills
+                if s != outer and len(s) < len(outer)
+                and re.search(r"(?<!\S)" + re.escape(s) + r"(?!\S)", outer)
+            )
+            if inner:
+                self._nested[outer] = inner
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """Character offsets of every hit, per skill (nested skills share the outer skill's offset)"""
+        hits: Dict[str, List[int]] = {}
+        if self._pattern is None or not text:
+            return hits
+        for m in self._pattern.finditer(text.lower()):
+            skill = normalize_skill(m.group(1))
+            pos = m.start(1)
+            hits.setdefault(skill, []).append(pos)
+            for inner in self._nested.get(skill, ()):
+                hits.setdefault(inner, []).append(pos)
+        return hits
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Hit count per matched skill"""
+        return {s: len(p) for s, p in self.scan(text).items()}
+
+    def matched(self, text: str) -> Set[str]:
+        """Skills that occur at least once"""
+        return set(self.scan(text))
+
+
+@lru_cache(maxsize=64)
+def _cached_matcher(skills: Tuple[str, ...]) -> SkillMatcher:
+    return SkillMatcher(skills)
+
+
+def get_matcher(skills: Iterable[str]) -> SkillMatcher:
+    """Compiled matcher for a skill list, reused across calls with the same list"""
+    return _cached_matcher(tuple(skills))
@@ -0,0 +1,225 @@
+"""
+Corpus-fitted TF-IDF model for the matching service.
+
+The vectorizer is fitted offline over the stored job-description corpus,
+persisted to disk as a versioned artifact, and loaded once at API startup.
+Request handlers only ever call ``transform`` on it.
+
+Usage:
+    python -m app.services.tfidf_model fit --corpus history_daily/ jobs.jsonl
+    python -m app.services.tfidf_model fit --from-db
+    python -m app.services.tfidf_model list
+    python -m app.services.tfidf_model use v3
+"""
+import os
+import json
+import glob
+import argparse
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+MODEL_DIR = os.getenv("TFIDF_MODEL_DIR", "./models/tfidf")
+MANIFEST_NAME = "manifest.json"
+# Below this many documents min_df=2 / max_df=0.9 prune most or all terms, so corpus fits skip pruning
+PRUNE_MIN_DOCS = 10
+
+# Active model, populated by load_model() at startup
+_model: Optional[TfidfVectorizer] = None
+_model_version: Optional[str] = None
+
+
+def build_vectorizer(n_docs: Optional[int] = None) -> TfidfVectorizer:
+    """Vectorizer settings used for corpus fits; term pruning is off for corpora under PRUNE_MIN_DOCS"""
+    if n_docs is not None and n_docs < PRUNE_MIN_DOCS:
+        return TfidfVectorizer(ngram_range=(1, 2))
+    return TfidfVectorizer(ngram_range=(1, 2), min_df=2, max_df=0.9)
+
+
+def fit_model(texts: Iterable[str]) -> TfidfVectorizer:
+    """Fit a vectorizer over a job-description corpus"""
+    docs = [t for t in texts if t and t.strip()]
+    if len(docs) < 2:
+        raise ValueError("Need at least 2 non-empty job descriptions to fit a TF-IDF model")
+    vec = build_vectorizer(len(docs))
+    try:
+        vec.fit(docs)
+    except ValueError as e:
+        if len(docs) < PRUNE_MIN_DOCS:
+            raise  # already unpruned: the corpus has no usable terms
+        # Pruning can still leave no terms (e.g. near-duplicate descriptions); fit unpruned instead
+        print(f"⚠️ TF-IDF fit with min_df/max_df failed ({e}); fitting without term pruning")
+        vec = TfidfVectorizer(ngram_range=(1, 2))
+        vec.fit(docs)
+    return vec
+
+
+# ===== CORPUS LOADING =====
+
+def _descriptions_from_obj(obj: Any) -> List[str]:
+    """Pull job descriptions out of a TheirStack response, job list or history file"""
+    if isinstance(obj, dict):
+        if "description" in obj:
+            return [obj.get("description") or ""]
+        texts = []
+        for key in ("data", "jobs", "ranked", "eligible_jobs", "ineligible_jobs"):
+            if isinstance(obj.get(key), list):
+                texts.extend(_descriptions_from_obj(obj[key]))
+        return texts
+    if isinstance(obj, list):
+        texts = []
+        for item in obj:
+            texts.extend(_descriptions_from_obj(item))
+        return texts
+    return []
+
+
+def load_corpus(paths: Iterable[str]) -> List[str]:
+    """
+    Load job descriptions from files or directories.
+
+    Supports .json (TheirStack responses, job lists, daily/weekly history
+    files), .jsonl (one job per line) and .txt (one description per file).
+    """
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for ext in ("*.json", "*.jsonl", "*.txt"):
+                files.extend(sorted(glob.glob(os.path.join(path, "**", ext), recursive=True)))
+        else:
+            files.append(path)
+
+    texts: List[str] = []
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                for line in f:
+                    if line.strip():
+                        texts.extend(_descriptions_from_obj(json.loads(line)))
+            elif path.endswith(".json"):
+                texts.extend(_descriptions_from_obj(json.load(f)))
+            else:
+                texts.append(f.read())
+    return [t for t in texts if t and t.strip()]
+
+
+# ===== PERSISTENCE / VERSIONING =====
+
+def _read_manifest(model_dir: str) -> Dict[str, Any]:
+    path = os.path.join(model_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"current": None, "versions": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(model_dir: str, manifest: Dict[str, Any]) -> None:
+    path = os.path.join(model_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def save_model(vec: TfidfVectorizer, n_docs: int, model_dir: str = MODEL_DIR, activate: bool = True) -> str:
+    """Persist a fitted vectorizer as the next version; returns the version tag"""
+    os.makedirs(model_dir, exist_ok=True)
+    manifest = _read_manifest(model_dir)
+    version = f"v{len(manifest['versions']) + 1}"
+    filename = f"tfidf-{version}.joblib"
+    joblib.dump(vec, os.path.join(model_dir, filename))
+
+    manifest["versions"].append({
+        "version": version,
+        "file": filename,
+        "n_docs": n_docs,
+        "vocabulary_size": len(vec.vocabulary_),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+    })
+    if activate:
+        manifest["current"] = version
+    _write_manifest(model_dir, manifest)
+    return version
+
+
+def load_model(model_dir: str = MODEL_DIR, version: Optional[str] = None) -> Optional[TfidfVectorizer]:
+    """Load the current (or given) model version and make it the active model"""
+    global _model, _model_version
+    manifest = _read_manifest(model_dir)
+    version = version or manifest.get("current")
+    entry = next((v for v in manifest["versions"] if v["version"] == version), None)
+    if entry is None:
+        return None
+    _model = joblib.load(os.path.join(model_dir, entry["file"]))
+    _model_version = version
+    return _model
+
+
+def get_model() -> Optional[TfidfVectorizer]:
+    """Active fitted vectorizer, or None if no model has been loaded"""
+    return _model
+
+
+def get_model_version() -> Optional[str]:
+    return _model_version
+
+
+def load_store_corpus(database_url: Optional[str] = None) -> List[str]:
+    """Job descriptions from the persistent job store"""
+    from sqlalchemy.orm import Session
+    from ..db import DATABASE_URL, make_engine
+    from .job_store import iter_jobs
+
+    with Session(make_engine(database_url or DATABASE_URL)) as db:
+        return [description for _, _, description in iter_jobs(db) if description.strip()]
+
+
+# ===== CLI =====
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fit and manage the matching TF-IDF model")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fit_p = sub.add_parser("fit", help="Refit the model over a job-description corpus")
+    fit_p.add_argument("--corpus", nargs="+", default=[], help="Files or directories with job data")
+    fit_p.add_argument("--from-db", action="store_true", help="Also read descriptions from the jobs table (DATABASE_URL)")
+    fit_p.add_argument("--no-activate", action="store_true", help="Save without making it current")
+
+    sub.add_parser("list", help="List saved model versions")
+
+    use_p = sub.add_parser("use", help="Make a saved version current")
+    use_p.add_argument("version")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "fit":
+        if not args.corpus and not args.from_db:
+            parser.error("fit needs --corpus and/or --from-db")
+        texts = load_corpus(args.corpus)
+        if args.from_db:
+            texts.extend(load_store_corpus())
+        print(f"Fitting TF-IDF model on {len(texts)} job descriptions...")
+        vec = fit_model(texts)
+        version = save_model(vec, len(texts), args.model_dir, activate=not args.no_activate)
+        print(f"✅ Saved model {version} (vocabulary: {len(vec.vocabulary_)} terms)")
+    elif args.command == "list":
+        manifest = _read_manifest(args.model_dir)
+        if not manifest["versions"]:
+            print("No saved models.")
+        for v in manifest["versions"]:
+            marker = "*" if v["version"] == manifest.get("current") else " "
+            print(f"{marker} {v['version']}  docs={v['n_docs']}  vocab={v['vocabulary_size']}  {v['created_at']}")
+    elif args.command == "use":
+        manifest = _read_manifest(args.model_dir)
+        if not any(v["version"] == args.version for v in manifest["versions"]):
+            raise SystemExit(f"Unknown model version: {args.version}")
+        manifest["current"] = args.version
+        _write_manifest(args.model_dir, manifest)
+        print(f"✅ Current model set to {args.version} (restart the API to pick it up)")
+
+
+if __name__ == "__main__":
+    main()
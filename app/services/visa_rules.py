@@ -0,0 +1,306 @@
+"""
+Visa / sponsorship eligibility rules, compiled into one matcher.
+
+Rules live in a versioned JSON file (visa_rules.json next to this module,
+or VISA_RULES_PATH). Each rule has an id, a severity ("block" makes a job
+ineligible, "warn" keeps it and flags it), the phrases it matches and
+`unless` phrases: a hit is ignored when one of them occurs next to it (same
+clause, within VISA_CONTEXT_CHARS, outside the hit itself), so "security
+clearance not required" or "clearance preferred" do not block a job.
+
+Phrases are matched on a whitespace-normalized copy of the job text, so a
+phrase broken across lines still matches. All phrases of all rules go into
+one Aho-Corasick automaton (pyahocorasick), so a job is scanned once
+however many rules there are. VisaFilter applies the rules to
+an iterator of jobs and keeps per-rule hit counters, so a large daily pull
+is filtered in one streaming pass:
+
+    python -m app.services.visa_rules filter jobs.jsonl --status h1b --out eligible.jsonl
+"""
+import os
+import re
+import json
+import argparse
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import ahocorasick  # pyahocorasick
+
+from .skill_matcher import trie_pattern
+
+VISA_RULES_PATH = os.getenv("VISA_RULES_PATH", os.path.join(os.path.dirname(__file__), "visa_rules.json"))
+VISA_CONTEXT_CHARS = int(os.getenv("VISA_CONTEXT_CHARS", "100"))
+
+SEVERITIES = ("block", "warn")
+_WORD_START = r"(?<![a-z0-9])"
+_ALNUM = frozenset("abcdefghijklmnopqrstuvwxyz0123456789")
+# Clause ends: line breaks, sentence ends (not the dots in "u.s." or "e.g."), ", " / ": " and " but "
+_CLAUSE_END = re.compile(r"\n|(?<![.\s][a-z])[.!?;](?=\s)|[,:](?=\s)| but ")
+# Whitespace other than " " that job text uses; each becomes one space before matching
+_OTHER_SPACES = ("\n", "\r", "\t", "\xa0", "\f", "\v")
+_SPACE_RUN = re.compile(r"  +")
+
+
+def _phrase(p: str) -> str:
+    return " ".join(p.lower().split())
+
+
+def _compile(phrases: Iterable[str]) -> Optional["re.Pattern"]:
+    phrases = [p for p in phrases if p]
+    return re.compile(_WORD_START + "(?:" + trie_pattern(phrases) + ")") if phrases else None
+
+
+def _same_offset(pos: int) -> int:
+    return pos
+
+
+class _OffsetMap:
+    """
+    Map offsets in the normalized text back to the text. The collapsed space
+    runs are only located on the first lookup, i.e. for texts with a hit.
+    """
+
+    def __init__(self, spaced: str):
+        self._spaced = spaced          # text with other whitespace already turned into " "
+        self._starts: List[int] = []   # normalized offset of each collapsed run
+        self._shifts: List[int] = []   # chars removed up to and including that run
+
+    def _build(self) -> None:
+        removed = 0
+        for m in _SPACE_RUN.finditer(self._spaced):
+            start, end = m.span()
+            self._starts.append(start - removed)
+            removed += end - start - 1
+            self._shifts.append(removed)
+        self._spaced = None
+
+    def __call__(self, pos: int) -> int:
+        if self._spaced is not None:
+            self._build()
+        i = bisect_left(self._starts, pos)
+        return pos + self._shifts[i - 1] if i else pos
+
+
+def _normalize(text: str) -> Tuple[str, Any]:
+    """(text with every whitespace run as one space, map from its offsets back to text's)"""
+    for c in _OTHER_SPACES:
+        text = text.replace(c, " ")
+    if "  " not in text:
+        return text, _same_offset
+    return _SPACE_RUN.sub(" ", text), _OffsetMap(text)
+
+
+class VisaRules:
+    """A loaded rule set: one scan over every phrase, plus per-rule negation patterns"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.version = data.get("version")
+        self.exempt_statuses = {_phrase(s) for s in data.get("exempt_statuses", [])}
+        self.rules: Dict[str, Dict[str, Any]] = {}
+        self._rule_of: Dict[str, str] = {}  # phrase -> rule id
+        self._unless: Dict[str, Any] = {}
+        for rule in data.get("rules", []):
+            rid = rule["id"]
+            if rid in self.rules:
+                raise ValueError(f"Duplicate visa rule id: {rid}")
+            if rule.get("severity") not in SEVERITIES:
+                raise ValueError(f"Visa rule {rid}: severity must be one of {SEVERITIES}")
+            self.rules[rid] = rule
+            for p in map(_phrase, rule.get("phrases", [])):
+                if p in self._rule_of and self._rule_of[p] != rid:
+                    raise ValueError(f"Phrase '{p}' is in both {self._rule_of[p]} and {rid}")
+                self._rule_of[p] = rid
+            self._unless[rid] = _compile(_phrase(u) for u in rule.get("unless", []))
+        self._automaton = ahocorasick.Automaton()
+        for p in self._rule_of:
+            self._automaton.add_word(p, p)
+        if self._rule_of:
+            self._automaton.make_automaton()
+
+    @classmethod
+    def load(cls, path: str = VISA_RULES_PATH) -> "VisaRules":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def is_exempt(self, visa_status: str) -> bool:
+        """Statuses (citizen, PR) for which no job is filtered out"""
+        return _phrase(visa_status or "") in self.exempt_statuses
+
+    def _occurrences(self, norm: str) -> List[Tuple[int, int, str]]:
+        """(offset, -length, phrase) of every phrase occurrence, overlapping ones included"""
+        return [(end - len(p) + 1, -len(p), p) for end, p in self._automaton.iter(norm)]
+
+    def _find(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        (start, end, phrase) of leftmost-longest, non-overlapping phrase hits starting at a word.
+
+        Phrases are found in a whitespace-normalized copy of the text, so they
+        match across line breaks and runs of spaces; offsets are mapped back
+        to `text`.
+        """
+        norm, to_text = _normalize(text)
+        spans = self._occurrences(norm)
+        if not spans:
+            return
+        spans.sort()
+        last_end = 0
+        for start, _, p in spans:
+            if start < last_end or (start and norm[start - 1] in _ALNUM):
+                continue
+            last_end = start + len(p)
+            yield to_text(start), to_text(last_end - 1) + 1, p
+
+    def _negated(self, rid: str, text: str, start: int, end: int) -> bool:
+        """
+        An `unless` phrase of the rule in the same clause, within VISA_CONTEXT_CHARS.
+
+        The phrase must lie outside the hit [start, end), so part of the hit
+        itself ("sponsorship" in "no sponsorship") never negates it.
+        """
+        unless = self._unless[rid]
+        if unless is None:
+            return False
+        lo, hi = max(0, start - VISA_CONTEXT_CHARS), min(len(text), end + VISA_CONTEXT_CHARS)
+        for m in _CLAUSE_END.finditer(text, lo, start):
+            lo = m.end()
+        m = _CLAUSE_END.search(text, end, hi)
+        if m:
+            hi = m.start()
+        return unless.search(text, lo, start) is not None or unless.search(text, end, hi) is not None
+
+    def check(self, text: str) -> List[Dict[str, Any]]:
+        """Rule hits in `text`, in order; negated hits are left out"""
+        if not self._rule_of or not text:
+            return []
+        text = text.lower()
+        hits = []
+        for start, end, phrase in self._find(text):
+            rid = self._rule_of[phrase]
+            if self._negated(rid, text, start, end):
+                continue
+            hits.append({"rule": rid, "severity": self.rules[rid]["severity"], "phrase": phrase, "pos": start})
+        return hits
+
+
+@lru_cache(maxsize=4)
+def get_rules(path: str = VISA_RULES_PATH) -> VisaRules:
+    return VisaRules.load(path)
+
+
+def job_text(job: Dict[str, Any]) -> str:
+    """Title, company and description of a ranked job or a raw TheirStack job"""
+    return " ".join((
+        job.get("title") or job.get("job_title") or "",
+        job.get("company") or job.get("company_name") or "",
+        job.get("description") or "",
+    ))
+
+
+class VisaFilter:
+    """
+    Streaming eligibility filter with per-rule counters.
+
+    Blocked jobs come out as copies with `ineligibility_reason` and
+    `visa_hits`; eligible jobs with warn-level hits as copies with
+    `visa_warnings`; other jobs unchanged.
+    """
+
+    def __init__(self, visa_status: str = "", rules: Optional[VisaRules] = None):
+        self.rules = rules or get_rules()
+        self.exempt = self.rules.is_exempt(visa_status)
+        self.rule_hits: Counter = Counter()   # jobs hit per rule
+        self.scanned = 0
+        self.blocked = 0
+        self.warned = 0
+
+    def evaluate(self, job: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """(eligible, job) for one job"""
+        self.scanned += 1
+        if self.exempt:
+            return True, job
+        hits = self.rules.check(job_text(job))
+        if not hits:
+            return True, job
+        self.rule_hits.update({h["rule"] for h in hits})
+        blocking = [h for h in hits if h["severity"] == "block"]
+        j = job.copy()
+        if blocking:
+            self.blocked += 1
+            first = blocking[0]
+            j["ineligibility_reason"] = f"Failed visa eligibility check due to: '{first['phrase']}' ({first['rule']})"
+            j["visa_hits"] = hits
+            return False, j
+        self.warned += 1
+        j["visa_warnings"] = hits
+        return True, j
+
+    def stream(self, jobs: Iterable[Dict[str, Any]]) -> Iterator[Tuple[bool, Dict[str, Any]]]:
+        for job in jobs:
+            yield self.evaluate(job)
+
+    def eligible(self, jobs: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Only the eligible jobs, lazily"""
+        for ok, job in self.stream(jobs):
+            if ok:
+                yield job
+
+    def split(self, jobs: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        eligible, ineligible = [], []
+        for ok, job in self.stream(jobs):
+            (eligible if ok else ineligible).append(job)
+        return eligible, ineligible
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rules_version": self.rules.version,
+            "exempt": self.exempt,
+            "scanned": self.scanned,
+            "blocked": self.blocked,
+            "warned": self.warned,
+            "rule_hits": dict(self.rule_hits.most_common()),
+        }
+
+
+# ===== CLI =====
+
+def _iter_jobs(path: str) -> Iterator[Dict[str, Any]]:
+    """Jobs from JSONL (streamed line by line) or a JSON list / TheirStack response"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("data") or data.get("ranked") or data.get("jobs") or []
+    yield from data
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Visa / sponsorship eligibility filter")
+    sub = parser.add_subparsers(dest="command", required=True)
+    flt = sub.add_parser("filter", help="Filter job files and report per-rule hits")
+    flt.add_argument("paths", nargs="+")
+    flt.add_argument("--status", default="", help="Visa status of the candidate, e.g. h1b, opt, citizen")
+    flt.add_argument("--rules", default=VISA_RULES_PATH)
+    flt.add_argument("--out", help="Write eligible jobs here as JSONL")
+    args = parser.parse_args(argv)
+
+    vf = VisaFilter(args.status, VisaRules.load(args.rules))
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    try:
+        for path in args.paths:
+            for job in vf.eligible(_iter_jobs(path)):
+                if out is not None:
+                    out.write(json.dumps(job, default=str) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+    print(json.dumps(vf.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
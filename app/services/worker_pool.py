@@ -0,0 +1,69 @@
+"""
+Process pool for CPU-bound match scoring.
+
+With MATCH_WORKERS > 0, /match and /match/batch run compute_match in
+long-lived worker processes that load the TF-IDF model once on start, so
+scoring is not serialized on the API process's GIL. With MATCH_WORKERS=0
+(the default) scoring runs in the request threadpool as before.
+"""
+import os
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", "0"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _init_worker() -> None:
+    """Runs once in each worker process: load the model and warm the scoring path"""
+    from .tfidf_model import load_model
+    from .matching import compute_match
+    try:
+        load_model()
+    except Exception as e:
+        print(f"❌ Worker TF-IDF model load warning: {e}")
+    compute_match("warm up the scoring path", "warm up the scoring path")
+
+
+def _ping(_: int = 0) -> int:
+    return os.getpid()
+
+
+def start_pool(workers: int = MATCH_WORKERS) -> Optional[ProcessPoolExecutor]:
+    """Start the worker processes and wait until each one is warm"""
+    global _executor
+    if workers <= 0 or _executor is not None:
+        return _executor
+    # spawn: workers must not inherit the API's threads, sockets or DB pool
+    _executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+    list(_executor.map(_ping, range(workers)))
+    return _executor
+
+
+def shutdown_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+def pool_size() -> int:
+    return _executor._max_workers if _executor is not None else 0
+
+
+async def run_scoring(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a picklable scoring function in the pool (or the threadpool without one)"""
+    call = functools.partial(fn, *args, **kwargs)
+    if _executor is None:
+        return await run_in_threadpool(call)
+    return await asyncio.get_running_loop().run_in_executor(_executor, call)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+A local stand-in for the TheirStack API: POST /v1/jobs/search replays jobs
+shaped like theirstack-api-reference.json (JobSearchResponse), so the async
+client and /search can be exercised without spending credits.
+
+Run:
+    python3 dev_theirstack_stub_server.py --port 8900 --jobs 500
+    THEIRSTACK_API_KEY=stub THEIRSTACK_BASE_URL=http://localhost:8900 uvicorn app.main:app
+
+Options:
+    --fixture FILE   replay jobs from a saved TheirStack response instead of generating them
+    --fail-every N   answer every Nth request with 503 + Retry-After (exercises client retries)
+    --latency MS     add latency to every response
+GET /stats returns request counters.
+"""
+import argparse
+import datetime
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TITLES = ["Data Engineer", "Senior Data Engineer", "Data Analyst", "Analytics Engineer",
+          "Machine Learning Engineer", "Software Engineer", "Product Manager", "Operations Analyst"]
+CITIES = [("Austin", "TX"), ("Seattle", "WA"), ("New York", "NY"), ("Atlanta", "GA"), ("Chicago", "IL")]
+TECH = ["python", "sql", "airflow", "spark", "aws", "snowflake", "dbt", "kafka", "docker", "tableau"]
+SENIORITY = ["junior", "mid_level", "senior", "staff"]
+
+
+def make_job(i: int, rng: random.Random) -> dict:
+    """One job object with the JobWithMatchingPhrases-Output fields the app reads"""
+    title = rng.choice(TITLES)
+    city, state = rng.choice(CITIES)
+    company = f"Stub Corp {i % 97}"
+    posted = datetime.date.today() - datetime.timedelta(days=rng.randint(0, 60))
+    tech = rng.sample(TECH, 4)
+    low = rng.randrange(70, 160) * 1000
+    return {
+        "id": 100000 + i,
+        "job_title": title,
+        "url": f"https://jobs.example.com/{100000 + i}",
+        "final_url": f"https://careers.example.com/{100000 + i}",
+        "source_url": f"https://www.linkedin.com/jobs/view/{100000 + i}",
+        "date_posted": posted.isoformat(),
+        "discovered_at": f"{posted.isoformat()}T08:00:00",
+        "has_blurred_data": False,
+        "company": company,
+        "company_domain": f"stubcorp{i % 97}.example.com",
+        "company_object": {"name": company, "domain": f"stubcorp{i % 97}.example.com"},
+        "location": f"{city}, {state}",
+        "short_location": f"{city}, {state}",
+        "long_location": f"{city}, {state}, United States",
+        "state_code": state,
+        "country": "United States",
+        "country_code": "US",
+        "remote": rng.random() < 0.3,
+        "hybrid": rng.random() < 0.3,
+        "seniority": rng.choice(SENIORITY),
+        "employment_statuses": ["full_time"],
+        "salary_string": f"${low // 1000}k - ${(low + 30000) // 1000}k",
+        "min_annual_salary_usd": low,
+        "max_annual_salary_usd": low + 30000,
+        "technology_slugs": tech,
+        "description": (
+            f"{company} is hiring a {title} in {city}. You will build reliable data products "
+            f"using {', '.join(tech)}. Requirements: 3+ years with {tech[0]} and {tech[1]}. "
+            + rng.choice(["Visa sponsorship available.", "No sponsorship available.", ""])
+        ),
+    }
+
+
+class StubState:
+    def __init__(self, jobs, fail_every: int, latency_ms: int):
+        self.jobs = jobs
+        self.fail_every = fail_every
+        self.latency_ms = latency_ms
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.jobs_returned = 0
+
+
+def filter_jobs(jobs, body: dict):
+    titles = [t.lower() for t in body.get("job_title_or") or []]
+    gte = body.get("posted_at_gte")
+    max_age = body.get("posted_at_max_age_days")
+    min_date = gte
+    if max_age is not None:
+        cutoff = (datetime.date.today() - datetime.timedelta(days=int(max_age))).isoformat()
+        min_date = max(min_date or cutoff, cutoff)
+    exclude_ids = set(body.get("job_id_not") or [])
+    out = []
+    for job in jobs:
+        if titles and not any(t in job["job_title"].lower() for t in titles):
+            continue
+        if min_date and job["date_posted"] < min_date:
+            continue
+        if job["id"] in exclude_ids:
+            continue
+        if body.get("discovered_at_gte") and job["discovered_at"] < body["discovered_at_gte"][:19]:
+            continue
+        if body.get("discovered_at_lte") and job["discovered_at"] > body["discovered_at_lte"][:19]:
+            continue
+        if body.get("remote") is True and not job["remote"]:
+            continue
+        out.append(job)
+    # Newest first, like the default order_by
+    out.sort(key=lambda j: (j["date_posted"], j["id"]), reverse=True)
+    return out
+
+
+def make_handler(state: StubState):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so client connection pooling is visible
+
+        def _send_json(self, status: int, payload: dict, headers=None):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._send_json(200, {
+                    "requests": state.requests,
+                    "failures": state.failures,
+                    "jobs_returned": state.jobs_returned,
+                })
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("content-length", 0))
+            raw = self.rfile.read(length).decode("utf-8") if length else ""
+            if self.path != "/v1/jobs/search":
+                self._send_json(404, {"error": "not found"})
+                return
+            with state.lock:
+                state.requests += 1
+                n = state.requests
+            if state.latency_ms:
+                time.sleep(state.latency_ms / 1000)
+            if state.fail_every and n % state.fail_every == 0:
+                with state.lock:
+                    state.failures += 1
+                self._send_json(503, {"error": "stub: simulated outage"}, {"Retry-After": "0"})
+                return
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                self._send_json(422, {"error": "invalid JSON"})
+                return
+
+            matches = filter_jobs(state.jobs, body)
+            limit = int(body.get("limit") or 25)
+            offset = int(body.get("offset") or 0) + int(body.get("page") or 0) * limit
+            page = matches[offset:offset + limit]
+            with state.lock:
+                state.jobs_returned += len(page)
+            self._send_json(200, {
+                "metadata": {
+                    "total_results": len(matches) if body.get("include_total_results") else None,
+                    "truncated_results": 0,
+                    "truncated_companies": 0,
+                    "total_companies": len({j["company"] for j in matches}) if body.get("include_total_results") else None,
+                },
+                "data": page,
+            })
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return StubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local TheirStack stub server")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--fixture", help="Saved TheirStack response (JSON with a 'data' list)")
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--latency", type=int, default=0, help="Added latency in ms")
+    args = parser.parse_args()
+
+    if args.fixture:
+        with open(args.fixture, "r", encoding="utf-8") as f:
+            jobs = json.load(f).get("data", [])
+    else:
+        rng = random.Random(42)
+        jobs = [make_job(i, rng) for i in range(args.jobs)]
+
+    state = StubState(jobs, args.fail_every, args.latency)
+    server = ThreadingHTTPServer(("localhost", args.port), make_handler(state))
+    print(f"TheirStack stub running at http://localhost:{args.port} ({len(jobs)} jobs)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("Server stopped")
+
+
+if __name__ == "__main__":
+    main()
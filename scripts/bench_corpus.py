@@ -0,0 +1,72 @@
+"""
+bench_corpus.py — Synthetic job descriptions and resumes for the benchmark scripts.
+
+Pass --corpus to the benchmarks to use real data instead (any file or folder
+accepted by `python -m app.services.tfidf_model fit`).
+"""
+import random
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Allow `import app...` when run as `python scripts/bench_*.py`
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SKILLS = [
+    "Python", "SQL", "Airflow", "Spark", "AWS S3", "Redshift", "Snowflake", "dbt", "Kafka",
+    "Docker", "Kubernetes", "Terraform", "CI/CD", "Git", "Java", "Scala", "C++", "C#", ".NET",
+    "Node.js", "React", "TypeScript", "Tableau", "Power BI", "Looker", "Excel", "pandas",
+    "NumPy", "scikit-learn", "PyTorch", "TensorFlow", "machine learning", "ETL", "data modeling",
+    "REST APIs", "GraphQL", "PostgreSQL", "MySQL", "MongoDB", "Redis", "Linux", "Bash", "Go",
+    "R", "SAS", "Jira", "Agile", "Scrum", "stakeholder management", "project management",
+]
+TITLES = [
+    "Data Engineer", "Senior Data Engineer", "Analytics Engineer", "Data Analyst",
+    "Machine Learning Engineer", "Backend Engineer", "Business Analyst", "Product Manager",
+    "Operations Analyst", "Software Engineer II", "Staff Platform Engineer",
+]
+FILLER = (
+    "We are looking for a motivated teammate to join our growing team. You will partner with "
+    "cross-functional stakeholders, own end-to-end delivery, and help shape our roadmap. "
+    "The ideal candidate communicates clearly, thrives in ambiguity, and cares about quality. "
+    "Benefits include medical, dental & vision coverage, 401(k) matching, flexible PTO, and a "
+    "$2,000 annual learning stipend. We value diversity and are an equal opportunity employer."
+).split(". ")
+VISA_LINES = [
+    "Candidates must be authorized to work in the US without sponsorship.",
+    "Visa sponsorship available for exceptional candidates.",
+    "This role requires an active security clearance (TS/SCI).",
+    "We are unable to sponsor H-1B visas at this time.",
+    "",
+]
+
+
+def make_job_description(rng: random.Random, n_skills: int = 12, n_paragraphs: int = 6) -> str:
+    title = rng.choice(TITLES)
+    skills = rng.sample(SKILLS, n_skills)
+    lines = [f"About the role — {title}", ""]
+    for _ in range(n_paragraphs):
+        lines.append(". ".join(rng.sample(FILLER, 3)) + ".")
+    lines.append("")
+    lines.append("Requirements:")
+    for s in skills:
+        lines.append(f"• {rng.randint(2, 8)}+ years of hands-on experience with {s} (production).")
+    lines.append(rng.choice(VISA_LINES))
+    return "\n".join(lines)
+
+
+def make_resume(rng: random.Random, n_skills: int = 15) -> str:
+    skills = rng.sample(SKILLS, n_skills)
+    bullets = [f"- Built and maintained {s}-based systems; improved throughput by {rng.randint(10, 80)}%."
+               for s in skills]
+    return "Experience\n" + "\n".join(bullets) + "\nSkills: " + ", ".join(skills)
+
+
+def load_or_generate(n_docs: int, corpus: Optional[List[str]] = None, seed: int = 7) -> List[str]:
+    """Real descriptions from --corpus paths if given, otherwise synthetic ones"""
+    if corpus:
+        from app.services.tfidf_model import load_corpus
+        texts = load_corpus(corpus)
+        return (texts * (n_docs // max(len(texts), 1) + 1))[:n_docs]
+    rng = random.Random(seed)
+    return [make_job_description(rng) for _ in range(n_docs)]
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+bench_match_workers.py — /match scoring throughput (requests/sec) vs. worker process count.
+
+Drives the same run_scoring path the API uses with many concurrent
+requests. Worker count 0 is the in-process threadpool baseline.
+
+Usage:
+    python scripts/bench_match_workers.py
+    python scripts/bench_match_workers.py --workers 0 1 2 4 8 --requests 400
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from bench_corpus import load_or_generate, make_resume
+from app.services import worker_pool
+from app.services.matching import compute_match
+
+
+async def run_load(pairs, concurrency: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(jd, resume):
+        async with sem:
+            await worker_pool.run_scoring(compute_match, job_description=jd, resume_text=resume)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(jd, resume) for jd, resume in pairs))
+    return len(pairs) / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4, os.cpu_count() or 4])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    jds = load_or_generate(50)
+    # Distinct resumes so the token cache does not hide the scoring cost
+    pairs = [(rng.choice(jds), make_resume(rng)) for _ in range(args.requests)]
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {os.cpu_count()} CPUs")
+    baseline = None
+    for workers in sorted(set(args.workers)):
+        worker_pool.start_pool(workers)
+        try:
+            rps = asyncio.run(run_load(pairs, args.concurrency))
+        finally:
+            worker_pool.shutdown_pool()
+        baseline = baseline or rps
+        label = "threadpool" if workers == 0 else f"{workers} workers"
+        print(f"  {label:12s} {rps:8.1f} req/s   x{rps / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
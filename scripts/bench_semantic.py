@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+bench_semantic.py — Recall and latency of the IVF semantic index against brute force.
+
+Usage:
+    python scripts/bench_semantic.py
+    python scripts/bench_semantic.py --docs 100000 --queries 200 --nprobe 4 8 16 32
+"""
+import argparse
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from bench_corpus import load_or_generate, make_resume
+from app.services.semantic import IVFIndex, SemanticEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    parser.add_argument("--corpus", nargs="*", help="Real job data instead of synthetic descriptions")
+    args = parser.parse_args()
+
+    docs = load_or_generate(args.docs, args.corpus)
+    rng = random.Random(11)
+    queries = [make_resume(rng) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = SemanticEngine(index_dir=tmp)
+        t0 = time.perf_counter()
+        for start in range(0, len(docs), 2000):
+            engine.add_many((f"job_{i}", docs[i]) for i in range(start, min(start + 2000, len(docs))))
+        build_s = time.perf_counter() - t0
+        print(f"Indexed {len(docs)} jobs in {build_s:.1f}s  ({engine.stats()})")
+
+        Q = engine.embed(queries)
+        X = np.asarray(engine.store.matrix())
+
+        t0 = time.perf_counter()
+        exact = [set(j for j, _ in engine.search_vector(q, args.k, exact=True)) for q in Q]
+        exact_ms = (time.perf_counter() - t0) * 1000 / len(Q)
+        print(f"  brute force            {exact_ms:7.2f} ms/query   recall@{args.k} 1.000")
+
+        ivf = IVFIndex()
+        ivf.train(X)
+        engine.ivf = ivf
+        for nprobe in args.nprobe:
+            ivf.nprobe = nprobe
+            t0 = time.perf_counter()
+            approx = [set(j for j, _ in engine.search_vector(q, args.k)) for q in Q]
+            ms = (time.perf_counter() - t0) * 1000 / len(Q)
+            recall = np.mean([len(a & e) / len(e) for a, e in zip(approx, exact) if e])
+            print(f"  IVF nprobe={nprobe:<3d} lists={len(ivf.lists):<5d} {ms:7.2f} ms/query   "
+                  f"recall@{args.k} {recall:.3f}   x{exact_ms / ms:.1f}")
+
+
+if __name__ == "__main__":
+    main()
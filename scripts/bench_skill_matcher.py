@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+bench_skill_matcher.py — Compare the compiled skill matcher against the
+original `skill in text` loop from rank_jobs, at growing skill-list sizes.
+
+Usage:
+    python scripts/bench_skill_matcher.py
+    python scripts/bench_skill_matcher.py --docs 10000 --skills 25 50 100 200
+    python scripts/bench_skill_matcher.py --corpus history_daily/
+"""
+import argparse
+import timeit
+
+from bench_corpus import SKILLS, load_or_generate
+from app.services.skill_matcher import SkillMatcher
+
+SUFFIXES = ["", " development", " administration", " architecture", " migration"]
+
+
+def skill_list(n: int):
+    """The corpus skills first, then multi-word variants of them, up to n"""
+    out = [f"{s}{suffix}" for suffix in SUFFIXES for s in SKILLS]
+    return out[:n]
+
+
+def legacy_matched(skills, text):
+    """Original rank_jobs matching, kept here as the baseline"""
+    combined = text.lower()
+    return {s for s in skills if s and s in combined}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=10000, help="Number of job descriptions")
+    parser.add_argument("--skills", type=int, nargs="+", default=[25, 50, 100, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--corpus", nargs="*", help="Real job data instead of synthetic descriptions")
+    args = parser.parse_args()
+
+    docs = load_or_generate(args.docs, args.corpus)
+    total_kb = sum(len(d) for d in docs) / 1024
+    print(f"Corpus: {len(docs)} job descriptions, {total_kb:.0f} KB")
+    print(f"{'skills':>7} {'legacy ms':>10} {'matcher ms':>11} {'speedup':>8} {'build ms':>9} "
+          f"{'legacy hits':>12} {'matcher hits':>13}")
+
+    for n in args.skills:
+        skills = [s.lower() for s in skill_list(n)]
+        build = min(timeit.repeat(lambda: SkillMatcher(skills), number=1, repeat=args.repeat))
+        matcher = SkillMatcher(skills)
+
+        legacy = min(timeit.repeat(lambda: [legacy_matched(skills, d) for d in docs], number=1, repeat=args.repeat))
+        compiled = min(timeit.repeat(lambda: [matcher.matched(d) for d in docs], number=1, repeat=args.repeat))
+
+        # The legacy loop also counts substring hits ("r" in "react"), so it reports more
+        legacy_hits = sum(len(legacy_matched(skills, d)) for d in docs)
+        matcher_hits = sum(len(matcher.matched(d)) for d in docs)
+        print(f"{n:>7} {legacy * 1000:>10.1f} {compiled * 1000:>11.1f} {legacy / compiled:>7.2f}x "
+              f"{build * 1000:>9.2f} {legacy_hits:>12} {matcher_hits:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+bench_tokenizer.py — Compare the matching tokenizer against the original
+lower/re.sub/split/filter implementation.
+
+Usage:
+    python scripts/bench_tokenizer.py
+    python scripts/bench_tokenizer.py --docs 5000 --corpus history_daily/
+"""
+import argparse
+import re
+import timeit
+
+from bench_corpus import load_or_generate
+from app.services.matching import iter_tokens, normalize
+
+
+def legacy_normalize(text):
+    """Original implementation, kept here as the baseline"""
+    text = text.lower()
+    text = re.sub(r"[^a-z0-9\s\-+/#]", " ", text)
+    toks = [t for t in text.split() if len(t) > 2]
+    return toks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000, help="Number of job descriptions")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--corpus", nargs="*", help="Real job data instead of synthetic descriptions")
+    args = parser.parse_args()
+
+    docs = load_or_generate(args.docs, args.corpus)
+    total_kb = sum(len(d) for d in docs) / 1024
+    print(f"Corpus: {len(docs)} job descriptions, {total_kb:.0f} KB")
+
+    # Same tokens, same order
+    for d in docs:
+        assert normalize(d) == legacy_normalize(d)
+        assert list(iter_tokens(d)) == legacy_normalize(d)
+
+    cases = {
+        "legacy normalize (list)": lambda: [legacy_normalize(d) for d in docs],
+        "normalize (findall)": lambda: [normalize(d) for d in docs],
+        "legacy keyword set": lambda: [set(legacy_normalize(d)) for d in docs],
+        "keyword set via findall": lambda: [set(normalize(d)) for d in docs],
+        "keyword set via iter_tokens": lambda: [set(iter_tokens(d)) for d in docs],
+    }
+    baseline = None
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        if baseline is None or name.startswith("legacy"):
+            baseline = best
+        print(f"  {name:30s} {best * 1000:8.1f} ms   {total_kb / 1024 / best:6.1f} MB/s   x{baseline / best:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+bench_visa_rules.py — Time the visa rule scan (Aho-Corasick automaton) against
+the original `kw in text` loop from filter_visa_eligibility.
+
+Usage:
+    python scripts/bench_visa_rules.py
+    python scripts/bench_visa_rules.py --docs 100000
+    python scripts/bench_visa_rules.py --corpus history_daily/
+"""
+import argparse
+import timeit
+
+from bench_corpus import load_or_generate
+from app.services.visa_rules import VisaFilter, get_rules
+
+
+def legacy_blocked(keywords, text):
+    """Original filter_visa_eligibility matching, every keyword counted, kept here as the baseline"""
+    combined = text.lower()
+    return [kw for kw in keywords if kw in combined]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000, help="Number of job descriptions")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--corpus", nargs="*", help="Real job data instead of synthetic descriptions")
+    args = parser.parse_args()
+
+    docs = load_or_generate(args.docs, args.corpus)
+    jobs = [{"title": "", "company": "", "description": d} for d in docs]
+    print(f"Corpus: {len(docs)} job descriptions, {sum(len(d) for d in docs) / 1024:.0f} KB")
+
+    rules = get_rules()
+    keywords = [p for rule in rules.rules.values() if rule["severity"] == "block" for p in rule["phrases"]]
+    legacy = min(timeit.repeat(lambda: [legacy_blocked(keywords, d) for d in docs], number=1, repeat=args.repeat))
+    print(f"{'legacy loop':>12} {legacy * 1000:>9.1f} ms  blocked {sum(bool(legacy_blocked(keywords, d)) for d in docs)}")
+
+    elapsed = min(timeit.repeat(lambda: VisaFilter(rules=rules).split(jobs), number=1, repeat=args.repeat))
+    vf = VisaFilter(rules=rules)
+    vf.split(jobs)
+    print(f"{'automaton':>12} {elapsed * 1000:>9.1f} ms  blocked {vf.blocked}  ({legacy / elapsed:.2f}x legacy)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+check_harvester.py — Interrupt harvests and check that resuming pays for no page twice.
+
+Runs harvest_to_jsonl against an in-memory fake of TheirStack:
+  1. page --fail-page fails once while later pages are prefetched; the
+     resumed run must not fetch any page that already succeeded, and the
+     output must hold every job exactly once.
+  2. the run is killed while page 0 is being written; the resumed run must
+     truncate the partial write instead of appending duplicates.
+Exits non-zero on any failure.
+
+Usage:
+    python scripts/check_harvester.py
+    python scripts/check_harvester.py --pages 10 --fail-page 4 --prefetch 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.services import harvester as harvester_mod  # noqa: E402
+from app.services.harvester import harvest_to_jsonl  # noqa: E402
+
+PAGE_SIZE = 10
+BODY = {"job_title_or": ["Data Engineer"], "posted_at_max_age_days": 7}
+
+
+class FakeTheirStack:
+    def __init__(self, n_pages: int, fail_page=None):
+        self.total = n_pages * PAGE_SIZE
+        self.fail_page = fail_page
+        self.calls = Counter()
+
+    async def __call__(self, body):
+        page = body["page"]
+        self.calls[page] += 1
+        await asyncio.sleep(0.01 * (1 + page % 3))
+        if page == self.fail_page:
+            self.fail_page = None
+            raise RuntimeError(f"HTTP 502 on page {page}")
+        start = page * PAGE_SIZE
+        data = [{"id": f"job_{i}", "title": "Data Engineer"} for i in range(start, min(start + PAGE_SIZE, self.total))]
+        return {"data": data, "metadata": {"total_results": self.total}}
+
+
+def job_ids(path):
+    with open(path, "rb") as f:
+        return [json.loads(line)["id"] for line in f]
+
+
+def report(ok, msg):
+    print(f"{'✅' if ok else '❌'} {msg}")
+    return ok
+
+
+async def check_failure(tmp, n_pages, fail_page, prefetch):
+    fake = FakeTheirStack(n_pages, fail_page)
+    out = os.path.join(tmp, "fail.jsonl")
+    kwargs = dict(fetch=fake, page_size=PAGE_SIZE, prefetch=prefetch, checkpoint_dir=os.path.join(tmp, "ck1"))
+    try:
+        await harvest_to_jsonl(BODY, out, **kwargs)
+        return report(False, "first run did not fail")
+    except RuntimeError as e:
+        print(f"   first run stopped: {e}; pages fetched so far {sorted(fake.calls)}")
+    stats = await harvest_to_jsonl(BODY, out, **kwargs)
+    twice = sorted(p for p, n in fake.calls.items() if n > 1 and p != fail_page)
+    ids = job_ids(out)
+    ok = report(not twice, f"no successful page refetched on resume (refetched: {twice or 'none'}, "
+                           f"{stats.get('pages_unspooled', 0)} read from spool)")
+    ok &= report(len(ids) == len(set(ids)) == n_pages * PAGE_SIZE, f"{len(ids)} jobs written, {len(set(ids))} unique")
+    return ok
+
+
+async def check_kill_on_first_page(tmp, n_pages):
+    out = os.path.join(tmp, "kill.jsonl")
+    with open(out, "wb") as f:
+        f.write(b'{"id": "earlier_run"}\n')
+    kwargs = dict(fetch=FakeTheirStack(n_pages), page_size=PAGE_SIZE, prefetch=2, checkpoint_dir=os.path.join(tmp, "ck2"))
+
+    # Process killed halfway through writing page 0, before its checkpoint
+    real_dumps, written = json.dumps, []
+
+    def dying_dumps(obj, **kw):
+        if len(written) == PAGE_SIZE // 2:
+            raise KeyboardInterrupt
+        written.append(obj)
+        return real_dumps(obj, **kw)
+
+    harvester_mod.json.dumps = dying_dumps
+    try:
+        await harvest_to_jsonl(BODY, out, **kwargs)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        harvester_mod.json.dumps = real_dumps
+    await harvest_to_jsonl(BODY, out, **kwargs)
+    ids = job_ids(out)
+    return report(ids.count("earlier_run") == 1 and len(ids) == len(set(ids)) == n_pages * PAGE_SIZE + 1,
+                  f"kill during page 0: {len(ids)} lines, {len(set(ids))} unique after resume")
+
+
+async def run(args):
+    tmp = tempfile.mkdtemp(prefix="check_harvester_")
+    try:
+        ok = await check_failure(tmp, args.pages, args.fail_page, args.prefetch)
+        ok &= await check_kill_on_first_page(tmp, args.pages)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--fail-page", type=int, default=4)
+    parser.add_argument("--prefetch", type=int, default=3)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args))
+    print("✅ Resumed harvests paid for each page once" if ok else "❌ Resumed harvest refetched or duplicated")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+check_match_batch.py — Compare /match/batch scores with compute_match for the same pairs.
+
+Scores one resume and cover letter against a batch of jobs with
+compute_match_batch and checks that every job's score, coverage and cosine
+equal compute_match on that single pair, at the 3 decimals the API returns.
+Runs without a corpus model (pair fit) and with one fitted on synthetic job
+descriptions. Exits non-zero on any mismatch.
+
+Usage:
+    python scripts/check_match_batch.py
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_corpus import load_or_generate  # noqa: E402
+from app.services import tfidf_model  # noqa: E402
+from app.services.matching import compute_match, compute_match_batch  # noqa: E402
+
+RESUME = ("Data engineer with four years of Python and SQL.\n"
+          "Built Airflow and Kafka streaming pipelines on AWS.")
+COVER = "I would love to bring my dbt and Snowflake experience to your data platform team."
+
+
+def check(label: str, jobs) -> bool:
+    ok = True
+    for got in compute_match_batch(jobs, RESUME, COVER):
+        expected = compute_match(dict(jobs)[got["job_id"]], RESUME, COVER)
+        same = all(got[k] == expected[k] for k in ("score", "coverage", "cosine"))
+        ok &= same
+        print(f"{'✅' if same else '❌'} {label:>12} {got['job_id']}: batch score={got['score']} "
+              f"cosine={got['cosine']}  compute_match score={expected['score']} cosine={expected['cosine']}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    jobs = [(f"job_{i}", desc) for i, desc in enumerate(load_or_generate(5))]
+    ok = check("pair fit", jobs[:1])
+    ok &= check("pair fit", jobs)
+    tfidf_model._model = tfidf_model.fit_model(load_or_generate(500))
+    tfidf_model._model_version = "check"
+    ok &= check("corpus model", jobs)
+    print("✅ Batch scores match compute_match" if ok else "❌ Batch scores drifted")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+check_match_session.py — Compare incremental match-session scores with compute_match.
+
+Starts a session, applies edits that bring in words neither text had before,
+and checks that the session's score, coverage and cosine equal a from-scratch
+compute_match on the edited resume, at the 3 decimals the API returns. Each
+edit replaces a whole line, so only the bigram across a line break can
+differ. Runs without a corpus model (pair fit) and with one fitted on
+synthetic job descriptions. Exits non-zero on any mismatch.
+
+Usage:
+    python scripts/check_match_session.py
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_corpus import load_or_generate  # noqa: E402
+from app.services import tfidf_model  # noqa: E402
+from app.services.match_session import MatchSession  # noqa: E402
+from app.services.matching import compute_match  # noqa: E402
+
+JD = ("Data Engineer. Build batch and streaming pipelines with Python, SQL and Airflow on AWS. "
+      "Experience with Kafka, dbt and Snowflake is a plus.")
+RESUME_LINES = [
+    "Data engineer with four years of Python and SQL.",
+    "Built Airflow pipelines on AWS.",
+]
+# (line index, replacement): new words for the JD, for the resume, and for neither
+EDITS = [
+    (1, "Built Airflow and Kafka streaming pipelines on AWS with dbt."),
+    (0, "Analytics engineer fluent in Rust, Haskell and Erlang."),
+    (1, "Snowflake warehouse modelling with dbt; Kafka Connect; Terraform."),
+]
+
+
+def check(label: str) -> bool:
+    lines = list(RESUME_LINES)
+    session = MatchSession(JD, "\n".join(lines))
+    ok = True
+    for i, added in EDITS:
+        session.apply_edit(removed=lines[i], added=added)
+        lines[i] = added
+        got = session.result()
+        expected = compute_match(JD, "\n".join(lines))
+        same = all(got[k] == expected[k] for k in ("score", "coverage", "cosine"))
+        ok &= same
+        print(f"{'✅' if same else '❌'} {label:>12}: session score={got['score']} cosine={got['cosine']}  "
+              f"compute_match score={expected['score']} cosine={expected['cosine']}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    ok = check("pair fit")
+    tfidf_model._model = tfidf_model.fit_model(load_or_generate(500))
+    tfidf_model._model_version = "check"
+    ok &= check("corpus model")
+    print("✅ Session scores match compute_match" if ok else "❌ Session scores drifted")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+check_refresh.py — Refresh a search whose window holds more jobs than one page.
+
+Runs refresh_jobs twice against a fake TheirStack (newest first, page/limit
+pagination, posted_at_gte) on a temporary SQLite store. The first run must
+page through the whole window, store every job and advance the watermark;
+after new postings arrive, the second run must only fetch postings from the
+watermark day on. Exits non-zero otherwise.
+
+Usage:
+    python scripts/check_refresh.py
+    python scripts/check_refresh.py --jobs 500 --limit 40
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.models import Base  # noqa: E402
+from app.schemas import LocationPref, UserPreferences, UserProfile  # noqa: E402
+from app.services.job_store import job_count, refresh_jobs  # noqa: E402
+
+PROFILE = UserProfile(name="Sam", skills=["python"], industries=[], experience_level="",
+                      target_titles=["Data Engineer"])
+PREFS = UserPreferences(location=LocationPref(city="", state="", country="US", remote=True), job_age_limit_days=30)
+
+
+class FakeTheirStack:
+    def __init__(self):
+        self.jobs = []
+        self.requests = 0
+        self.returned = 0
+
+    def post(self, n, days_ago, prefix):
+        today = datetime.date.today()
+        for i in range(n):
+            posted = today - datetime.timedelta(days=days_ago + i % max(1, days_ago or 1))
+            self.jobs.append({"id": f"{prefix}{i}", "job_title": "Data Engineer", "company_name": "Acme",
+                              "description": f"Python pipelines {prefix}{i}", "url": f"https://x.test/{prefix}{i}",
+                              "date_posted": posted.isoformat()})
+
+    async def __call__(self, body):
+        self.requests += 1
+        gte = body.get("posted_at_gte") or ""
+        rows = sorted((j for j in self.jobs if j["date_posted"] >= gte),
+                      key=lambda j: (j["date_posted"], j["id"]), reverse=True)
+        page, limit = body.get("page", 0), body["limit"]
+        data = rows[page * limit:(page + 1) * limit]
+        self.returned += len(data)
+        return {"data": data, "metadata": {"total_results": len(rows)}}
+
+
+def report(ok, msg):
+    print(f"{'✅' if ok else '❌'} {msg}")
+    return ok
+
+
+async def run(n_jobs, limit):
+    tmp = tempfile.mkdtemp(prefix="check_refresh_")
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, 'jobs.db')}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    fake = FakeTheirStack()
+    fake.post(n_jobs, 10, "old")
+
+    first = await refresh_jobs(db, PROFILE, PREFS, limit=limit, fetch=fake)
+    ok = report(first["complete"] and job_count(db) == n_jobs,
+                f"first run: {first['fetched']} fetched in {fake.requests} requests, complete={first['complete']}, "
+                f"watermark {first['watermark']}")
+
+    fake.returned = 0
+    fake.post(5, 0, "new")
+    second = await refresh_jobs(db, PROFILE, PREFS, limit=limit, fetch=fake)
+    ok &= report(second["complete"] and job_count(db) == n_jobs + 5 and fake.returned < n_jobs,
+                 f"second run: {fake.returned} jobs paid for, since {second['since']}, "
+                 f"watermark {second['watermark']}, {job_count(db)} stored")
+    db.close()
+    engine.dispose()
+    shutil.rmtree(tmp, ignore_errors=True)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args.jobs, args.limit))
+    print("✅ Refresh is incremental past one page" if ok else "❌ Refresh did not advance")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+check_search_cache.py — Run a semantic /search and then a lexical /search with the same filters.
+
+Both requests share one search-cache key, so the second is served from the
+cache. The lexical response must not carry the semantic_score / match_score
+fields that the semantic ranking computed for the first request. Exits
+non-zero otherwise.
+
+Usage:
+    python scripts/check_search_cache.py
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dev_theirstack_stub_server import StubState, make_handler, make_job  # noqa: E402
+
+SEARCH_BODY = {
+    "user_profile": {"name": "Sam", "skills": ["python", "sql"], "industries": [],
+                     "experience_level": "mid", "target_titles": ["Data Engineer"]},
+    "user_preferences": {"location": {"city": "Austin", "state": "TX", "country": "US"}},
+    "limit": 10,
+}
+SCORE_FIELDS = ("semantic_score", "match_score")
+
+
+def start_stub() -> tuple:
+    rng = random.Random(42)
+    state = StubState([make_job(i, rng) for i in range(100)], fail_every=0, latency_ms=0)
+    server = ThreadingHTTPServer(("localhost", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+async def run(state) -> bool:
+    import httpx
+    import app.main as api
+    from app.schemas import SearchRequest
+    from app.services import search_planner
+
+    req = SearchRequest(**SEARCH_BODY)
+    expected_upstream = len(search_planner.plan_queries(req.user_profile, req.user_preferences, req.limit))
+
+    api.create_tables()  # ASGITransport does not run startup hooks
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=60) as client:
+        semantic = (await client.post("/search", json={**SEARCH_BODY, "engine": "semantic"})).json()
+        lexical = (await client.post("/search", json={**SEARCH_BODY, "engine": "lexical"})).json()
+
+    scored = all(all(f in job for f in SCORE_FIELDS) for job in semantic)
+    leaked = [job["id"] for job in lexical if any(f in job for f in SCORE_FIELDS)]
+    print(f"semantic: {len(semantic)} jobs, all scored: {scored}")
+    print(f"lexical:  {len(lexical)} jobs, carrying semantic scores: {len(leaked)}")
+    print(f"upstream calls: {state.requests} (expected {expected_upstream}, second search from cache)")
+    return scored and bool(lexical) and not leaked and state.requests == expected_upstream
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    server, state = start_stub()
+    # The API reads its settings at import time
+    os.environ["THEIRSTACK_API_KEY"] = "stub"
+    os.environ["THEIRSTACK_BASE_URL"] = f"http://localhost:{server.server_address[1]}"
+    os.environ["SEARCH_CACHE_BACKEND"] = "memory"
+    workdir = tempfile.mkdtemp(prefix="skillscout-sc-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/api.db"
+    os.environ["SEMANTIC_INDEX_DIR"] = os.path.join(workdir, "semantic")
+    try:
+        ok = asyncio.run(run(state))
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    print("✅ Cached results are not modified by ranking" if ok else "❌ Cached results were modified")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
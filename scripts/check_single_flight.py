@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+check_single_flight.py — Fire concurrent identical /search and /match requests and count upstream work.
+
+Starts the TheirStack stub server in-process with added latency, points the
+API at it, and sends --concurrency identical requests at once. With request
+coalescing, /search makes one upstream call per planned sub-query and
+/match runs compute_match once. Exits non-zero otherwise.
+
+Usage:
+    python scripts/check_single_flight.py
+    python scripts/check_single_flight.py --concurrency 200 --latency 300
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dev_theirstack_stub_server import StubState, make_handler, make_job  # noqa: E402
+
+SEARCH_BODY = {
+    "user_profile": {"name": "Sam", "skills": ["python", "sql"], "industries": [],
+                     "experience_level": "mid", "target_titles": ["Data Engineer", "Data Analyst"]},
+    "user_preferences": {"location": {"city": "Austin", "state": "TX", "country": "US"}},
+    "limit": 20,
+}
+MATCH_BODY = {
+    "job": {"id": "j1", "title": "Data Engineer", "company": "Acme", "location": "Austin, TX", "url": "", "source": "theirstack",
+            "description": "Build data pipelines with python, sql and airflow on aws."},
+    "resume_text": "Data engineer with python and sql experience building airflow pipelines.",
+}
+
+
+def start_stub(latency_ms: int) -> tuple:
+    rng = random.Random(42)
+    state = StubState([make_job(i, rng) for i in range(300)], fail_every=0, latency_ms=latency_ms)
+    server = ThreadingHTTPServer(("localhost", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+async def fire(client, path: str, body: dict, n: int) -> list:
+    responses = await asyncio.gather(*(client.post(path, json=body) for _ in range(n)))
+    return [r.json() for r in responses]
+
+
+async def run(concurrency: int, state) -> bool:
+    import httpx
+    import app.main as api
+    from app.schemas import SearchRequest
+    from app.services import search_planner
+
+    calls = {"compute_match": 0}
+    real_compute_match = api.compute_match
+
+    def counting_compute_match(*args, **kwargs):
+        calls["compute_match"] += 1
+        return real_compute_match(*args, **kwargs)
+
+    api.compute_match = counting_compute_match
+    req = SearchRequest(**SEARCH_BODY)
+    expected_upstream = len(search_planner.plan_queries(req.user_profile, req.user_preferences, req.limit))
+
+    api.create_tables()  # ASGITransport does not run startup hooks
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=60) as client:
+        results = await fire(client, "/search", SEARCH_BODY, concurrency)
+        same = all(r == results[0] for r in results)
+        print(f"/search: {concurrency} requests -> {state.requests} upstream calls "
+              f"(expected {expected_upstream}), identical responses: {same}")
+
+        results = await fire(client, "/match", MATCH_BODY, concurrency)
+        same = all(r == results[0] for r in results)
+        print(f"/match:  {concurrency} requests -> {calls['compute_match']} compute_match calls "
+              f"(expected 1), identical responses: {same}")
+        print("single_flight:", (await client.get("/metrics")).json()["single_flight"])
+
+    return state.requests == expected_upstream and calls["compute_match"] == 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=int, default=200, help="Stub latency in ms")
+    args = parser.parse_args()
+
+    server, state = start_stub(args.latency)
+    # The API reads its settings at import time
+    os.environ["THEIRSTACK_API_KEY"] = "stub"
+    os.environ["THEIRSTACK_BASE_URL"] = f"http://localhost:{server.server_address[1]}"
+    workdir = tempfile.mkdtemp(prefix="skillscout-sf-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/api.db"
+    os.environ["SEMANTIC_INDEX_DIR"] = os.path.join(workdir, "semantic")
+    try:
+        ok = asyncio.run(run(args.concurrency, state))
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    print("✅ Requests were coalesced" if ok else "❌ Duplicate upstream work detected")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
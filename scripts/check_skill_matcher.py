@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+check_skill_matcher.py — Table of texts and the skills the matcher must credit for them.
+
+Covers word boundaries ("r" not in "react"), symbol skills ("c++", "c#",
+".net") and nested crediting: a skill counts inside a longer matched skill
+only as a whole word of it ("sql" in "postgre sql"), so "c++" and "c#" do
+not credit "c". Exits non-zero on any mismatch.
+
+Usage:
+    python scripts/check_skill_matcher.py
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.services.skill_matcher import SkillMatcher  # noqa: E402
+
+SKILLS = ["c", "c++", "c#", ".net", "r", "react", "go", "sql", "postgre sql",
+          "learning", "machine learning", "node", "node.js"]
+
+# (text, expected matched skills)
+CASES = [
+    ("c#", {"c#"}),
+    ("c++", {"c++"}),
+    ("Modern C++ and C# services", {"c++", "c#"}),
+    ("Embedded C, some C++", {"c", "c++"}),
+    ("React and Go, not google", {"react", "go"}),
+    ("R for statistics", {"r"}),
+    ("ASP.NET on .NET 8", {".net"}),
+    ("Postgre SQL tuning", {"postgre sql", "sql"}),
+    ("Machine learning\nplatform", {"machine learning", "learning"}),
+    ("Node.js backends", {"node.js"}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    matcher = SkillMatcher(SKILLS)
+    failures = 0
+    for text, expected in CASES:
+        got = matcher.matched(text)
+        ok = got == expected
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {text!r}: {sorted(got)}" + ("" if ok else f" (expected {sorted(expected)})"))
+    print(f"{len(CASES) - failures}/{len(CASES)} cases passed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+check_visa_rules.py — Table of job sentences and whether the visa rules must block them.
+
+Every case runs through the rule set's Aho-Corasick scan and must give the
+expected result. Exits non-zero on any mismatch.
+
+Usage:
+    python scripts/check_visa_rules.py
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.services.visa_rules import VISA_RULES_PATH, VisaRules  # noqa: E402
+
+# (text, blocked)
+CASES = [
+    ("No sponsorship available for this role.", True),
+    ("Must be a US citizen, clearance not required.", True),
+    ("Must be authorized to work in the\nUnited States without sponsorship.", True),
+    ("Must be authorized  to work in the US   without sponsorship", True),
+    ("We cannot sponsor visas.", True),
+    ("Unable to\n\n  sponsor H-1B visas at this time.", True),
+    ("Active security clearance required, Python preferred.", True),
+    ("This role requires an active security clearance (TS/SCI).", True),
+    ("US citizens only; we will not sponsor.", True),
+    ("No sponsorship required.", True),
+    ("Security clearance not required.", False),
+    ("Security clearance (TS/SCI) preferred.", False),
+    ("Open to US citizens or visa holders.", False),
+    ("Visa sponsorship available for exceptional candidates.", False),
+    ("Thus person-to-person skills matter.", False),
+    ("We use e-verify.", False),
+]
+
+
+def blocked(rules: VisaRules, text: str) -> bool:
+    return any(h["severity"] == "block" for h in rules.check(text))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", default=VISA_RULES_PATH)
+    args = parser.parse_args()
+
+    rules = VisaRules.load(args.rules)
+
+    failures = 0
+    for text, expected in CASES:
+        got = blocked(rules, text)
+        ok = got == expected
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} expected {'block' if expected else 'pass '} got {'block' if got else 'pass '}  {text!r}")
+    print(f"{len(CASES) - failures}/{len(CASES)} cases passed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+load_test_profiles.py — Concurrent load on the profile endpoints of a running API.
+
+Sends a mix of GET /profile/{id}, POST /profile and POST /profile/{id} at
+increasing concurrency and reports throughput and latency per level. Run it
+against two builds (or DATABASE_URLs) on the same machine to compare them.
+
+Usage:
+    uvicorn app.main:app --port 8000 &
+    python scripts/load_test_profiles.py --url http://localhost:8000
+    python scripts/load_test_profiles.py --concurrency 16 64 256 --requests 2000 --users 200
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+
+def pct(values, q: float) -> float:
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))] if values else 0.0
+
+
+async def one_request(client: httpx.AsyncClient, rng: random.Random, users: int, write_ratio: float) -> None:
+    user_id = f"load_user_{rng.randrange(users)}"
+    r = rng.random()
+    if r < write_ratio / 2:
+        resp = await client.post("/profile", json={
+            "user_id": user_id,
+            "profile": {"name": user_id, "skills": ["python", "sql"]},
+            "preferences": {"location": {"city": "Austin", "state": "TX"}},
+        })
+    elif r < write_ratio:
+        resp = await client.post(f"/profile/{user_id}", json={"name": user_id, "years_experience": rng.randrange(20)})
+    else:
+        resp = await client.get(f"/profile/{user_id}")
+    resp.raise_for_status()
+    body = resp.json()
+    if isinstance(body, dict) and (body.get("ok") is False or "error" in body):
+        raise RuntimeError(body.get("error"))
+
+
+async def run_level(url: str, concurrency: int, requests: int, users: int, write_ratio: float) -> dict:
+    rng = random.Random(concurrency)
+    latencies, errors = [], 0
+    sem = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    await one_request(client, rng, users, write_ratio)
+                except Exception:
+                    errors += 1
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(requests)))
+        elapsed = time.perf_counter() - t0
+
+    return {
+        "concurrency": concurrency,
+        "rps": requests / elapsed,
+        "p50": pct(latencies, 0.50),
+        "p95": pct(latencies, 0.95),
+        "p99": pct(latencies, 0.99),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per concurrency level")
+    parser.add_argument("--users", type=int, default=100, help="Distinct user ids")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{args.url}: {args.requests} requests per level, {args.write_ratio:.0%} writes, {args.users} users")
+    print(f"{'conc':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for c in args.concurrency:
+        r = asyncio.run(run_level(args.url, c, args.requests, args.users, args.write_ratio))
+        print(f"{r['concurrency']:>6} {r['rps']:>9.1f} {r['p50']:>9.1f} {r['p95']:>9.1f} {r['p99']:>9.1f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import requests
 import os
 import json
 import time
+import difflib
 from openai import OpenAI
 
 st.set_page_config(page_title="Job Detail - SkillScout", layout="wide")
@@ -36,6 +37,34 @@ if not API:
 if not API:
     API = "http://localhost:8000"
 
+
+def _resume_edits(old: str, new: str) -> list:
+    """Word-level removed/added fragments between two versions of the resume"""
+    old_words, new_words = old.split(), new.split()
+    sm = difflib.SequenceMatcher(a=old_words, b=new_words, autojunk=False)
+    return [
+        {"removed": " ".join(old_words[i1:i2]), "added": " ".join(new_words[j1:j2])}
+        for op, i1, i2, j1, j2 in sm.get_opcodes() if op != "equal"
+    ]
+
+
+def request_match(payload: dict):
+    """Score via an incremental match session, sending only resume edits on re-clicks"""
+    key = [payload["job"].get("id"), payload["cover_text"], payload["threshold"]]
+    ms = st.session_state.get("match_session")
+    if ms and ms["key"] == key:
+        edits = _resume_edits(ms["resume"], payload["resume_text"])
+        r = requests.patch(f"{API}/match/session/{ms['id']}", json={"edits": edits}, timeout=10)
+        if r.ok and r.json().get("session_id"):
+            ms["resume"] = payload["resume_text"]
+            return r
+    r = requests.post(f"{API}/match/session", json=payload, timeout=10)
+    if r.ok and r.json().get("session_id"):
+        st.session_state["match_session"] = {"id": r.json()["session_id"], "key": key, "resume": payload["resume_text"]}
+        return r
+    # Older backends without sessions
+    return requests.post(f"{API}/match", json=payload, timeout=10)
+
 sel = st.session_state.get("selected_job")
 if sel:
     st.markdown(f"### {sel.get('title', 'N/A')} @ {sel.get('company', 'N/A')}")
@@ -52,7 +81,7 @@ if sel:
     if st.button("Compute Match"):
         payload = {"job": sel, "resume_text": resume_txt, "cover_text": cover_txt, "threshold": threshold}
         try:
-            r = requests.post(f"{API}/match", json=payload, timeout=10)
+            r = request_match(payload)
             if r.ok:
                 m = r.json()
                 score = m.get("score", None)